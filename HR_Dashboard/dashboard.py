@@ -2,6 +2,20 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import io
+import sys
+from pathlib import Path
+
+# Shared helpers live at the repo root, one level above this script
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from dashboard_core import binning, perf, precompute, timeseries  # noqa: E402
+from dashboard_core.bitmap import get_bitmap_index  # noqa: E402
+from dashboard_core.ingest import dataset_id, load_tables  # noqa: E402
+from dashboard_core.prepare import prepare_hr  # noqa: E402
+from dashboard_core.schemas import HR  # noqa: E402
+from dashboard_core.sections import lazy_tabs  # noqa: E402
+from dashboard_core.workforce import get_workforce  # noqa: E402
+
+perf.begin("hr")
 
 # --- Page Config ---
 st.set_page_config(page_title="HR Analytics Dashboard",
@@ -13,7 +27,8 @@ CORPORATE_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728",
 
 # --- Sidebar Upload ---
 st.sidebar.header("📂 Upload HR Data")
-uploaded_file = st.sidebar.file_uploader("Upload Excel File", type=["xlsx"])
+uploaded_files = st.sidebar.file_uploader("Upload Excel Files", type=["xlsx"],
+                                          accept_multiple_files=True) or []
 
 # --- Sample Template Download ---
 sample_data = {
@@ -44,80 +59,149 @@ st.sidebar.download_button(
 )
 
 # --- Load Data ---
-if uploaded_file is None:
-    st.info("👆 Upload an Excel file to begin. Use the template for reference.")
+if not uploaded_files:
+    st.info("👆 Upload Excel files to begin. Use the template for reference.")
     st.stop()   # ⛔ Stop here, no charts will be displayed
 
-df = pd.read_excel(uploaded_file)
+perf.stage("load")
+# Only the columns declared in schemas.HR are read and typed (dates parsed,
+# integers downcast); several files are parsed in parallel and share one set
+# of categories
+df = load_tables(uploaded_files, excel_options=HR.excel_options, prepare=prepare_hr)
 
 # --- Sidebar Filters ---
+perf.stage("filters")
 st.sidebar.header("🔍 Filters")
-departments = st.sidebar.multiselect("Department", options=df["Department"].unique(),
-                                     default=df["Department"].unique())
-genders = st.sidebar.multiselect("Gender", options=df["Gender"].unique(),
-                                 default=df["Gender"].unique())
-
-filtered = df[df["Department"].isin(departments) & df["Gender"].isin(genders)]
-
-# --- KPIs ---
+index = get_bitmap_index(df, ["Department", "Gender"])
+departments = st.sidebar.multiselect("Department", options=index.options("Department"),
+                                     default=index.options("Department"))
+genders = st.sidebar.multiselect("Gender", options=index.options("Gender"),
+                                 default=index.options("Gender"))
+
+filtered = index.filter(df, index.select(empty="none", Department=departments,
+                                         Gender=genders))
+
+# --- KPIs and Tabs ---
+# The KPIs and every section's charts for the current filters start
+# building in the background right away; the page draws them as they
+# arrive, and results are kept per filter state so switching section is
+# instant.
+perf.stage("metrics")
 st.title("👔 HR Analytics Dashboard")
-col1, col2, col3, col4 = st.columns(4)
-col1.metric("Total Employees", len(filtered))
-col2.metric("Active Employees",
-            (filtered["EmploymentStatus"] == "Active").sum())
-col3.metric("Exited Employees",
-            (filtered["EmploymentStatus"] == "Exited").sum())
-col4.metric("Avg. Salary", f"${filtered['Salary'].mean():,.0f}")
-
-# --- Tabs ---
-tab1, tab2, tab3, tab4 = st.tabs(
-    ["👥 Workforce", "💰 Compensation", "📉 Attrition", "⭐ Performance"])
-
-with tab1:
-    st.subheader("Headcount by Department")
-    dept = filtered.groupby("Department").size().reset_index(name="Count")
-    st.plotly_chart(px.bar(dept, x="Department", y="Count", text="Count", color="Department",
-                           color_discrete_sequence=CORPORATE_COLORS), use_container_width=True)
-
-    st.subheader("Gender Diversity")
-    gender = filtered.groupby("Gender").size().reset_index(name="Count")
-    st.plotly_chart(px.pie(gender, names="Gender", values="Count", hole=0.4,
-                           color_discrete_sequence=CORPORATE_COLORS), use_container_width=True)
-
-    st.subheader("Age Distribution")
-    st.plotly_chart(px.histogram(filtered, x="Age", nbins=10, color="Gender", barmode="overlay",
-                                 color_discrete_sequence=CORPORATE_COLORS), use_container_width=True)
-
-with tab2:
-    st.subheader("Salary Distribution by Department")
-    st.plotly_chart(px.box(filtered, x="Department", y="Salary", color="Department",
-                           color_discrete_sequence=CORPORATE_COLORS), use_container_width=True)
-
-    st.subheader("Job Level Distribution")
+kpi_slot = st.container()
+section = lazy_tabs(
+    ["👥 Workforce", "💰 Compensation", "📉 Attrition", "⭐ Performance"], key="hr_section")
+filter_state = (dataset_id(df), tuple(departments), tuple(genders))
+
+
+@perf.timed()
+def compute_metrics():
+    status = filtered["EmploymentStatus"]
+    return (len(filtered), (status == "Active").sum(), (status == "Exited").sum(),
+            filtered["Salary"].mean())
+
+
+@perf.timed()
+def build_workforce():
+    dept = filtered.groupby("Department", observed=True).size().reset_index(name="Count")
+    gender = filtered.groupby("Gender", observed=True).size().reset_index(name="Count")
+    return [
+        ("Headcount by Department",
+         px.bar(dept, x="Department", y="Count", text="Count", color="Department",
+                color_discrete_sequence=CORPORATE_COLORS)),
+        ("Gender Diversity",
+         px.pie(gender, names="Gender", values="Count", hole=0.4,
+                color_discrete_sequence=CORPORATE_COLORS)),
+        ("Age Distribution",
+         binning.histogram(filtered, x="Age", nbins=10, color="Gender", barmode="overlay",
+                           color_discrete_sequence=CORPORATE_COLORS)),
+    ]
+
+
+@perf.timed()
+def build_compensation():
     job_levels = filtered.groupby("JobLevel").size().reset_index(name="Count")
-    st.plotly_chart(px.bar(job_levels, x="JobLevel", y="Count", text="Count", color="JobLevel",
-                           color_discrete_sequence=CORPORATE_COLORS), use_container_width=True)
-
-with tab3:
-    st.subheader("Employment Status (Attrition)")
+    return [
+        ("Salary Distribution by Department",
+         binning.box(filtered, x="Department", y="Salary", color="Department",
+                     color_discrete_sequence=CORPORATE_COLORS)),
+        ("Job Level Distribution",
+         px.bar(job_levels, x="JobLevel", y="Count", text="Count", color="JobLevel",
+                color_discrete_sequence=CORPORATE_COLORS)),
+    ]
+
+
+@perf.timed()
+def build_attrition(freq):
     attrition = filtered.groupby(
-        "EmploymentStatus").size().reset_index(name="Count")
-    st.plotly_chart(px.pie(attrition, names="EmploymentStatus", values="Count", hole=0.4,
-                           color_discrete_sequence=CORPORATE_COLORS), use_container_width=True)
-
-    st.subheader("Hires vs Exits Over Time")
-    hires = pd.to_datetime(filtered["HireDate"], errors="coerce").dropna(
-    ).dt.to_period("M").value_counts().sort_index()
-    exits = pd.to_datetime(filtered["ExitDate"], errors="coerce").dropna(
-    ).dt.to_period("M").value_counts().sort_index()
-    trend = pd.DataFrame({"Hires": hires, "Exits": exits}).fillna(0)
-    trend.index = trend.index.astype(str)
-    st.plotly_chart(px.line(trend, x=trend.index, y=["Hires", "Exits"], markers=True,
-                            color_discrete_sequence=CORPORATE_COLORS), use_container_width=True)
-
-with tab4:
-    st.subheader("Performance Ratings Distribution")
-    perf = filtered.groupby(
+        "EmploymentStatus", observed=True).size().reset_index(name="Count")
+    # Hire/exit events are sorted once per file; each filter is a few binary searches
+    workforce = get_workforce(df)
+    trend = workforce.series(freq, Department=departments, Gender=genders)
+    tenure = workforce.tenure(Department=departments, Gender=genders)
+    return [
+        ("Employment Status (Attrition)",
+         px.pie(attrition, names="EmploymentStatus", values="Count", hole=0.4,
+                color_discrete_sequence=CORPORATE_COLORS)),
+        ("Hires vs Exits Over Time",
+         px.line(trend, x=trend.index, y=["Hires", "Exits"], markers=True,
+                 color_discrete_sequence=CORPORATE_COLORS)),
+        ("Active Headcount Over Time",
+         px.line(trend, x=trend.index, y="Headcount",
+                 color_discrete_sequence=CORPORATE_COLORS)),
+        ("Attrition Rate",
+         px.line(trend, x=trend.index, y="Attrition Rate",
+                 color_discrete_sequence=CORPORATE_COLORS[3:]).update_yaxes(tickformat=".1%")),
+        ("Tenure Distribution",
+         px.bar(tenure, x="Tenure", y="Count", color="Status", barmode="group", text="Count",
+                color_discrete_sequence=CORPORATE_COLORS)),
+    ]
+
+
+@perf.timed()
+def build_performance():
+    ratings = filtered.groupby(
         "PerformanceRating").size().reset_index(name="Count")
-    st.plotly_chart(px.bar(perf, x="PerformanceRating", y="Count", text="Count", color="PerformanceRating",
-                           color_discrete_sequence=CORPORATE_COLORS), use_container_width=True)
+    return [
+        ("Performance Ratings Distribution",
+         px.bar(ratings, x="PerformanceRating", y="Count", text="Count", color="PerformanceRating",
+                color_discrete_sequence=CORPORATE_COLORS)),
+    ]
+
+
+def draw_metrics(metrics):
+    total, active, exited, salary = metrics
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Total Employees", total)
+    col2.metric("Active Employees", active)
+    col3.metric("Exited Employees", exited)
+    col4.metric("Avg. Salary", f"${salary:,.0f}")
+
+
+def draw_charts(figures):
+    for title, fig in figures:
+        st.subheader(title)
+        st.plotly_chart(fig, use_container_width=True)
+
+
+# The attrition trend is built at the granularity its switch is currently set to
+freq = timeseries.selected("hr_granularity")
+SECTION_TASKS = {
+    "👥 Workforce": build_workforce,
+    "💰 Compensation": build_compensation,
+    ("📉 Attrition", freq): lambda: build_attrition(freq),
+    "⭐ Performance": build_performance,
+}
+batch = precompute.schedule(filter_state, {"metrics": compute_metrics, **SECTION_TASKS})
+
+with kpi_slot:
+    batch.render([("metrics", draw_metrics)])
+
+perf.stage(section)
+task = section
+if section == "📉 Attrition":
+    timeseries.granularity("hr_granularity")
+    task = (section, freq)
+batch.render([(task, draw_charts)])
+
+perf.panel()
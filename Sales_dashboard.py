@@ -1,6 +1,15 @@
 import streamlit as st
 import pandas as pd
 import plotly.express as px
+from dashboard_core import charts, perf, precompute, sql, timeseries
+from dashboard_core.ingest import dataset_id, load_tables
+from dashboard_core.keys import top_n
+from dashboard_core.prepare import prepare_sales
+from dashboard_core.schemas import SALES
+from dashboard_core.sections import lazy_tabs
+from dashboard_core.streaming import stream_sales_csv
+
+perf.begin("sales")
 
 # -------------------------------
 # Page Config
@@ -33,48 +42,132 @@ st.markdown("### Interactive view of sales, profits, and products")
 # -------------------------------
 # File Upload
 # -------------------------------
-uploaded_file = st.file_uploader(
-    "📂 Upload a Sales CSV or Excel file", type=["csv", "xlsx"])
-
-if uploaded_file is not None:
-    # Detect file type
-    if uploaded_file.name.endswith(".csv"):
-        df = pd.read_csv(uploaded_file)
+perf.stage("load")
+uploaded_files = st.file_uploader(
+    "📂 Upload Sales CSV or Excel files", type=["csv", "xlsx"], accept_multiple_files=True) or []
+
+# CSVs at least this large default to the streaming engine
+STREAMING_MIN_BYTES = 100 * 1024 ** 2
+
+
+if uploaded_files:
+    uploaded_file = uploaded_files[0]
+    # The out-of-memory engines read a single CSV
+    is_csv = len(uploaded_files) == 1 and uploaded_file.name.endswith(".csv")
+    engines = ["In-memory"]
+    if is_csv:
+        engines += ["Streaming"] + (["DuckDB"] if sql.available() else [])
+    engine = st.sidebar.selectbox(
+        "⚡ Engine", engines,
+        index=1 if is_csv and uploaded_file.size >= STREAMING_MIN_BYTES else 0,
+        help="Streaming aggregates large CSVs chunk by chunk; DuckDB queries the file "
+             "with SQL. Both avoid loading it into memory.")
+    # Both out-of-memory engines answer the same aggregate queries
+    aggregated = engine != "In-memory"
+
+    if engine == "Streaming":
+        # Only partial sums are kept, so memory is bounded by the chunk size
+        progress = st.progress(0.0, text="Streaming file...")
+        aggregates = stream_sales_csv(
+            uploaded_file, on_progress=lambda done: progress.progress(done, text="Streaming file..."))
+        progress.empty()
+        columns = aggregates.columns
+    elif engine == "DuckDB":
+        # Filters and aggregations run as SQL over the file itself
+        aggregates = sql.open_sales(uploaded_file)
+        columns = aggregates.columns
     else:
-        df = pd.read_excel(uploaded_file)
-
-    # Convert dates
-    if "Order Date" in df.columns:
-        df["Order Date"] = pd.to_datetime(
-            df["Order Date"], dayfirst=True, errors="coerce")
+        # Files are parsed in parallel once each; reruns reuse the cached, typed frame
+        df = load_tables(uploaded_files, csv_options=SALES.csv_options,
+                         excel_options=SALES.excel_options, prepare=prepare_sales)
+        columns = df.columns
+        full_df = df   # the time rollups are built once over the whole file
 
     # -------------------------------
     # Sidebar Filters
     # -------------------------------
+    perf.stage("filters")
     st.sidebar.header("🔍 Filters")
+    selected_year = selected_regions = None
 
-    if "Order Date" in df.columns:
-        years = df["Order Date"].dt.year.unique()
+    if "Order Date" in columns:
+        years = aggregates.years() if aggregated else df["Order Date"].dt.year.unique()
         selected_year = st.sidebar.selectbox("Select Year", sorted(years))
-        df = df[df["Order Date"].dt.year == selected_year]
-
-    if "Region" in df.columns:
-        regions = df["Region"].unique().tolist()
+        if not aggregated:
+            df = df[df["Order Date"].dt.year == selected_year]
+
+    if "Region" in columns:
+        if aggregated:
+            regions = aggregates.regions()
+        else:
+            regions = df["Region"].unique().tolist()
         selected_regions = st.sidebar.multiselect(
             "Select Region(s)", regions, default=regions)
-        df = df[df["Region"].isin(selected_regions)]
+        if not aggregated:
+            df = df[df["Region"].isin(selected_regions)]
 
     # -------------------------------
     # Tabs
     # -------------------------------
-    tab1, tab2, tab3 = st.tabs(["📌 Overview", "📈 Trends", "🏆 Products"])
-
-    # ---- Overview Tab ----
-    with tab1:
-        st.markdown("### 📌 Key Metrics")
-        total_sales = df["Sales"].sum()
-        total_profit = df["Profit"].sum()
-        total_quantity = df["Quantity"].sum()
+    # Every section's aggregates for the current filters start computing in
+    # the background right away; only the selected section is drawn, from
+    # the results as they arrive, and results are kept per filter state.
+    section = lazy_tabs(["📌 Overview", "📈 Trends", "🏆 Products"], key="sales_section")
+    perf.stage(section)
+    filter_state = (aggregates.source_key if aggregated else dataset_id(df), engine,
+                    selected_year, tuple(selected_regions or ()))
+
+    @perf.timed()
+    def compute_totals():
+        if aggregated:
+            return aggregates.totals(selected_year, selected_regions)
+        return df["Sales"].sum(), df["Profit"].sum(), df["Quantity"].sum()
+
+    @perf.timed()
+    def compute_trend(freq):
+        if aggregated:
+            return aggregates.trend(freq, selected_year, selected_regions)
+        rollups = timeseries.get_rollups(
+            full_df, "Order Date", [col for col in ["Sales", "Profit"] if col in columns],
+            dims=["Region"] if "Region" in columns else [], count="Orders")
+        filters = {"Region": selected_regions} if "Region" in columns else {}
+        year = int(selected_year)
+        return rollups.series(freq, pd.Timestamp(year, 1, 1), pd.Timestamp(year, 12, 31),
+                              empty="none", **filters)
+
+    @perf.timed()
+    def compute_breakdowns():
+        sales_category = sales_region = None
+        if "Category" in columns:
+            if aggregated:
+                sales_category = aggregates.by("Category", selected_year, selected_regions)
+            else:
+                sales_category = df.groupby(
+                    "Category", observed=True)["Sales"].sum().reset_index()
+        if "Region" in columns:
+            if aggregated:
+                sales_region = aggregates.by("Region", selected_year, selected_regions)
+            else:
+                sales_region = df.groupby("Region", observed=True)["Sales"].sum().reset_index()
+        return sales_category, sales_region
+
+    @perf.timed()
+    def compute_top_products():
+        if aggregated:
+            return aggregates.top_products(10, selected_year, selected_regions)
+        return top_n(df, "Product Name", ["Sales", "Profit", "Quantity"], by="Sales", n=10)
+
+    # The trend is computed at the granularity its switch is currently set to
+    freq = timeseries.selected("sales_granularity")
+    tasks = {"overview": compute_totals, "breakdowns": compute_breakdowns}
+    if "Order Date" in columns:
+        tasks[("trend", freq)] = lambda: compute_trend(freq)
+    if "Product Name" in columns:
+        tasks["products"] = compute_top_products
+    batch = precompute.schedule(filter_state, tasks)
+
+    def draw_overview(totals):
+        total_sales, total_profit, total_quantity = totals
         profit_margin = (total_profit / total_sales) * \
             100 if total_sales != 0 else 0
 
@@ -92,56 +185,57 @@ if uploaded_file is not None:
             st.markdown(
                 f"<div class='metric-card'><h3>📦 Quantity</h3><h2>{total_quantity:,}</h2></div>", unsafe_allow_html=True)
 
-    # ---- Trends Tab ----
-    with tab2:
-        st.markdown("### 📈 Sales & Profit Trends")
+    def draw_trend(sales_trend):
         col1, col2 = st.columns(2)
-
-        if "Order Date" in df.columns:
-            sales_trend = df.groupby(
-                df["Order Date"].dt.to_period("M")).sum(numeric_only=True)
-            sales_trend.index = sales_trend.index.to_timestamp()
-
-            fig_sales = px.line(
-                sales_trend, x=sales_trend.index, y="Sales",
-                title="💰 Sales Over Time", markers=True, template="plotly_white"
-            )
-            col1.plotly_chart(fig_sales, use_container_width=True)
-
-            if "Profit" in df.columns:
-                fig_profit = px.line(
-                    sales_trend, x=sales_trend.index, y="Profit",
-                    title="📈 Profit Over Time", markers=True, template="plotly_white"
-                )
-                col2.plotly_chart(fig_profit, use_container_width=True)
-
-        if "Category" in df.columns:
-            sales_category = df.groupby(
-                "Category")["Sales"].sum().reset_index()
-            fig_cat = px.bar(
-                sales_category, x="Category", y="Sales",
+        charts.plotly_chart(col1, f"sales_trend_{freq}", filter_state, lambda: px.line(
+            charts.rounded(sales_trend), x=sales_trend.index, y="Sales",
+            title="💰 Sales Over Time", markers=True, template="plotly_white"
+        ), use_container_width=True)
+
+        if "Profit" in columns:
+            charts.plotly_chart(col2, f"profit_trend_{freq}", filter_state, lambda: px.line(
+                charts.rounded(sales_trend), x=sales_trend.index, y="Profit",
+                title="📈 Profit Over Time", markers=True, template="plotly_white"
+            ), use_container_width=True)
+
+    def draw_breakdowns(breakdowns):
+        sales_category, sales_region = breakdowns
+        if sales_category is not None:
+            charts.plotly_chart(st, "sales_by_category", filter_state, lambda: px.bar(
+                charts.rounded(sales_category), x="Category", y="Sales",
                 title="📂 Sales by Category", text_auto=True,
                 color="Category", template="plotly_white"
-            )
-            st.plotly_chart(fig_cat, use_container_width=True)
+            ), use_container_width=True)
 
-        if "Region" in df.columns:
-            sales_region = df.groupby("Region")["Sales"].sum().reset_index()
-            fig_region = px.bar(
-                sales_region, x="Region", y="Sales",
+        if sales_region is not None:
+            charts.plotly_chart(st, "sales_by_region", filter_state, lambda: px.bar(
+                charts.rounded(sales_region), x="Region", y="Sales",
                 title="🌍 Sales by Region", text_auto=True,
                 color="Region", template="plotly_white"
-            )
-            st.plotly_chart(fig_region, use_container_width=True)
+            ), use_container_width=True)
+
+    # ---- Overview Tab ----
+    if section == "📌 Overview":
+        st.markdown("### 📌 Key Metrics")
+        batch.render([("overview", draw_overview)])
+
+    # ---- Trends Tab ----
+    elif section == "📈 Trends":
+        st.markdown("### 📈 Sales & Profit Trends")
+        items = [("breakdowns", draw_breakdowns)]
+        if "Order Date" in columns:
+            timeseries.granularity("sales_granularity")
+            items.insert(0, (("trend", freq), draw_trend))
+        batch.render(items)
 
     # ---- Products Tab ----
-    with tab3:
+    else:
         st.markdown("### 🏆 Top Products by Sales")
-        if "Product Name" in df.columns:
-            top_products = df.groupby("Product Name")[["Sales", "Profit", "Quantity"]] \
-                             .sum().sort_values(by="Sales", ascending=False).head(10)
-
-            st.dataframe(top_products.style.background_gradient(cmap="Blues"))
+        if "Product Name" in columns:
+            batch.render([("products", lambda top_products: st.dataframe(
+                top_products.style.background_gradient(cmap="Blues")))])
 
 else:
-    st.info("👆 Upload your sales file to explore insights.")
+    st.info("👆 Upload your sales files to explore insights.")
+
+perf.panel()
@@ -0,0 +1 @@
+"""Benchmarks and load tests for the dashboards (not imported by the apps)."""
@@ -0,0 +1,429 @@
+"""Concurrent-session load test of ``dashboard.py`` on a real Streamlit server.
+
+``benchmarks.run`` times one session's reruns in-process; this starts
+``streamlit run dashboard.py`` on a local port with the bundled
+``Superstore.csv`` and connects N simulated browser tabs to it over the
+app's websocket.  Each tab loads the page, then keeps changing filters (date
+range, region, state, city, or clearing them) and waits for the rerun to
+finish before the next change, optionally pausing in between like a user
+would.  For every concurrency level the report gives rerun latency
+percentiles (send to ``script_finished``), throughput in reruns per second
+and the server's resident memory, so the point where reruns start queueing
+shows up as p95/p99 growing faster than throughput.
+
+    python -m benchmarks.load                       # 1, 2, 4, 8, 16 sessions, 30 s each
+    python -m benchmarks.load --sessions 1 8 32 --duration 60 --think 1
+    python -m benchmarks.load --compare benchmarks/results/load-<earlier>.json
+
+The server is started once and warmed up with one page load, so the levels
+measure a running server rather than the first snapshot build.  Tabs run in
+this process on one event loop; on a small machine they compete with the
+server for CPU, so compare reports taken on the same host.  Reports are
+written to ``benchmarks/results/`` as JSON, like ``benchmarks.run``'s.
+Needs the ``websockets`` package.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import numpy as np
+
+from benchmarks.run import RESULTS_DIR, PeakRSS, _environment, _git_commit
+from benchmarks.synthetic import REPO_ROOT
+
+try:
+    import websockets
+except ImportError:   # optional: only this harness needs it
+    websockets = None
+
+SCRIPT = "dashboard.py"
+DEFAULT_SESSIONS = [1, 2, 4, 8, 16]
+DEFAULT_DURATION = 30        # seconds of filter changes per concurrency level
+STARTUP_TIMEOUT = 120        # seconds for the server to answer its health check
+RERUN_TIMEOUT = 600          # seconds for one rerun before the tab counts it as failed
+PERCENTILES = [50, 95, 99]
+
+# Filters in page order; picking one clears those below it, as their options change
+FILTERS = ["Pick your region", "Pick the state", "Pick the City"]
+
+
+# -------------------------------
+# Server
+# -------------------------------
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_rss(pid):
+    """Resident set size of process ``pid``, in bytes."""
+    try:
+        with open(f"/proc/{pid}/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # No procfs (e.g. macOS): ps reports KiB
+        out = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)],
+                             capture_output=True, text=True).stdout.strip()
+        return int(out or 0) * 1024
+
+
+class ServerRSS(PeakRSS):
+    """Samples the server process's resident set size in a background thread."""
+
+    def __init__(self, pid, interval=0.05):
+        self.pid = pid
+        super().__init__(interval)
+
+    def current(self):
+        return process_rss(self.pid)
+
+
+class Server:
+    """``streamlit run`` of ``script`` on a local port, in a subprocess."""
+
+    def __init__(self, script=SCRIPT, port=None):
+        self.script = script
+        self.port = port or free_port()
+        self.proc = None
+        self.log_path = RESULTS_DIR / "load-server.log"   # the last run's server output
+
+    @property
+    def url(self):
+        return f"ws://127.0.0.1:{self.port}/_stcore/stream"
+
+    def start(self):
+        self.log_path.parent.mkdir(parents=True, exist_ok=True)
+        log = open(self.log_path, "w")
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", str(REPO_ROOT / self.script),
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--server.address", "127.0.0.1", "--server.fileWatcherType", "none",
+             "--browser.gatherUsageStats", "false"],
+            cwd=REPO_ROOT, stdout=log, stderr=subprocess.STDOUT)
+        log.close()
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                raise RuntimeError(f"streamlit exited with {self.proc.returncode}:\n"
+                                   + self.log_path.read_text()[-2000:])
+            try:
+                with urllib.request.urlopen(
+                        f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1) as resp:
+                    if resp.status == 200:
+                        return self
+            except (OSError, urllib.error.URLError):
+                pass
+            time.sleep(0.25)
+        self.stop()
+        raise RuntimeError(f"streamlit did not start within {STARTUP_TIMEOUT}s; see {self.log_path}")
+
+    def stop(self):
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(10)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+                self.proc.wait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# -------------------------------
+# Sessions
+# -------------------------------
+class Session:
+    """One browser tab: a websocket to the app, rerunning it with the widget values it holds.
+
+    Like the frontend, the tab sends the state of every widget it has
+    changed with each rerun request, and forgets widgets the last run did
+    not draw.
+    """
+
+    def __init__(self, url):
+        self.url = url
+        self.ws = None
+        self.closed = False
+        self.widgets = {}   # label -> widget proto drawn by the last run
+        self.states = {}    # widget id -> WidgetState
+
+    async def connect(self):
+        self.ws = await websockets.connect(self.url, subprotocols=["streamlit"],
+                                           max_size=None, open_timeout=STARTUP_TIMEOUT)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    def set_value(self, label, values):
+        """Set the multiselect or date input ``label`` to ``values`` (option or ISO date strings)."""
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        state = WidgetState(id=self.widgets[label].id)
+        state.string_array_value.data[:] = values
+        self.states[state.id] = state
+
+    def clear(self, *labels):
+        for label in labels:
+            if label in self.widgets:
+                self.states.pop(self.widgets[label].id, None)
+
+    async def rerun(self):
+        """Request a rerun with the current widget states; (seconds, error or None) once it ends."""
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_script_hash = ""
+        msg.rerun_script.widget_states.widgets.extend(self.states.values())
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        try:
+            error = await asyncio.wait_for(self._until_finished(), RERUN_TIMEOUT)
+        except asyncio.TimeoutError:
+            error = f"no script_finished within {RERUN_TIMEOUT}s"
+        except websockets.ConnectionClosed as exc:
+            self.closed = True
+            error = f"connection closed: {exc}"
+        return time.perf_counter() - start, error
+
+    async def _until_finished(self):
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        widgets, error = {}, None
+        while True:
+            fmsg = ForwardMsg()
+            fmsg.ParseFromString(await self.ws.recv())
+            kind = fmsg.WhichOneof("type")
+            if kind == "delta" and fmsg.delta.WhichOneof("type") == "new_element":
+                element = fmsg.delta.new_element
+                field = element.WhichOneof("type")
+                if field in ("multiselect", "date_input"):
+                    widget = getattr(element, field)
+                    widgets[widget.label] = widget
+                elif field == "exception" and error is None:
+                    error = f"{element.exception.type}: {element.exception.message}"
+            elif kind == "script_finished":
+                status = fmsg.script_finished
+                if status == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    continue
+                if status != ForwardMsg.FINISHED_SUCCESSFULLY and error is None:
+                    error = ForwardMsg.ScriptFinishedStatus.Name(status)
+                if error is None:
+                    self.widgets = widgets
+                    drawn = {widget.id for widget in widgets.values()}
+                    self.states = {wid: state for wid, state in self.states.items() if wid in drawn}
+                return error
+
+
+# -------------------------------
+# Interactions
+# -------------------------------
+def pick(label, most=3):
+    """Interaction selecting up to ``most`` random options of a filter."""
+    def step(session, rng):
+        options = list(session.widgets[label].options)
+        if not options:
+            return False
+        session.set_value(label, rng.sample(options, rng.randint(1, min(most, len(options)))))
+        session.clear(*FILTERS[FILTERS.index(label) + 1:])
+        return True
+    return step
+
+
+def date_range(session, rng):
+    """Interaction narrowing Start/End Date to a random window of at least a month."""
+    first = datetime.date.fromisoformat(session.widgets["Start Date"].default[0])
+    last = datetime.date.fromisoformat(session.widgets["End Date"].default[0])
+    span = (last - first).days
+    if span <= 31:
+        return False
+    start = first + datetime.timedelta(days=rng.randint(0, span - 31))
+    end = start + datetime.timedelta(days=rng.randint(31, (last - start).days))
+    session.set_value("Start Date", [start.isoformat()])
+    session.set_value("End Date", [end.isoformat()])
+    # Options of every filter depend on the date range
+    session.clear(*FILTERS)
+    return True
+
+
+def reset(session, rng):
+    """Interaction clearing every filter and the date range."""
+    session.states.clear()
+    return True
+
+
+# name -> interaction(session, rng); returns False when it cannot apply right now
+INTERACTIONS = {
+    "date_range": date_range,
+    "region": pick(FILTERS[0]),
+    "state": pick(FILTERS[1]),
+    "city": pick(FILTERS[2], most=2),
+    "reset": reset,
+}
+
+
+# -------------------------------
+# Measurement
+# -------------------------------
+def latency_summary(seconds):
+    if not seconds:
+        return None
+    values = np.asarray(seconds)
+    summary = {f"p{p}": round(float(np.percentile(values, p)), 4) for p in PERCENTILES}
+    summary.update(mean=round(float(values.mean()), 4), max=round(float(values.max()), 4))
+    return summary
+
+
+async def _browse(session, rng, deadline, think, samples):
+    """Change filters on ``session`` until ``deadline``, appending (interaction, seconds, error)."""
+    names = list(INTERACTIONS)
+    while time.monotonic() < deadline:
+        name = rng.choice(names)
+        if not INTERACTIONS[name](session, rng):
+            continue
+        seconds, error = await session.rerun()
+        samples.append((name, seconds, error))
+        if session.closed:
+            return
+        if think:
+            await asyncio.sleep(rng.expovariate(1 / think))
+
+
+async def run_level(url, count, duration, think, seed, rss):
+    """Load the page in ``count`` tabs at once, then let them change filters for ``duration`` s."""
+    sessions = [Session(url) for _ in range(count)]
+    await asyncio.gather(*(session.connect() for session in sessions))
+    try:
+        rss.reset()
+        loads = await asyncio.gather(*(session.rerun() for session in sessions))
+        samples = []
+        start = time.monotonic()
+        await asyncio.gather(*(
+            _browse(session, random.Random(f"{seed}:{count}:{i}"), start + duration, think, samples)
+            for i, session in enumerate(sessions) if session.widgets))
+        elapsed = time.monotonic() - start
+    finally:
+        await asyncio.gather(*(session.close() for session in sessions), return_exceptions=True)
+
+    ok = [seconds for _, seconds, error in samples if error is None]
+    errors = [error for _, _, error in samples if error is not None]
+    errors += [error for _, error in loads if error is not None]
+    return {
+        "sessions": count,
+        "reruns": len(ok),
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "seconds": round(elapsed, 2),
+        "throughput": round(len(ok) / elapsed, 3) if elapsed else 0.0,
+        "load_latency": latency_summary([seconds for seconds, error in loads if error is None]),
+        "latency": latency_summary(ok),
+        "by_interaction": {name: latency_summary([s for n, s, e in samples if n == name and e is None])
+                           for name in INTERACTIONS},
+        "peak_rss_bytes": rss.peak,
+        "end_rss_bytes": rss.current(),
+    }
+
+
+async def warm_up(url):
+    """One page load, so the levels do not time the first snapshot build."""
+    session = Session(url)
+    await session.connect()
+    try:
+        seconds, error = await session.rerun()
+    finally:
+        await session.close()
+    if error is not None:
+        raise RuntimeError(f"{SCRIPT} failed on its first load: {error}")
+    return seconds
+
+
+# -------------------------------
+# Driver
+# -------------------------------
+def summarize(result):
+    latency = result["latency"] or dict.fromkeys(["p50", "p95", "p99"], float("nan"))
+    return (f"{result['sessions']:>4} sessions  {result['reruns']:>6} reruns  "
+            f"{result['throughput']:7.2f}/s  p50 {latency['p50']:6.2f}s  p95 {latency['p95']:6.2f}s  "
+            f"p99 {latency['p99']:6.2f}s  peak RSS {result['peak_rss_bytes'] / 2 ** 20:7.0f} MiB"
+            + (f"  {result['errors']} ERRORS" if result["errors"] else ""))
+
+
+def compare(report, baseline):
+    """Print per-level latency, throughput and memory changes against an earlier report."""
+    previous = {r["sessions"]: r for r in baseline["results"]}
+    for result in report["results"]:
+        old = previous.get(result["sessions"])
+        if old is None or not old["latency"] or not result["latency"]:
+            continue
+        changes = "  ".join(f"p{p} {result['latency'][f'p{p}'] / old['latency'][f'p{p}'] - 1:+7.1%}"
+                            for p in PERCENTILES if old["latency"][f"p{p}"])
+        throughput = (f"throughput {result['throughput'] / old['throughput'] - 1:+7.1%}  "
+                      if old["throughput"] else "")
+        print(f"{result['sessions']:>4} sessions  {changes}  {throughput}"
+              f"peak RSS {(result['peak_rss_bytes'] - old['peak_rss_bytes']) / 2 ** 20:+7.0f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS,
+                        help="concurrency levels, run in order against one server")
+    parser.add_argument("--duration", type=float, default=DEFAULT_DURATION,
+                        help="seconds of filter changes per level")
+    parser.add_argument("--think", type=float, default=0.0,
+                        help="mean pause between a tab's reruns, in seconds (0: back to back)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, help="server port (default: a free one)")
+    parser.add_argument("--output", type=Path, help="report path (default: benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, help="earlier load report to diff against")
+    args = parser.parse_args(argv)
+    if websockets is None:
+        parser.error("the load test needs the websockets package (pip install websockets)")
+
+    commit = _git_commit()
+    report = {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+              "commit": commit, "environment": _environment(), "script": SCRIPT,
+              "duration": args.duration, "think": args.think, "seed": args.seed, "results": []}
+    with Server(SCRIPT, args.port) as server:
+        report["cold_load_seconds"] = round(asyncio.run(warm_up(server.url)), 4)
+        report["idle_rss_bytes"] = process_rss(server.proc.pid)
+        print(f"{SCRIPT} on port {server.port}: first load {report['cold_load_seconds']:.2f}s, "
+              f"RSS {report['idle_rss_bytes'] / 2 ** 20:.0f} MiB", flush=True)
+        rss = ServerRSS(server.proc.pid)
+        try:
+            for count in args.sessions:
+                result = asyncio.run(run_level(server.url, count, args.duration, args.think,
+                                               args.seed, rss))
+                report["results"].append(result)
+                print(summarize(result), flush=True)
+        finally:
+            rss.stop()
+
+    output = args.output or RESULTS_DIR / (
+        f"load-{datetime.datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Report written to {output}")
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,309 @@
+"""Scaled rerun benchmarks for the dashboards.
+
+Every script is driven headlessly with Streamlit's ``AppTest`` through the
+same sequence of interactions a user would make (initial load, then filter
+and section changes), on synthetic data of increasing size.  Each step
+records the rerun's wall time, the process's peak RSS during the rerun and
+the total size of the Plotly figure JSON sent to the browser.
+
+    python -m benchmarks.run                        # 10k, 100k, 1M, 10M rows
+    python -m benchmarks.run --sizes 10000 100000 --scripts dashboard.py
+    python -m benchmarks.run --compare benchmarks/results/<earlier>.json
+
+Each (script, size) pair runs in its own subprocess so peak memory and
+process-wide caches do not leak between measurements.  Reports are written
+to ``benchmarks/results/`` as JSON.
+"""
+
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import EXCEL_MAX_ROWS, REPO_ROOT, dataset_file
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+RERUN_TIMEOUT = 3600   # seconds; the 10M-row loads are slow on purpose
+
+
+# -------------------------------
+# Interactions
+# -------------------------------
+def _widget(widgets, label):
+    return next(w for w in widgets if w.label == label)
+
+
+def pick(kind, label, count=1):
+    """Step that selects the first ``count`` options of a multiselect."""
+    def step(at):
+        widget = _widget(getattr(at, kind), label)
+        widget.set_value(list(widget.options[:count]))
+    return step
+
+
+def drop_first(kind, label):
+    """Step that deselects the first option of a multiselect that starts fully selected."""
+    def step(at):
+        widget = _widget(getattr(at, kind), label)
+        widget.set_value(list(widget.value[1:]))
+    return step
+
+
+def choose(kind, label, index):
+    """Step that picks option ``index`` of a radio or selectbox."""
+    def step(at):
+        widget = _widget(getattr(at, kind), label)
+        widget.set_value(widget.options[index])
+    return step
+
+
+def shift_start_date(days):
+    def step(at):
+        widget = _widget(at.date_input, "Start Date")
+        widget.set_value(widget.value + datetime.timedelta(days=days))
+    return step
+
+
+def next_page(label="Page"):
+    def step(at):
+        widget = _widget(at.number_input, label)
+        widget.set_value(min(widget.value + 1, widget.max))
+    return step
+
+
+# script -> (schema, file format, [(step name, interaction)])
+SCENARIOS = {
+    "dashboard.py": ("superstore", "csv", [
+        ("region", pick("multiselect", "Pick your region")),
+        ("state", pick("multiselect", "Pick the state")),
+        ("city", pick("multiselect", "Pick the City", 2)),
+        ("date_range", shift_start_date(365)),
+    ]),
+    "Sales_dashboard.py": ("superstore", "csv", [
+        ("year", choose("selectbox", "Select Year", -1)),
+        ("regions", drop_first("multiselect", "Select Region(s)")),
+        ("trends", choose("radio", "Section", 1)),
+        ("products", choose("radio", "Section", 2)),
+        ("overview_again", choose("radio", "Section", 0)),
+    ]),
+    "tripletrackdb.py": ("triple_track", "xlsx", [
+        ("location", pick("multiselect", "Select Location", 2)),
+        ("class", pick("multiselect", "Select Class")),
+        ("next_page", next_page()),
+    ]),
+    "tripletrackdbv2.py": ("triple_track", "csv", [
+        ("trends", choose("radio", "Section", 1)),
+        ("raw_data", choose("radio", "Section", 2)),
+        ("overview_again", choose("radio", "Section", 0)),
+    ]),
+    "HR_Dashboard/dashboard.py": ("hr", "xlsx", [
+        ("department", drop_first("multiselect", "Department")),
+        ("compensation", choose("radio", "Section", 1)),
+        ("attrition", choose("radio", "Section", 2)),
+        ("performance", choose("radio", "Section", 3)),
+    ]),
+}
+
+
+# -------------------------------
+# Measurement
+# -------------------------------
+class PeakRSS:
+    """Samples this process's resident set size in a background thread."""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._page_size = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+
+    def current(self):
+        try:
+            with open("/proc/self/statm") as fh:
+                return int(fh.read().split()[1]) * self._page_size
+        except OSError:
+            # ru_maxrss is the lifetime peak (KiB on Linux, bytes on macOS)
+            maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+    def reset(self):
+        self.peak = self.current()
+
+    def _sample(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.current())
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+
+def figure_bytes(at):
+    return sum(len(chart.proto.spec) for chart in at.get("plotly_chart"))
+
+
+class FakeUpload(io.BytesIO):
+    """What ``st.file_uploader`` returns, backed by a file on disk."""
+
+    def __init__(self, path):
+        super().__init__(Path(path).read_bytes())
+        self.name = Path(path).name
+        self.size = len(self.getvalue())
+        self.file_id = str(path)
+
+
+def patch_uploads(path):
+    import streamlit
+    from streamlit.delta_generator import DeltaGenerator
+
+    def file_uploader(*args, **kwargs):
+        upload = FakeUpload(path)
+        return [upload] if kwargs.get("accept_multiple_files") else upload
+
+    streamlit.file_uploader = file_uploader
+    DeltaGenerator.file_uploader = lambda self, *args, **kwargs: file_uploader(*args, **kwargs)
+
+
+def run_scenario(script, rows):
+    """Run one script's scenario at ``rows`` rows in this process and return its record."""
+    from streamlit.testing.v1 import AppTest
+
+    schema, fmt, steps = SCENARIOS[script]
+    path = dataset_file(schema, rows, fmt)
+    patch_uploads(path)
+    # Uploads go to a throwaway sales history, never the real one
+    history_dir = tempfile.mkdtemp(prefix="benchmark-history-")
+    os.environ["TRIPLE_TRACK_DB"] = os.path.join(history_dir, "triple_track.db")
+
+    sampler = PeakRSS()
+    at = AppTest.from_file(str(REPO_ROOT / script), default_timeout=RERUN_TIMEOUT)
+    records = []
+    try:
+        for name, interact in [("load", None), *steps]:
+            if interact is not None:
+                interact(at)
+            sampler.reset()
+            start = time.perf_counter()
+            at.run()
+            elapsed = time.perf_counter() - start
+            record = {"step": name, "seconds": round(elapsed, 4),
+                      "peak_rss_bytes": sampler.peak, "figure_bytes": figure_bytes(at)}
+            if at.exception:
+                record["error"] = at.exception[0].message
+            records.append(record)
+            if at.exception:
+                break
+    finally:
+        sampler.stop()
+        shutil.rmtree(history_dir, ignore_errors=True)
+    return {"script": script, "rows": rows, "input": path.name,
+            "input_bytes": path.stat().st_size, "steps": records}
+
+
+# -------------------------------
+# Driver
+# -------------------------------
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _environment():
+    import pandas
+    import plotly
+    import streamlit
+    return {"python": platform.python_version(), "platform": platform.platform(),
+            "cpus": os.cpu_count(), "pandas": pandas.__version__,
+            "plotly": plotly.__version__, "streamlit": streamlit.__version__}
+
+
+def run_isolated(script, rows):
+    schema, fmt, _ = SCENARIOS[script]
+    if fmt == "xlsx" and rows > EXCEL_MAX_ROWS:
+        return {"script": script, "rows": rows,
+                "skipped": f"{script} only reads Excel, which holds at most {EXCEL_MAX_ROWS:,} rows"}
+    proc = subprocess.run([sys.executable, "-m", "benchmarks.run", "--worker", script, str(rows)],
+                          cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return {"script": script, "rows": rows, "error": proc.stderr.strip()[-2000:]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def summarize(result):
+    if "steps" not in result:
+        return f"{result['script']:<28}{result['rows']:>12,}  " + (
+            "skipped" if "skipped" in result else "error")
+    load, *reruns = result["steps"]
+    rerun_times = [step["seconds"] for step in reruns] or [0.0]
+    peak = max(step["peak_rss_bytes"] for step in result["steps"])
+    return (f"{result['script']:<28}{result['rows']:>12,}  load {load['seconds']:8.2f}s  "
+            f"rerun max {max(rerun_times):7.2f}s  peak RSS {peak / 2 ** 20:8.0f} MiB  "
+            f"figures {max(s['figure_bytes'] for s in result['steps']) / 1024:8.0f} KiB"
+            + ("  ERROR" if any("error" in s for s in result["steps"]) else ""))
+
+
+def compare(report, baseline):
+    """Print per-step time and memory changes against an earlier report."""
+    previous = {(r["script"], r["rows"], s["step"]): s
+                for r in baseline["results"] for s in r.get("steps", [])}
+    for result in report["results"]:
+        for step in result.get("steps", []):
+            old = previous.get((result["script"], result["rows"], step["step"]))
+            if old is None or not old["seconds"]:
+                continue
+            print(f"{result['script']:<28}{result['rows']:>12,}  {step['step']:<16}"
+                  f"time {step['seconds'] / old['seconds'] - 1:+7.1%}  "
+                  f"peak RSS {(step['peak_rss_bytes'] - old['peak_rss_bytes']) / 2 ** 20:+8.0f} MiB")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--scripts", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--output", type=Path, help="report path (default: benchmarks/results/)")
+    parser.add_argument("--compare", type=Path, help="earlier report to diff against")
+    parser.add_argument("--worker", nargs=2, metavar=("SCRIPT", "ROWS"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        script, rows = args.worker
+        print(json.dumps(run_scenario(script, int(rows))))
+        return
+
+    commit = _git_commit()
+    report = {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+              "commit": commit, "environment": _environment(), "results": []}
+    for rows in args.sizes:
+        for script in args.scripts:
+            result = run_isolated(script, rows)
+            report["results"].append(result)
+            print(summarize(result), flush=True)
+
+    output = args.output or RESULTS_DIR / (
+        f"{datetime.datetime.now():%Y%m%d-%H%M%S}-{commit}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"Report written to {output}")
+
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Synthetic datasets with the same schemas as the dashboards' inputs.
+
+Superstore rows reuse the geography and product dictionaries of the bundled
+``Superstore.csv`` (with extra product variants at larger sizes, so SKU
+cardinality grows with the data); Triple Track and HR rows follow the Excel
+templates in ``tripletrackdb.py`` and ``HR_Dashboard/dashboard.py``.
+Generation is vectorized and seeded, so a given (schema, rows) pair always
+produces the same file.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DATA_DIR = Path(__file__).resolve().parent / "data"
+SUPERSTORE_CSV = REPO_ROOT / "Superstore.csv"
+
+EXCEL_MAX_ROWS = 1_048_575
+
+
+def _dates(rng, rows, start="2014-01-01", days=4 * 365):
+    return pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, rows), unit="D")
+
+
+def superstore(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(SUPERSTORE_CSV, encoding="ISO-8859-1")
+    geo = source[["Country", "City", "State", "Postal Code", "Region"]].drop_duplicates()
+    products = source[["Product ID", "Category", "Sub-Category", "Product Name"]].drop_duplicates()
+    customers = source[["Customer ID", "Customer Name"]].drop_duplicates()
+
+    g = geo.iloc[rng.integers(0, len(geo), rows)].reset_index(drop=True)
+    p = products.iloc[rng.integers(0, len(products), rows)].reset_index(drop=True)
+    c = customers.iloc[rng.integers(0, len(customers), rows)].reset_index(drop=True)
+
+    # About one new SKU variant per hundred rows beyond the bundled catalogue
+    variants = rng.integers(0, max(1, rows // (100 * len(products))) + 1, rows)
+    suffix = np.where(variants > 0, " #" + variants.astype(str), "")
+    p["Product Name"] = p["Product Name"] + suffix
+    p["Product ID"] = p["Product ID"] + suffix
+
+    order_dates = _dates(rng, rows)
+    quantity = rng.integers(1, 15, rows)
+    sales = np.round(rng.lognormal(4.0, 1.3, rows), 2)
+    discount = rng.choice([0, 0, 0.1, 0.2, 0.2, 0.4, 0.8], rows)
+    profit = np.round(sales * (0.25 - discount) * rng.uniform(0.3, 1.2, rows), 4)
+
+    return pd.DataFrame({
+        "Row ID": np.arange(1, rows + 1),
+        "Order ID": "CA-" + pd.Series(order_dates.year).astype(str) + "-"
+                    + pd.Series(rng.integers(100000, 999999, rows)).astype(str),
+        "Order Date": order_dates.strftime("%d/%m/%Y"),
+        "Ship Date": (order_dates + pd.to_timedelta(rng.integers(0, 7, rows), unit="D"))
+        .strftime("%d/%m/%Y"),
+        "Ship Mode": rng.choice(["Standard Class", "Second Class", "First Class", "Same Day"], rows),
+        "Customer ID": c["Customer ID"],
+        "Customer Name": c["Customer Name"],
+        "Segment": rng.choice(["Consumer", "Corporate", "Home Office"], rows),
+        "Country": g["Country"],
+        "City": g["City"],
+        "State": g["State"],
+        "Postal Code": g["Postal Code"],
+        "Region": g["Region"],
+        "Product ID": p["Product ID"],
+        "Category": p["Category"],
+        "Sub-Category": p["Sub-Category"],
+        "Product Name": p["Product Name"],
+        "Sales": sales,
+        "Quantity": quantity,
+        "Discount": discount,
+        "Profit": profit,
+    })
+
+
+def triple_track(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    price = np.round(rng.uniform(80, 600, rows), 2)
+    return pd.DataFrame({
+        "Order Date": _dates(rng, rows, "2023-01-01", 3 * 365).strftime("%Y-%m-%d"),
+        "Buyer Name": "Buyer " + pd.Series(rng.integers(0, max(50, rows // 20), rows)).astype(str),
+        "Location": rng.choice(["Manila", "Cebu", "Davao", "Quezon City", "Makati", "Iloilo"], rows),
+        "Class": rng.choice(["Sports Car", "Truck", "Fantasy", "Premium Car", "Classic"], rows),
+        "Price": price,
+        "Quantity": rng.integers(1, 6, rows),
+        "Cost": np.round(price * rng.uniform(0.4, 0.8, rows), 2),
+    })
+
+
+def hr(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    hire = _dates(rng, rows, "2005-01-01", 19 * 365)
+    exited = rng.random(rows) < 0.3
+    exit_dates = pd.Series(hire + pd.to_timedelta(rng.integers(30, 3000, rows), unit="D"))
+    exit_dates = exit_dates.where(exited & (exit_dates < pd.Timestamp("2024-12-31")))
+    return pd.DataFrame({
+        "EmployeeID": np.arange(1, rows + 1),
+        "Name": "Employee " + pd.Series(np.arange(1, rows + 1)).astype(str),
+        "Department": rng.choice(["HR", "IT", "Finance", "Sales", "Operations", "Legal"], rows),
+        "Gender": rng.choice(["F", "M"], rows),
+        "Age": rng.integers(21, 65, rows),
+        "Salary": rng.integers(25_000, 180_000, rows),
+        "JobLevel": rng.integers(1, 6, rows),
+        "HireDate": hire.strftime("%Y-%m-%d"),
+        "ExitDate": exit_dates.dt.strftime("%Y-%m-%d"),
+        "EmploymentStatus": np.where(exit_dates.notna(), "Exited", "Active"),
+        "PerformanceRating": rng.integers(1, 6, rows),
+    })
+
+
+GENERATORS = {"superstore": superstore, "triple_track": triple_track, "hr": hr}
+
+
+def dataset_file(schema, rows, fmt, seed=0):
+    """Path of the generated ``schema`` dataset with ``rows`` rows, writing it if needed."""
+    if fmt == "xlsx" and rows > EXCEL_MAX_ROWS:
+        raise ValueError(f"Excel sheets hold at most {EXCEL_MAX_ROWS:,} rows")
+    path = DATA_DIR / f"{schema}_{rows}_{seed}.{fmt}"
+    if not path.exists():
+        DATA_DIR.mkdir(parents=True, exist_ok=True)
+        df = GENERATORS[schema](rows, seed)
+        tmp_path = path.with_name("tmp_" + path.name)
+        if fmt == "csv":
+            df.to_csv(tmp_path, index=False)
+        else:
+            df.to_excel(tmp_path, index=False)
+        tmp_path.replace(path)
+    return path
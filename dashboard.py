@@ -1,3 +1,4 @@
+import calendar
 import plotly.figure_factory as ff
 from tokenize import endpats
 import streamlit as st
@@ -5,7 +6,17 @@ import plotly.express as px
 import pandas as pd
 import os
 import warnings
+from dashboard_core import binning, charts, perf, sql, timeseries
+from dashboard_core.bitmap import get_bitmap_index
+from dashboard_core.cube import SalesCube, get_cube
+from dashboard_core.dateindex import get_date_index
+from dashboard_core.export import EXCEL_MAX_ROWS, FORMATS, export_button
+from dashboard_core.grid import paged_grid
+from dashboard_core.ingest import dataset_id, file_digest, load_tables
+from dashboard_core.snapshot import (SUPERSTORE_CSV_OPTIONS, apply_superstore_types, ensure_snapshot,
+                                     load_superstore)
 warnings.filterwarnings('ignore')
+perf.begin("superstore")
 
 st.set_page_config(page_title="Triple Track Garage",
                    page_icon=":bar_chart:", layout="wide")
@@ -14,22 +25,46 @@ st.title(" :bar_chart: Triple Track Garage")
 st.markdown(
     '<style>div.block-container{padding-top:2.5rem;} </style>', unsafe_allow_html=True)
 
-fl = st.file_uploader(":file_folder: Upload a file",
-                      type=(["csv", "txt", "xlsx", "xls"]))
-if fl is not None:
-    filename = fl.name
+perf.stage("load")
+files = st.file_uploader(":file_folder: Upload files",
+                         type=(["csv", "txt", "xlsx", "xls"]), accept_multiple_files=True) or []
+csv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Superstore.csv")
+# A single upload can be queried in place; several are combined into one frame
+fl = files[0] if len(files) == 1 else None
+
+# With DuckDB the file is queried in place instead of being loaded into pandas
+sql_ok = sql.available() and len(files) <= 1 and (fl is None or sql.supports(fl.name))
+use_sql = sql_ok and st.sidebar.toggle(
+    "🦆 SQL engine (DuckDB)", value=os.environ.get("DASHBOARD_SQL") == "1", disabled=not sql_ok,
+    help="Run filters and aggregations as SQL over the file (needs the duckdb package)")
+
+if files:
+    filename = ", ".join(f.name for f in files)
     st.write(filename)
-    df = pd.read_csv(filename, encoding="ISO-8859-1")
+if use_sql:
+    if fl is None:
+        try:
+            fl_path = ensure_snapshot(csv_path, csv_options=SUPERSTORE_CSV_OPTIONS)
+        except OSError:
+            fl_path = csv_path
+    source = sql.open_sales(fl if fl is not None else fl_path)
+elif files:
+    # Files are parsed and typed in parallel, one worker process per file
+    df = load_tables(files, csv_options=SUPERSTORE_CSV_OPTIONS,
+                     prepare=apply_superstore_types)
 else:
-    os.chdir(r"C:\Users\Louie Sabularse\Desktop\Streamlit")
-    df = pd.read_csv("Superstore.csv ", encoding="ISO-8859-1")
+    df = load_superstore(csv_path)
 
 col1, col2 = st.columns((2))
-df["Order Date"] = pd.to_datetime(df["Order Date"], format="%d/%m/%Y")
 
 
-startDate = pd.to_datetime(df["Order Date"]).min()
-endDate = pd.to_datetime(df["Order Date"]).max()
+perf.stage("date range")
+if use_sql:
+    startDate, endDate = source.date_range()
+else:
+    # Rows are sorted by Order Date, so bounds and ranges are binary searches
+    date_index = get_date_index(df)
+    startDate, endDate = date_index.bounds()
 
 with col1:
     date1 = pd.to_datetime(st.date_input("Start Date", startDate))
@@ -37,151 +72,214 @@ with col1:
 with col2:
     date2 = pd.to_datetime(st.date_input("End Date", endDate))
 
-df = df[(df["Order Date"] >= date1) & (df["Order Date"] <= date2)].copy()
-
+perf.stage("cube and index")
+if not use_sql:
+    # Aggregates come from a cube and filters from a bitmap index, both built
+    # once over the full dataset.  df is shared by every session, so filters
+    # stay bitsets and only the rows/columns a chart needs are taken out.
+    cube = get_cube(df)
+    index = get_bitmap_index(df, ["Region", "State", "City", "Category"])
+    lo, hi = date_index.range(date1, date2)
+    in_range = (index.span(lo, hi) if date_index.order is None
+                else index.take(date_index.positions(lo, hi)))
+
+perf.stage("filters")
 st.sidebar.header("Choose your filter:")
 
-# create for region
-region = st.sidebar.multiselect("Pick your region", df["Region"].unique())
-if not region:
-    df2 = df.copy()
+if use_sql:
+    # Options come from SELECT DISTINCT under the filters above them
+    dates = {"start": date1, "end": date2}
+    region = st.sidebar.multiselect("Pick your region", source.options("Region", **dates))
+    state = st.sidebar.multiselect("Pick the state",
+                                   source.options("State", **dates, Region=region))
+    city = st.sidebar.multiselect("Pick the City",
+                                  source.options("City", **dates, Region=region, State=state))
+    selection = dict(dates, Region=region, State=state, City=city)
 else:
-    df2 = df[df["Region"].isin(region)]
+    # create for region
+    region = st.sidebar.multiselect("Pick your region", index.options("Region", in_range))
+    region_mask = index.combine(in_range, index.mask("Region", region))
 
-# create for state
-state = st.sidebar.multiselect("Pick the state", df2["State"].unique())
-if not state:
-    df3 = df2.copy()
-else:
-    df3 = df2[df["State"].isin(state)]
-
-# Create for City
-city = st.sidebar.multiselect("Pick the City", df3["City"].unique())
-
-# Filter data based on Region, State and City
-
-if not region and not state and not city:
-    filtered_df = df
-elif not state and not city:
-    filtered_df = df[df["Region"].isin(region)]
-elif not region and not city:
-    filtered_df = df[df["State"].isin(state)]
-elif state and city:
-    filtered_df = df3[df["State"].isin(state) & df3["City"].isin(city)]
-elif region and city:
-    filtered_df = df3[df["Region"].isin(region) & df3["City"].isin(city)]
-elif region and state:
-    filtered_df = df3[df["Region"].isin(region) & df3["State"].isin(state)]
-elif city:
-    filtered_df = df3[df3["City"].isin(city)]
+    # create for state
+    state = st.sidebar.multiselect("Pick the state", index.options("State", region_mask))
+    state_mask = index.combine(region_mask, index.mask("State", state))
+
+    # Create for City
+    city = st.sidebar.multiselect("Pick the City", index.options("City", state_mask))
+
+    # Filter data based on Region, State and City
+    selected = index.combine(state_mask, index.mask("City", city))
+
+perf.stage("cube slice")
+if use_sql:
+    cube_df = source.cube_slice(**selection)
 else:
-    filtered_df = df3[df3["Region"].isin(
-        region) & df3["State"].isin(state) & df3["City"].isin(city)]
+    cube_df = cube.slice(date1, date2, Region=region, State=state, City=city)
+
+# Figures are cached per dataset and filter selection
+chart_state = (source.source_key if use_sql else dataset_id(df),
+               date1, date2, tuple(region), tuple(state), tuple(city))
 
-category_df = filtered_df.groupby(
-    by=["Category"], as_index=False)["Sales"].sum()
+category_df = SalesCube.rollup(cube_df, ["Category"])[["Category", "Sales"]]
+region_df = SalesCube.rollup(cube_df, ["Region"])[["Region", "Sales"]]
 
+perf.stage("category and region")
 with col1:
     st.subheader("Category wise Sales")
-    fig = px.bar(category_df, x="Category", y="Sales", text=['${:,.2f}'.format(x) for x in category_df["Sales"]],
-                 template="seaborn")
-    st.plotly_chart(fig, use_container_width=True, height=200)
+    charts.plotly_chart(st, "category_bar", chart_state, lambda: px.bar(
+        charts.rounded(category_df), x="Category", y="Sales", template="seaborn")
+        .update_traces(texttemplate="$%{y:,.2f}"), use_container_width=True, height=200)
 
 with col2:
     st.subheader("Region wise Sales")
-    fig = px.pie(filtered_df, values="Sales", names="Region", hole=0.5)
-    fig.update_traces(text=filtered_df["Region"], textposition="outside")
-    st.plotly_chart(fig, use_container_width=True)
+    charts.plotly_chart(st, "region_pie", chart_state, lambda: px.pie(
+        charts.rounded(region_df), values="Sales", names="Region", hole=0.5)
+        .update_traces(textposition="outside"), use_container_width=True)
 
 
 cl1, cl2 = st.columns((2))
 with cl1:
     with st.expander("Category_ViewData"):
         st.write(category_df.style.background_gradient(cmap="Blues"))
-        csv = category_df.to_csv(index=False).encode('utf-8')
-        st.download_button("Download Data", data=csv, file_name="Category.csv", mime="text/csv",
-                           help='Click here to download the data as a CSV file')
+        export_button(category_df, "Category", key="category_download",
+                      help='Click here to download the data as a CSV file')
 
 with cl2:
     with st.expander("Region_ViewData"):
-        region = filtered_df.groupby(by="Region", as_index=False)[
-            "Sales"].sum()
-        st.write(region.style.background_gradient(cmap="Oranges"))
-        csv = region.to_csv(index=False).encode('utf-8')
-        st.download_button("Download Data", data=csv, file_name="Region.csv", mime="text/csv",
-                           help='Click here to download the data as a CSV file')
-
-filtered_df["month_year"] = filtered_df["Order Date"].dt.to_period("M")
+        st.write(region_df.style.background_gradient(cmap="Oranges"))
+        export_button(region_df, "Region", key="region_download",
+                      help='Click here to download the data as a CSV file')
+
+perf.stage("time series")
 st.subheader("Time Series Analysis")
 
-linechart = pd.DataFrame(filtered_df.groupby(
-    filtered_df["month_year"].dt.strftime("%Y : %b"))["Sales"].sum()).reset_index()
-fig2 = px.line(linechart, x="month_year", y="Sales", labels={
-               "Sales": "Amount"}, height=500, width=1000, template="gridon")
-st.plotly_chart(fig2, use_container_width=True)
+freq = timeseries.granularity("superstore_granularity")
+filters = dict(Region=region, State=state, City=city)
+if use_sql:
+    trend = source.series(freq, **selection)
+else:
+    # Running totals answer the series directly unless several dimensions are
+    # filtered; then it comes from the per-day rollups
+    trend = date_index.series(date1, date2, freq, **filters)
+    if trend is None:
+        rollups = timeseries.get_rollups(df, "Order Date", ["Sales"], dims=list(filters),
+                                         count="Orders")
+        trend = rollups.series(freq, date1, date2, **filters)
+linechart = trend[["Sales"]].reset_index()
+charts.plotly_chart(st, f"time_series_{freq}", chart_state, lambda: px.line(
+    charts.rounded(linechart), x=timeseries.PERIOD, y="Sales", labels={"Sales": "Amount"},
+    height=500, width=1000, template="gridon"), use_container_width=True)
 
 with st.expander("View Data of TimeSeries:"):
     st.write(linechart.T.style.background_gradient(cmap="Blues"))
-    csv = linechart.to_csv(index=False).encode("utf-8")
-    st.download_button('Download Data', data=csv,
-                       file_name="TimeSeries.csv", mime='text/csv')
+    export_button(linechart, "TimeSeries", key="timeseries_download")
 
+perf.stage("treemap")
 # Create a treem based on Region, category, sub-category
 st.subheader("Hierarchical view of Sales using TreeMap")
-fig3 = px.treemap(filtered_df, path=["Region", "Category", "Sub-Category"],
-                  values="Sales", hover_data=["Sales"], color="Sub-Category")
-fig3.update_layout(width=800, height=650)
-st.plotly_chart(fig3, use_container_width=True)
+treemap_path = ["Region", "Category", "Sub-Category"]
+charts.plotly_chart(st, "treemap", chart_state, lambda: px.treemap(
+    charts.aggregate(cube_df, treemap_path, "Sales"), path=treemap_path,
+    values="Sales", hover_data=["Sales"], color="Sub-Category")
+    .update_layout(width=800, height=650), use_container_width=True)
 
+perf.stage("pies")
 chart1, chart2 = st.columns((2))
 with chart1:
     st.subheader('Segment wise Sales')
-    fig = px.pie(filtered_df, values="Sales",
-                 names="Segment", template="plotly_dark")
-    fig.update_traces(text=filtered_df["Segment"], textposition="inside")
-    st.plotly_chart(fig, use_container_width=True)
+    charts.plotly_chart(st, "segment_pie", chart_state, lambda: px.pie(
+        charts.aggregate(cube_df, "Segment", "Sales"), values="Sales",
+        names="Segment", template="plotly_dark")
+        .update_traces(textposition="inside"), use_container_width=True)
 
 with chart2:
     st.subheader('Category wise Sales')
-    fig = px.pie(filtered_df, values="Sales",
-                 names="Category", template="gridon")
-    fig.update_traces(text=filtered_df["Category"], textposition="inside")
-    st.plotly_chart(fig, use_container_width=True)
+    charts.plotly_chart(st, "category_pie", chart_state, lambda: px.pie(
+        charts.rounded(category_df), values="Sales",
+        names="Category", template="gridon")
+        .update_traces(textposition="inside"), use_container_width=True)
 
+perf.stage("summary table")
 st.subheader(":point_right: Month wise Sub-Category Sales Summary")
 with st.expander("Summary_Table"):
-    df_sample = df[0:5][["Region", "State", "City",
-                         "Category", "Sales", "Profit", "Quantity"]]
-    fig = ff.create_table(df_sample, colorscale="Cividis")
-    st.plotly_chart(fig, use_container_width=True)
+    sample_columns = ["Region", "State", "City", "Category", "Sales", "Profit", "Quantity"]
+
+    def sample_table():
+        if use_sql:
+            df_sample = source.rows(sample_columns, limit=5, **dates)
+        else:
+            df_sample = df[sample_columns].iloc[index.positions(in_range)[:5]]
+        return ff.create_table(charts.rounded(df_sample), colorscale="Cividis")
+
+    charts.plotly_chart(st, "sample_table", chart_state[:3], sample_table,
+                        use_container_width=True)
 
     st.markdown("Month wise sub-Category Table")
-    filtered_df["month"] = filtered_df["Order Date"].dt.month_name()
-    sub_category_Year = pd.pivot_table(data=filtered_df, values="Sales", index=[
-                                       "Sub-Category"], columns="month")
+    # Mean sales per order, from the cube's per-month sums and order counts
+    monthly = SalesCube.rollup(cube_df, ["Sub-Category", "Month"])
+    monthly["month"] = monthly["Month"].dt.month
+    sums = pd.pivot_table(data=monthly, values=["Sales", "Orders"], index=[
+                          "Sub-Category"], columns="month", aggfunc="sum", observed=True)
+    # Columns in calendar order, named after the month
+    sub_category_Year = (sums["Sales"] / sums["Orders"]).rename(
+        columns=lambda month: calendar.month_name[month])
     st.write(sub_category_Year.style.background_gradient(cmap="Blues"))
 
 
-data1 = px.scatter(
-    filtered_df,
-    x="Sales",
-    y="Profit",
-    size="Quantity"
-)
+perf.stage("scatter")
+
+
+def sales_profit_scatter():
+    if use_sql:
+        data1 = source.scatter("Sales", "Profit", size="Quantity", **selection)
+    else:
+        data1 = binning.scatter(
+            charts.rounded(index.filter(df, selected, columns=["Sales", "Profit", "Quantity"])),
+            x="Sales",
+            y="Profit",
+            size="Quantity"
+        )
 
-data1.update_layout(
-    title="Relationship between Sales and Profits using Scatter Plot.",
-    title_font=dict(size=20),
-    xaxis=dict(title="Sales", title_font=dict(size=19)),
-    yaxis=dict(title="Profit", title_font=dict(size=19))
-)
+    return data1.update_layout(
+        title="Relationship between Sales and Profits using Scatter Plot.",
+        title_font=dict(size=20),
+        xaxis=dict(title="Sales", title_font=dict(size=19)),
+        yaxis=dict(title="Profit", title_font=dict(size=19))
+    )
 
-st.plotly_chart(data1, use_container_width=True)
 
+charts.plotly_chart(st, "scatter", chart_state, sales_profit_scatter, use_container_width=True)
 
+
+perf.stage("records")
+# Every other Superstore column, as the grid has always shown
+GRID_COLUMNS = ["Order ID", "Ship Date", "Customer ID", "Segment", "City", "Postal Code",
+                "Product ID", "Sub-Category", "Sales", "Discount"]
 with st.expander("View Data"):
-    st.write(filtered_df.iloc[:500, 1:20:2].style.background_gradient(
-        cmap="Oranges"))
-csv = df.to_csv(index=False).encode('utf-8')
-st.download_button('Download Data', data=csv,
-                   file_name="Data.csv", mime="text/csv")
+    if use_sql:
+        # Only the rows the grid can page through are fetched
+        rows = source.rows([col for col in GRID_COLUMNS if col in source.columns],
+                           limit=sql.GRID_MAX_ROWS, **selection)
+        paged_grid(rows, key="superstore_rows", cmap="Oranges")
+        if len(rows) == sql.GRID_MAX_ROWS:
+            st.caption(f"Showing the first {sql.GRID_MAX_ROWS:,} matching rows.")
+    else:
+        paged_grid(df[[col for col in GRID_COLUMNS if col in df.columns]],
+                   key="superstore_rows", cmap="Oranges",
+                   rows=None if selected is None else index.positions(selected))
+if use_sql:
+    # Written by DuckDB straight from the file
+    export_button(None, "Data", key="data_download", formats=list(sql.COPY_OPTIONS),
+                  state=(source.source_key, date1, date2),
+                  writer=lambda fmt, path: source.copy_to(fmt, path, **dates))
+else:
+    def write_in_range(fmt, path):
+        # The date-filtered rows are only copied out when a download is requested
+        FORMATS[fmt][2](index.filter(df, in_range), path)
+
+    export_button(None, "Data", key="data_download",
+                  formats=[fmt for fmt in FORMATS
+                           if fmt != "Excel" or index.count(in_range) <= EXCEL_MAX_ROWS],
+                  state=(dataset_id(df), file_digest(in_range.tobytes())), writer=write_in_range)
+
+perf.panel()
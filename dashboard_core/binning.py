@@ -0,0 +1,128 @@
+"""Row-level charts that stay small on large data.
+
+``px.scatter``, ``px.histogram`` and ``px.box`` embed every row in the
+figure JSON and let the browser do the work, which freezes tabs past a few
+hundred thousand points.  Below ``LARGE_DATA_ROWS`` these helpers return the
+usual Plotly Express figure; above it they bin on the server and return a
+figure whose payload depends on the bin count, not the row count.
+"""
+
+import os
+
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+
+# Row count above which charts switch to server-side binning
+LARGE_DATA_ROWS = int(os.environ.get("DASHBOARD_LARGE_DATA_ROWS", 50_000))
+
+GRID_BINS = 80
+MAX_OUTLIERS_PER_BOX = 200
+
+
+def is_large(df, threshold=None):
+    return len(df) > (LARGE_DATA_ROWS if threshold is None else threshold)
+
+
+# -------------------------------
+# Scatter -> 2D grid
+# -------------------------------
+def scatter(df, x, y, size=None, threshold=None, bins=GRID_BINS, **kwargs):
+    """``px.scatter`` for small frames, a binned 2D density heatmap for large ones."""
+    if not is_large(df, threshold):
+        return px.scatter(df, x=x, y=y, size=size, **kwargs)
+
+    values = df[[x, y]].dropna()
+    counts, x_edges, y_edges = np.histogram2d(values[x].to_numpy(), values[y].to_numpy(), bins=bins)
+    return density_heatmap(counts, x_edges, y_edges, x, y)
+
+
+def density_heatmap(counts, x_edges, y_edges, x, y):
+    """Heatmap of a 2D histogram (``counts[i, j]`` rows in x bin i, y bin j)."""
+    counts = np.where(counts > 0, counts, np.nan)   # leave empty cells transparent
+    fig = go.Figure(go.Heatmap(
+        x=(x_edges[:-1] + x_edges[1:]) / 2,
+        y=(y_edges[:-1] + y_edges[1:]) / 2,
+        z=counts.T,
+        colorscale="Viridis",
+        colorbar=dict(title="Rows"),
+        hovertemplate=f"{x}: %{{x:,.2f}}<br>{y}: %{{y:,.2f}}<br>Rows: %{{z:,}}<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
+
+
+# -------------------------------
+# Histogram -> precomputed bins
+# -------------------------------
+def histogram(df, x, color=None, nbins=10, threshold=None, **kwargs):
+    """``px.histogram`` for small frames, precomputed bin counts for large ones."""
+    if not is_large(df, threshold):
+        return px.histogram(df, x=x, color=color, nbins=nbins, **kwargs)
+
+    values = df[x].dropna().to_numpy()
+    edges = np.histogram_bin_edges(values, bins=nbins)
+    centers = (edges[:-1] + edges[1:]) / 2
+    groups = [(None, df)] if color is None else df.groupby(color, observed=True, sort=True)
+
+    rows = {x: [], "count": []}
+    if color is not None:
+        rows[color] = []
+    for name, group in groups:
+        counts, _ = np.histogram(group[x].dropna().to_numpy(), bins=edges)
+        rows[x].extend(centers)
+        rows["count"].extend(counts)
+        if color is not None:
+            rows[color].extend([name] * len(counts))
+
+    fig = px.bar(rows, x=x, y="count", color=color, **kwargs)
+    fig.update_traces(width=float(edges[1] - edges[0]) if len(edges) > 1 else None)
+    fig.update_layout(bargap=0)
+    return fig
+
+
+# -------------------------------
+# Box plot -> precomputed quartiles
+# -------------------------------
+def _box_stats(values):
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    lower, upper = inside.min(), inside.max()
+    outliers = values[(values < lower) | (values > upper)]
+    if len(outliers) > MAX_OUTLIERS_PER_BOX:
+        outliers = np.random.default_rng(0).choice(outliers, MAX_OUTLIERS_PER_BOX, replace=False)
+    return q1, median, q3, lower, upper, outliers
+
+
+def box(df, x, y, color=None, threshold=None, color_discrete_sequence=None, **kwargs):
+    """``px.box`` for small frames, precomputed quartiles and sampled outliers for large ones.
+
+    In binned mode each ``x`` group gets its own colour, which is what the
+    dashboards ask for with ``color=x``.
+    """
+    if not is_large(df, threshold):
+        return px.box(df, x=x, y=y, color=color,
+                      color_discrete_sequence=color_discrete_sequence, **kwargs)
+
+    palette = color_discrete_sequence or px.colors.qualitative.Plotly
+    fig = go.Figure()
+    for i, (name, group) in enumerate(df.groupby(x, observed=True, sort=False)):
+        values = group[y].dropna().to_numpy()
+        if not len(values):
+            continue
+        q1, median, q3, lower, upper, outliers = _box_stats(values)
+        colour = palette[i % len(palette)]
+        fig.add_trace(go.Box(
+            name=str(name), x=[name], q1=[q1], median=[median], q3=[q3],
+            lowerfence=[lower], upperfence=[upper], marker_color=colour,
+            legendgroup=str(name), showlegend=color is not None,
+        ))
+        if len(outliers):
+            fig.add_trace(go.Scatter(
+                x=[name] * len(outliers), y=outliers, mode="markers",
+                marker=dict(color=colour, size=4), legendgroup=str(name),
+                showlegend=False, hoverinfo="y",
+            ))
+    fig.update_layout(xaxis_title=x, yaxis_title=y)
+    return fig
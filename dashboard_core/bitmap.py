@@ -0,0 +1,164 @@
+"""Bitmap index for the dashboards' multiselect filters.
+
+Each indexed column is dictionary-encoded once per dataset.  A selected
+value maps to a packed row bitset (built lazily and cached), a multiselect
+is the OR of its values' bitsets and a filter state is the AND of the
+per-widget masks.  Masks are cached by (column, selection), so when one
+widget changes the others' masks are reused on the next rerun.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.ingest import LRUCache, dataset_id, file_digest
+
+INDEXES = LRUCache(max_entries=4)
+
+
+def _encode(series):
+    """Dictionary-encode ``series`` into (codes, values); missing values get -1."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), list(series.cat.categories)
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, list(uniques)
+
+
+class BitmapIndex:
+    """Value -> packed row bitset index over a few low-cardinality columns."""
+
+    def __init__(self, df, columns, max_cached_masks=256):
+        self.n_rows = len(df)
+        self.codes = {}
+        self.values = {}
+        self.lookup = {}
+        for col in columns:
+            codes, values = _encode(df[col])
+            self.codes[col] = codes
+            self.values[col] = values
+            self.lookup[col] = {value: code for code, value in enumerate(values)}
+        self._masks = LRUCache(max_entries=max_cached_masks, max_bytes=256 * 1024 ** 2)
+        self._options = LRUCache(max_entries=max_cached_masks)
+
+    def nbytes(self):
+        return sum(codes.nbytes for codes in self.codes.values())
+
+    # -------------------------------
+    # Masks
+    # -------------------------------
+    def pack(self, rows):
+        """Pack a boolean row array into a bitset."""
+        return np.packbits(np.asarray(rows, dtype=bool))
+
+    def span(self, start, stop):
+        """Rows ``start <= row < stop`` (e.g. a date range of date-sorted rows), without a scan."""
+        bits = np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+        if start < stop:
+            first, last = start // 8, (stop - 1) // 8
+            bits[first:last + 1] = 0xFF
+            # packbits is big-endian: row 8k is the high bit of byte k
+            bits[first] &= 0xFF >> (start % 8)
+            bits[last] &= (0xFF << (7 - (stop - 1) % 8)) & 0xFF
+        return bits
+
+    def take(self, positions):
+        """Rows at ``positions``."""
+        rows = np.zeros(self.n_rows, dtype=bool)
+        rows[positions] = True
+        return self.pack(rows)
+
+    def rows(self, mask):
+        """Unpack a bitset into a boolean row array (all rows if ``mask`` is None)."""
+        if mask is None:
+            return np.ones(self.n_rows, dtype=bool)
+        return np.unpackbits(mask, count=self.n_rows).astype(bool)
+
+    def bitset(self, column, value):
+        """Rows where ``column == value``."""
+        key = ("value", column, value)
+        bits = self._masks.get(key)
+        if bits is None:
+            code = self.lookup[column].get(value, -2)
+            bits = self.pack(self.codes[column] == code)
+            self._masks.put(key, bits, nbytes=bits.nbytes)
+        return bits
+
+    def mask(self, column, values, empty="all"):
+        """Rows where ``column`` is any of ``values``.
+
+        An empty selection is None (no restriction) when ``empty="all"``, as
+        in the "pick to narrow down" sidebars, or an all-clear bitset when
+        ``empty="none"``, matching ``isin([])``.
+        """
+        if not values:
+            if empty == "none":
+                return np.zeros((self.n_rows + 7) // 8, dtype=np.uint8)
+            return None
+        selection = frozenset(values)
+        key = ("any", column, selection)
+        bits = self._masks.get(key)
+        if bits is None:
+            bits = np.bitwise_or.reduce([self.bitset(column, value) for value in selection])
+            self._masks.put(key, bits, nbytes=bits.nbytes)
+        return bits
+
+    @staticmethod
+    def combine(*masks):
+        """AND of the given masks, skipping None (no restriction)."""
+        masks = [m for m in masks if m is not None]
+        if not masks:
+            return None
+        if len(masks) == 1:
+            return masks[0]
+        return np.bitwise_and.reduce(masks)
+
+    def select(self, empty="all", **filters):
+        """AND of one mask per column, e.g. ``select(Region=[...], State=[...])``."""
+        return self.combine(*(self.mask(col, values, empty) for col, values in filters.items()))
+
+    def filter(self, df, mask, columns=None):
+        """Rows of ``df`` (the indexed frame) selected by ``mask``.
+
+        Only ``columns`` (default: all) are copied, so callers that need a
+        few columns of a filtered frame do not materialize the rest.
+        """
+        if columns is not None:
+            df = df[list(columns)]
+        if mask is None:
+            return df.copy(deep=False)
+        return df[self.rows(mask)]
+
+    def positions(self, mask):
+        """Row positions selected by ``mask``."""
+        return np.flatnonzero(self.rows(mask))
+
+    def count(self, mask):
+        """Number of rows selected by ``mask``."""
+        if mask is None:
+            return self.n_rows
+        return int(np.count_nonzero(np.unpackbits(mask, count=self.n_rows)))
+
+    # -------------------------------
+    # Dependent option lists
+    # -------------------------------
+    def options(self, column, within=None):
+        """Distinct values of ``column`` among the rows in ``within``, in sorted order."""
+        key = (column, None if within is None else file_digest(within.tobytes()))
+        values = self._options.get(key)
+        if values is None:
+            codes = self.codes[column]
+            if within is not None:
+                codes = codes[self.rows(within)]
+            present = np.bincount(codes[codes >= 0], minlength=len(self.values[column]))
+            values = [self.values[column][code] for code in np.flatnonzero(present)]
+            self._options.put(key, values, nbytes=8 * len(values))
+        return values
+
+
+def get_bitmap_index(df, columns):
+    """Return the bitmap index of ``columns`` for the full dataset ``df``."""
+    key = (dataset_id(df), tuple(columns))
+    index = INDEXES.get(key)
+    if index is None:
+        index = BitmapIndex(df, columns)
+        INDEXES.put(key, index, nbytes=index.nbytes())
+    return index
@@ -0,0 +1,100 @@
+"""Pre-aggregated sales cube behind the Superstore dashboard.
+
+Every chart in ``dashboard.py`` is a sum over a handful of dimensions, so the
+rows are aggregated once per dataset at Region x State x City x Segment x
+Category x Sub-Category x month grain.  Filters and charts then work on the
+cube, whose size depends on the number of distinct combinations rather than
+the number of orders.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.dateindex import get_date_index
+from dashboard_core.ingest import LRUCache, dataset_id, frame_nbytes
+
+CUBE_DIMENSIONS = ["Region", "State", "City", "Segment", "Category", "Sub-Category"]
+CUBE_MEASURES = ["Sales", "Profit", "Quantity"]
+COUNT_MEASURE = "Orders"
+MONTH = "Month"
+
+# Cubes are small, but one per loaded dataset is plenty
+CUBES = LRUCache(max_entries=4)
+
+
+def aggregate(rows, date_col="Order Date", dims=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+    """Aggregate raw ``rows`` to cube grain (``dims`` x month)."""
+    keys = [rows[col] for col in dims] + [rows[date_col].dt.to_period("M").rename(MONTH)]
+    grouped = rows.groupby(keys, observed=True, sort=False)
+    cube = grouped[measures].sum()
+    cube[COUNT_MEASURE] = grouped.size()
+    return cube.reset_index()
+
+
+class SalesCube:
+    """Month-grain cube over a sales frame, with day-accurate date slicing."""
+
+    def __init__(self, df, date_col="Order Date", dims=CUBE_DIMENSIONS, measures=CUBE_MEASURES):
+        self.rows = df
+        self.date_col = date_col
+        self.dims = list(dims)
+        self.measures = list(measures)
+        self.cube = aggregate(df, date_col, self.dims, self.measures)
+        self.dates = get_date_index(df, date_col)
+
+    def nbytes(self):
+        return frame_nbytes(self.cube)
+
+    def slice(self, start=None, end=None, **filters):
+        """Cube rows for orders dated ``start``..``end`` (inclusive) matching ``filters``.
+
+        ``filters`` maps a dimension to the selected values; empty selections
+        are ignored.  Months fully inside the range come straight from the
+        cube; only the partially covered boundary months are re-aggregated
+        from raw rows, found by binary search in the date index.
+        """
+        cube = self.cube
+        if start is not None or end is not None:
+            months = cube[MONTH]
+            first_date, last_date = self.dates.bounds()
+            start = pd.Timestamp(start) if start is not None else first_date
+            end = pd.Timestamp(end) if end is not None else last_date
+            first, last = start.to_period("M"), end.to_period("M")
+            full_first = first if start <= first.start_time else first + 1
+            full_last = last if end >= last.end_time.normalize() else last - 1
+
+            parts = [cube[(months >= full_first) & (months <= full_last)]]
+            # Boundary rows are the ends of the date range outside the full months
+            lo, hi = self.dates.range(start, end)
+            inner_lo, inner_hi = self.dates.range(full_first.start_time, full_last.end_time)
+            inner_lo = min(max(inner_lo, lo), hi)
+            inner_hi = max(min(inner_hi, hi), inner_lo)
+            if inner_lo > lo or hi > inner_hi:
+                positions = np.concatenate([self.dates.positions(lo, inner_lo),
+                                            self.dates.positions(inner_hi, hi)])
+                rows = self.rows[[*self.dims, self.date_col, *self.measures]].iloc[positions]
+                parts.append(aggregate(rows, self.date_col, self.dims, self.measures))
+            cube = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+        for dim, values in filters.items():
+            if values:
+                cube = cube[cube[dim].isin(values)]
+        return cube
+
+    @staticmethod
+    def rollup(cube_slice, by, measures=None):
+        """Sum a cube slice up to the ``by`` dimensions."""
+        measures = measures or CUBE_MEASURES + [COUNT_MEASURE]
+        return (cube_slice.groupby(by, observed=True)[measures]
+                .sum()
+                .reset_index())
+
+
+def get_cube(df, date_col="Order Date"):
+    """Return the cube for the full dataset ``df``, building it on first use."""
+    key = (dataset_id(df), date_col)
+    cube = CUBES.get(key)
+    if cube is None:
+        cube = SalesCube(df, date_col)
+        CUBES.put(key, cube, nbytes=cube.nbytes())
+    return cube
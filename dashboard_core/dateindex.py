@@ -0,0 +1,211 @@
+"""Sorted date index with prefix sums for date-range queries.
+
+A date range over rows sorted by date is a contiguous run, so its bounds
+are two binary searches and its rows a zero-copy slice.  Running totals of
+the measures over the same order answer "sum of Sales between two dates" as
+the difference of two prefix sums, and daily to yearly series as differences
+at the period boundaries, without touching the rows.
+
+The Superstore snapshots are stored sorted by ``Order Date``, so the index
+over them needs no permutation; other frames are indexed through a stable
+argsort.  Per-dimension totals (e.g. Sales in one Region over a date range)
+use the same trick over the rows grouped by dimension value, sorted by date
+within each group; they are built the first time a dimension is queried.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.ingest import LRUCache, dataset_id
+from dashboard_core.timeseries import PERIOD
+
+DATE_MEASURES = ["Sales", "Profit", "Quantity"]
+
+DATE_INDEXES = LRUCache(max_entries=4)
+
+# Weeks start on Monday, as in dashboard_core.timeseries
+_PERIOD_FREQ = {"W": "W-SUN"}
+
+
+def _prefix(values):
+    """Running totals with a leading 0, so ``p[hi] - p[lo]`` sums rows ``lo:hi``."""
+    prefix = np.zeros(len(values) + 1, dtype=np.result_type(values.dtype, np.int64))
+    np.cumsum(values, out=prefix[1:])
+    return prefix
+
+
+class _DimensionIndex:
+    """Rows grouped by one dimension's values, date-sorted within each group."""
+
+    def __init__(self, series, dates, order, measures):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, values = series.cat.codes.to_numpy(), list(series.cat.categories)
+        else:
+            codes, uniques = pd.factorize(series, sort=True)
+            values = list(uniques)
+        if order is not None:
+            codes = codes[order]
+        self.lookup = {value: code for code, value in enumerate(values)}
+        # Stable sort by code keeps each group in date order
+        by_code = np.argsort(codes, kind="stable")
+        self.offsets = np.searchsorted(codes[by_code], np.arange(len(values) + 1))
+        self.dates = dates[by_code]
+        self.prefix = {name: _prefix(column[by_code]) for name, column in measures.items()}
+
+    def runs(self, values, start, end):
+        """(lo, hi) runs of the rows with any of ``values`` dated ``start``..``end``."""
+        for value in values:
+            code = self.lookup.get(value)
+            if code is None:
+                continue
+            first, last = self.offsets[code], self.offsets[code + 1]
+            dates = self.dates[first:last]
+            yield (first + np.searchsorted(dates, start, side="left"),
+                   first + np.searchsorted(dates, end, side="right"))
+
+    def nbytes(self):
+        return self.dates.nbytes + sum(p.nbytes for p in self.prefix.values())
+
+
+class DateIndex:
+    """Binary-searchable date order of a frame with running totals of ``measures``."""
+
+    def __init__(self, df, date_col="Order Date", measures=DATE_MEASURES):
+        self.rows = df
+        self.date_col = date_col
+        dates = df[date_col].to_numpy(dtype="datetime64[ns]")
+        if len(dates) and dates[-1] >= dates[0] and (dates[1:] >= dates[:-1]).all():
+            self.order = None   # already sorted: positions are row numbers
+        else:
+            # NaT sorts last; rows without a date are left out of the index
+            order = np.argsort(dates, kind="stable")
+            self.order = order[:len(order) - np.count_nonzero(np.isnat(dates))]
+            dates = dates[self.order]
+        self.dates = dates
+        self.measures = {name: self._sorted(df[name].to_numpy())
+                         for name in measures if name in df.columns}
+        self.prefix = {name: _prefix(values) for name, values in self.measures.items()}
+        self._dimensions = {}
+
+    def _sorted(self, values):
+        return values if self.order is None else values[self.order]
+
+    def nbytes(self):
+        total = self.dates.nbytes + sum(p.nbytes for p in self.prefix.values())
+        if self.order is not None:
+            total += self.order.nbytes + sum(v.nbytes for v in self.measures.values())
+        return total + sum(d.nbytes() for d in self._dimensions.values())
+
+    # -------------------------------
+    # Ranges
+    # -------------------------------
+    def bounds(self):
+        """(first date, last date) of the indexed rows, or (NaT, NaT) if there are none."""
+        if not len(self.dates):
+            return pd.NaT, pd.NaT
+        return pd.Timestamp(self.dates[0]), pd.Timestamp(self.dates[-1])
+
+    def range(self, start=None, end=None):
+        """(lo, hi) sorted positions of the rows dated ``start``..``end`` (inclusive)."""
+        lo = 0 if start is None else np.searchsorted(self.dates, np.datetime64(start, "ns"), "left")
+        hi = (len(self.dates) if end is None
+              else np.searchsorted(self.dates, np.datetime64(end, "ns"), "right"))
+        return int(lo), int(max(lo, hi))
+
+    def positions(self, lo, hi):
+        """Row positions (in the indexed frame) of sorted positions ``lo:hi``."""
+        return np.arange(lo, hi) if self.order is None else self.order[lo:hi]
+
+    def slice(self, start=None, end=None, columns=None):
+        """Rows dated ``start``..``end``; a zero-copy slice when the frame is date-sorted."""
+        df = self.rows if columns is None else self.rows[list(columns)]
+        lo, hi = self.range(start, end)
+        if self.order is None:
+            return df.iloc[lo:hi]
+        return df.iloc[np.sort(self.order[lo:hi])]
+
+    # -------------------------------
+    # Totals
+    # -------------------------------
+    def _dimension(self, dim):
+        index = self._dimensions.get(dim)
+        if index is None:
+            index = _DimensionIndex(self.rows[dim], self.dates, self.order, self.measures)
+            self._dimensions[dim] = index
+        return index
+
+    def _runs(self, start, end, filters):
+        """(sorted dates, prefix sums, [(lo, hi), ...]) covering a date range and filters.
+
+        None when more than one dimension is filtered, which the running
+        totals cannot answer.
+        """
+        active = {dim: values for dim, values in filters.items() if values}
+        if len(active) > 1:
+            return None
+        if not active:
+            return self.dates, self.prefix, [self.range(start, end)]
+        (dim, values), = active.items()
+        if not len(self.dates):
+            return self.dates, self.prefix, []
+        start = np.datetime64(start if start is not None else self.dates[0], "ns")
+        end = np.datetime64(end if end is not None else self.dates[-1], "ns")
+        index = self._dimension(dim)
+        return index.dates, index.prefix, list(index.runs(values, start, end))
+
+    def totals(self, start=None, end=None, **filters):
+        """Measure sums and row count over a date range, or None if it needs the rows.
+
+        ``filters`` maps dimensions to selected values (empty selections are
+        ignored); only a single filtered dimension can be answered from the
+        running totals.
+        """
+        found = self._runs(start, end, filters)
+        if found is None:
+            return None
+        _, prefix, runs = found
+        totals = {name: sum(p[hi] - p[lo] for lo, hi in runs) for name, p in prefix.items()}
+        totals["Orders"] = sum(hi - lo for lo, hi in runs)
+        return totals
+
+    def series(self, start=None, end=None, freq="M", **filters):
+        """Per-period ``totals`` indexed by period start, or None if it needs the rows.
+
+        ``freq`` is a ``timeseries.GRANULARITIES`` frequency; periods cut by
+        ``start``/``end`` only count the rows inside the range.
+        """
+        found = self._runs(start, end, filters)
+        if found is None:
+            return None
+        dates, prefix, runs = found
+        lo, hi = self.range(start, end)
+        if lo == hi:
+            starts = pd.DatetimeIndex([])
+        else:
+            starts = pd.period_range(pd.Timestamp(self.dates[lo]), pd.Timestamp(self.dates[hi - 1]),
+                                     freq=_PERIOD_FREQ.get(freq, freq)).start_time
+        boundaries = starts[1:].to_numpy(dtype="datetime64[ns]")
+
+        sums = {name: np.zeros(len(starts), dtype=p.dtype) for name, p in prefix.items()}
+        orders = np.zeros(len(starts), dtype=np.int64)
+        for run_lo, run_hi in runs:
+            # Period boundaries inside the run, found by binary search
+            edges = np.concatenate([[run_lo], run_lo + np.searchsorted(
+                dates[run_lo:run_hi], boundaries, side="left"), [run_hi]])
+            for name, p in prefix.items():
+                sums[name] += np.diff(p[edges])
+            orders += np.diff(edges)
+        present = orders > 0   # like a groupby, periods without orders are left out
+        return pd.DataFrame({**{name: values[present] for name, values in sums.items()},
+                             "Orders": orders[present]},
+                            index=pd.DatetimeIndex(starts[present], name=PERIOD))
+
+
+def get_date_index(df, date_col="Order Date"):
+    """Return the date index of the full dataset ``df``, building it on first use."""
+    key = (dataset_id(df), date_col)
+    index = DATE_INDEXES.get(key)
+    if index is None:
+        index = DateIndex(df, date_col)
+        DATE_INDEXES.put(key, index, nbytes=index.nbytes())
+    return index
@@ -0,0 +1,141 @@
+"""Deferred, chunked and cached data exports for download buttons.
+
+``df.to_csv(...).encode()`` next to a ``st.download_button`` serializes the
+whole frame on every rerun, even when nobody clicks.  ``export_button``
+hands Streamlit a callable instead, so the file is only generated on click.
+Files are written in row chunks to a temporary directory (never holding a
+full text copy in memory) and reused for the same dataset, filter state and
+format.
+"""
+
+import gzip
+import os
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import streamlit as st
+
+from dashboard_core.ingest import atomic_write, file_digest, frame_state
+
+CHUNK_ROWS = 100_000
+EXCEL_MAX_ROWS = 1_048_575          # one row is the header
+MAX_EXPORT_FILES = 32
+EXPORT_DIR = Path(tempfile.gettempdir()) / "dashboard_exports"
+
+
+# -------------------------------
+# Chunked writers
+# -------------------------------
+def _chunks(df, chunk_rows=None):
+    chunk_rows = chunk_rows or CHUNK_ROWS
+    for start in range(0, max(len(df), 1), chunk_rows):
+        yield start, df.iloc[start:start + chunk_rows]
+
+
+def write_csv(df, path, compress=False):
+    opener = gzip.open if compress else open
+    with opener(path, "wb") as fh:
+        for start, chunk in _chunks(df):
+            fh.write(chunk.to_csv(index=False, header=start == 0).encode("utf-8"))
+
+
+def write_parquet(df, path):
+    writer = None
+    try:
+        for _, chunk in _chunks(df):
+            table = pa.Table.from_pandas(chunk, preserve_index=False,
+                                         schema=writer.schema if writer else None)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def write_excel(df, path):
+    with pd.ExcelWriter(path, engine="openpyxl") as writer:
+        for start, chunk in _chunks(df):
+            chunk.to_excel(writer, index=False, header=start == 0,
+                           startrow=0 if start == 0 else start + 1)
+
+
+# label -> (extension, mime, writer)
+FORMATS = {
+    "CSV": (".csv", "text/csv", write_csv),
+    "CSV (gzip)": (".csv.gz", "application/gzip",
+                   lambda df, path: write_csv(df, path, compress=True)),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", write_parquet),
+    "Excel": (".xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+              write_excel),
+}
+
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime
+    except FileNotFoundError:   # pruned or replaced by another session meanwhile
+        return None
+
+
+def _prune(directory, keep=MAX_EXPORT_FILES):
+    # In-progress writes (.tmp) belong to their writer
+    stamped = [(_mtime(path), path) for path in directory.glob("*") if path.suffix != ".tmp"]
+    stamped = [(mtime, path) for mtime, path in stamped if mtime is not None]
+    for _, stale in sorted(stamped, reverse=True)[keep:]:
+        stale.unlink(missing_ok=True)
+
+
+def export_path(df, fmt, state=None, writer=None):
+    """Write ``df`` as ``fmt`` (once per dataset/filter state) and return the file path.
+
+    ``writer(fmt, path)``, if given, writes the file instead (e.g. straight
+    from a SQL query); ``df`` is then unused and ``state`` is required.
+    """
+    extension, _, write = FORMATS[fmt]
+    state = frame_state(df) if state is None else state
+    path = EXPORT_DIR / (file_digest(repr((state, fmt)).encode()) + extension)
+    try:
+        os.utime(path)   # keep recently used exports from being pruned
+        return path
+    except FileNotFoundError:
+        pass
+    EXPORT_DIR.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path) as tmp_path:
+        if writer is None:
+            write(df, tmp_path)
+        else:
+            writer(fmt, tmp_path)
+    _prune(EXPORT_DIR)
+    return path
+
+
+# -------------------------------
+# Widget
+# -------------------------------
+def export_button(df, file_stem, key, label="Download Data", formats=("CSV",), state=None,
+                  writer=None, **kwargs):
+    """Download button whose file is only generated when clicked.
+
+    With more than one entry in ``formats`` a format picker is shown next to
+    the button.  ``state`` identifies the exported rows; it defaults to
+    ``frame_state(df)``.  ``writer`` is passed on to ``export_path``; with a
+    writer, the caller decides which ``formats`` it can produce.
+    """
+    formats = [fmt for fmt in formats if fmt != "Excel" or df is None or len(df) <= EXCEL_MAX_ROWS]
+    fmt = formats[0]
+    if len(formats) > 1:
+        fmt = st.selectbox("Format", formats, key=f"{key}_format",
+                           label_visibility="collapsed")
+    extension, mime, _ = FORMATS[fmt]
+
+    def generate():
+        # A handle rather than the bytes: the file is read from disk as it is
+        # sent, and stays readable even if it is pruned meanwhile
+        return open(export_path(df, fmt, state, writer), "rb")
+
+    st.download_button(label, data=generate, file_name=file_stem + extension,
+                       mime=mime, key=key, **kwargs)
@@ -0,0 +1,122 @@
+"""Paginated records view with server-side search, sort and gradient colours.
+
+``df.style.background_gradient`` builds HTML/CSS for every cell of the
+frame, which is the slowest thing on the pages that render whole tables.
+``paged_grid`` searches and sorts the full frame with vectorized pandas
+operations but only materializes and styles the visible page.  Gradient
+colours come from column-level min/max, so they match what a full-table
+gradient would show.
+"""
+
+import matplotlib
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dashboard_core.ingest import file_digest, frame_state
+from dashboard_core.sections import memoize
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+# -------------------------------
+# Search and sort (full frame)
+# -------------------------------
+def search_mask(df, query):
+    """Rows where any text column contains ``query`` (case-insensitive)."""
+    mask = np.zeros(len(df), dtype=bool)
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Match against the categories once, then look codes up
+            hits = series.cat.categories.astype(str).str.contains(query, case=False, regex=False)
+            mask |= np.isin(series.cat.codes.to_numpy(), np.flatnonzero(hits))
+        elif pd.api.types.is_object_dtype(series) or pd.api.types.is_string_dtype(series):
+            mask |= series.astype(str).str.contains(query, case=False, regex=False).to_numpy()
+    return mask
+
+
+def row_order(df, query="", sort_by=None, ascending=True, rows=None):
+    """Positions of the rows (among ``rows``, default all) matching ``query``, ordered by ``sort_by``."""
+    positions = np.arange(len(df)) if rows is None else np.asarray(rows)
+    if query:
+        positions = positions[search_mask(df, query)[positions]]
+    if sort_by is not None:
+        keys = df[sort_by].iloc[positions].reset_index(drop=True)
+        order = keys.sort_values(ascending=ascending, kind="stable", na_position="last").index
+        positions = positions[order.to_numpy()]
+    return positions
+
+
+# -------------------------------
+# Gradient colours (visible page only)
+# -------------------------------
+def column_ranges(df, rows=None):
+    """(min, max) of every numeric column over the full frame (or its ``rows``)."""
+    numeric = df.select_dtypes("number")
+    if rows is not None:
+        numeric = numeric.iloc[rows]
+    return {col: (numeric[col].min(), numeric[col].max()) for col in numeric.columns}
+
+
+def _gradient_css(values, vmin, vmax, cmap):
+    values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float)
+    span = vmax - vmin if vmax > vmin else 1.0
+    rgba = cmap(np.clip((values - vmin) / span, 0, 1))
+    # Same light/dark text switch as Styler.background_gradient
+    luminance = 0.2126 * rgba[:, 0] + 0.7152 * rgba[:, 1] + 0.0722 * rgba[:, 2]
+    hex_colours = [matplotlib.colors.rgb2hex(c) for c in rgba]
+    return [
+        "" if np.isnan(v) else
+        f"background-color: {bg}; color: {'#f1f1f1' if lum < 0.408 else '#000000'}"
+        for v, bg, lum in zip(values, hex_colours, luminance)
+    ]
+
+
+def style_page(page, ranges, cmap_name):
+    cmap = matplotlib.colormaps[cmap_name]
+    styles = pd.DataFrame("", index=page.index, columns=page.columns)
+    for col, (vmin, vmax) in ranges.items():
+        if col in page.columns:
+            styles[col] = _gradient_css(page[col], vmin, vmax, cmap)
+    return page.style.apply(lambda _: styles, axis=None)
+
+
+# -------------------------------
+# Widget
+# -------------------------------
+def paged_grid(df, key, cmap=None, page_size=50, rows=None):
+    """Render ``df`` as a searchable, sortable, paginated table.
+
+    Only the current page is copied and styled; ``cmap`` (a Matplotlib
+    colormap name) adds a background gradient to numeric columns.  ``rows``
+    (row positions) limits the table to a filtered subset without copying
+    it out of ``df``.
+    """
+    state = frame_state(df)
+    if rows is not None:
+        state = (state, file_digest(np.asarray(rows).tobytes()))
+    search_col, sort_col, order_col, size_col = st.columns([3, 2, 1, 1])
+    query = search_col.text_input("Search", key=f"{key}_search", placeholder="Search records")
+    sort_by = sort_col.selectbox("Sort by", [None, *df.columns], key=f"{key}_sort",
+                                 format_func=lambda c: "(original order)" if c is None else c)
+    ascending = order_col.radio("Order", ["Asc", "Desc"], key=f"{key}_order") == "Asc"
+    page_size = size_col.selectbox("Rows", PAGE_SIZES, key=f"{key}_size",
+                                   index=PAGE_SIZES.index(page_size) if page_size in PAGE_SIZES else 1)
+
+    positions = memoize(f"grid:{key}", (state, query, sort_by, ascending),
+                        lambda: row_order(df, query, sort_by, ascending, rows))
+    pages = max(1, -(-len(positions) // page_size))
+    if st.session_state.get(f"{key}_page", 1) > pages:
+        # A narrower search can leave the remembered page out of range
+        st.session_state[f"{key}_page"] = pages
+    page_no = st.number_input("Page", min_value=1, max_value=pages, step=1, key=f"{key}_page")
+    start = (page_no - 1) * page_size
+    page = df.iloc[positions[start:start + page_size]]
+
+    if cmap is not None:
+        ranges = memoize(f"grid_ranges:{key}", state, lambda: column_ranges(df, rows))
+        page = style_page(page, ranges, cmap)
+    st.dataframe(page, use_container_width=True)
+    st.caption(f"Page {page_no:,} of {pages:,} · rows {min(start + 1, len(positions)):,}–"
+               f"{min(start + page_size, len(positions)):,} of {len(positions):,}")
@@ -0,0 +1,418 @@
+"""Content-hash keyed ingestion cache shared by every dashboard's uploader.
+
+Streamlit re-executes the whole script on each widget interaction, so an
+inline ``pd.read_csv(uploaded_file)`` re-parses the file on every click.
+``load_table`` keys parsed frames on a digest of the uploaded bytes plus the
+parse options and keeps them in a process-wide, size-bounded LRU.
+"""
+
+import hashlib
+import io
+import itertools
+import multiprocessing
+import os
+import tempfile
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, suppress
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from dashboard_core.excel import read_excel
+
+# -------------------------------
+# Defaults
+# -------------------------------
+DEFAULT_MAX_ENTRIES = 8
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3   # 2 GiB of parsed frames per process
+
+CSV_EXTENSIONS = (".csv", ".txt")
+EXCEL_EXTENSIONS = (".xlsx", ".xls")
+PARQUET_EXTENSIONS = (".parquet",)
+
+
+def file_digest(data):
+    """Return a hex digest identifying ``data`` (bytes)."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def upload_digest(upload):
+    """``file_digest`` of an uploaded file's bytes, hashed in place rather than copied out."""
+    if hasattr(upload, "getbuffer"):
+        with upload.getbuffer() as view:
+            return file_digest(view)
+    return file_digest(upload.getvalue())
+
+
+@contextmanager
+def atomic_write(path):
+    """Yield a new temporary path next to ``path``; once the block succeeds it replaces ``path``.
+
+    Every writer gets its own file, so sessions building the same output at
+    once (threads of one server process, or several processes) never write
+    into each other's file, and readers only ever see a complete one.
+    """
+    path = os.fspath(path)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(path)),
+                                    prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(tmp_path)
+        raise
+
+
+def frame_nbytes(df):
+    """Approximate in-memory size of ``df`` in bytes."""
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def dataset_id(df):
+    """Stable id of the dataset ``df`` was loaded from (see ``load_table``).
+
+    Frames derived from a loaded frame (filters, copies) inherit its id, so
+    only pass the full dataset to caches keyed on it.
+    """
+    ds_id = df.attrs.get("dataset_id")
+    if ds_id is None:
+        ds_id = file_digest(pd.util.hash_pandas_object(df).to_numpy().tobytes())
+        df.attrs["dataset_id"] = ds_id
+    return ds_id
+
+
+def frame_state(df):
+    """Cheap identity of a (possibly filtered) frame.
+
+    Frames derived from a loaded dataset are identified by its id, their
+    columns and row labels; anything else (e.g. a small aggregate) falls back
+    to hashing its contents.
+    """
+    ds_id = df.attrs.get("dataset_id")
+    if ds_id is None:
+        return (None, tuple(df.columns), dataset_id(df.copy(deep=False)))
+    if isinstance(df.index, pd.RangeIndex):
+        rows = (df.index.start, df.index.stop, df.index.step)
+    else:
+        rows = file_digest(np.asarray(df.index).tobytes())
+    return (ds_id, tuple(df.columns), len(df), rows)
+
+
+# Every cache together stays under this many bytes: when the total goes
+# over, the least recently used entries of any cache are evicted first
+PROCESS_MAX_BYTES = int(float(os.environ.get("DASHBOARD_MEMORY_MB", 3 * 1024)) * 1024 ** 2)
+
+_caches = weakref.WeakSet()   # every live LRUCache, for the process budget
+_caches_lock = threading.Lock()
+_clock = itertools.count()    # process-wide recency, to compare entries across caches
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by entry count and bytes.
+
+    Values are DataFrames by default; other values must pass ``nbytes``.
+    Caches also share ``PROCESS_MAX_BYTES``: a ``put`` that takes the
+    process over it evicts the least recently used entries of any cache.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()   # key -> (value, nbytes, last use)
+        self._nbytes = 0
+        self._lock = threading.Lock()
+        with _caches_lock:
+            _caches.add(self)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries[key] = (entry[0], entry[1], next(_clock))
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, nbytes=None):
+        if nbytes is None:
+            nbytes = frame_nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self._nbytes -= self._entries.pop(key)[1]
+            self._entries[key] = (value, nbytes, next(_clock))
+            self._nbytes += nbytes
+            # Always keep the newest entry, even if it alone exceeds the budget.
+            while len(self._entries) > 1 and (
+                    len(self._entries) > self.max_entries or self._nbytes > self.max_bytes):
+                self._evict()
+        enforce_process_budget()
+
+    def _evict(self):
+        _, (_, evicted, _) = self._entries.popitem(last=False)
+        self._nbytes -= evicted
+        self.evictions += 1
+
+    def oldest_use(self):
+        """Last use of the least recently used entry that may be evicted (None if none may)."""
+        with self._lock:
+            if len(self._entries) < 2:
+                return None
+            return next(iter(self._entries.values()))[2]
+
+    def evict_oldest(self):
+        """Evict the least recently used entry (the newest one is always kept)."""
+        with self._lock:
+            if len(self._entries) > 1:
+                self._evict()
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def live_caches():
+    """Every ``LRUCache`` still in use in this process."""
+    with _caches_lock:
+        return list(_caches)
+
+
+def cached_bytes():
+    """Bytes held by every cache of the process."""
+    return sum(cache.nbytes for cache in live_caches())
+
+
+def enforce_process_budget(max_bytes=None):
+    """Evict least recently used entries, across caches, until they fit ``PROCESS_MAX_BYTES``."""
+    max_bytes = PROCESS_MAX_BYTES if max_bytes is None else max_bytes
+    caches = live_caches()
+    while sum(cache.nbytes for cache in caches) > max_bytes:
+        candidates = [(use, i) for i, cache in enumerate(caches)
+                      if (use := cache.oldest_use()) is not None]
+        if not candidates:
+            return
+        caches[min(candidates)[1]].evict_oldest()
+
+
+# One cache per server process, shared by every session and every script.
+CACHE = LRUCache()
+
+
+def _options_key(reader, prepare, options):
+    prepare_id = None
+    if prepare is not None:
+        # Scripts are re-executed on every rerun, so compare by name, not identity.
+        prepare_id = f"{prepare.__module__}.{prepare.__qualname__}"
+    return (reader, prepare_id, tuple(sorted((k, repr(v)) for k, v in options.items())))
+
+
+def _detect_reader(name):
+    lowered = name.lower().strip()
+    if lowered.endswith(EXCEL_EXTENSIONS):
+        return "excel"
+    if lowered.endswith(CSV_EXTENSIONS):
+        return "csv"
+    if lowered.endswith(PARQUET_EXTENSIONS):
+        return "parquet"
+    raise ValueError(f"Unsupported file type: {name!r}")
+
+
+# A UTF-8 byte order mark as decoded by UTF-8 readers, and by single-byte (e.g. Latin-1) ones
+_BOMS = ("\ufeff", "\u00ef\u00bb\u00bf")
+
+
+def _strip_bom(col):
+    for bom in _BOMS:
+        if isinstance(col, str) and col.startswith(bom):
+            return col[len(bom):]
+    return col
+
+
+def read_csv(source, usecols=None, **options):
+    """``pd.read_csv``, ignoring ``usecols`` entries the file does not have (like ``read_excel``).
+
+    A byte order mark in front of the first header is dropped, whatever the
+    encoding, so the first column keeps its name.
+    """
+    if isinstance(usecols, (list, tuple, set)):
+        wanted = set(usecols)
+        usecols = lambda col: _strip_bom(col) in wanted   # noqa: E731
+    df = pd.read_csv(source, usecols=usecols, **options)
+    if len(df.columns) and _strip_bom(df.columns[0]) != df.columns[0]:
+        df = df.rename(columns={df.columns[0]: _strip_bom(df.columns[0])})
+    return df
+
+
+def _parse(buffer, reader, options):
+    if reader == "csv":
+        return read_csv(buffer, **options)
+    if reader == "excel":
+        return read_excel(buffer, **options)
+    if reader == "parquet":
+        return pd.read_parquet(buffer, **options)
+    raise ValueError(f"Unknown reader: {reader!r}")
+
+
+def _source(source, reader, csv_options, excel_options, prepare):
+    """(cache key, bytes or path to parse, reader, reader options) for ``source``."""
+    if hasattr(source, "getvalue"):
+        name = source.name
+        data = source.getvalue()
+        identity = ("bytes", file_digest(data))
+    else:
+        name = os.fspath(source)
+        data = None
+        stat = os.stat(name)
+        identity = ("path", os.path.abspath(name), stat.st_size, stat.st_mtime_ns)
+
+    if reader == "auto":
+        reader = _detect_reader(name)
+    options = {"csv": csv_options, "excel": excel_options}.get(reader) or {}
+    key = (identity, _options_key(reader, prepare, options))
+    return key, (data if data is not None else name), reader, options
+
+
+def _load(payload, reader, options, prepare):
+    """Parse (and prepare) one file; ``load_tables`` runs this in worker processes."""
+    df = _parse(io.BytesIO(payload) if isinstance(payload, bytes) else payload, reader, options)
+    return prepare(df) if prepare is not None else df
+
+
+def load_table(source, *, reader="auto", csv_options=None, excel_options=None,
+               prepare=None, cache=None):
+    """Parse ``source`` into a DataFrame, reusing earlier parses of the same data.
+
+    ``source`` is a Streamlit ``UploadedFile`` (or any object with ``name`` and
+    ``getvalue()``) or a filesystem path.  Uploads are keyed on a digest of
+    their bytes; paths on their size and modification time so the file is not
+    re-hashed on every rerun.  ``csv_options``/``excel_options`` are forwarded
+    to ``pd.read_csv``/``pd.read_excel`` depending on the detected file type,
+    and ``prepare`` (if given) is applied once to the fresh frame before
+    caching, so type coercion is cached too.
+
+    The cached frame is shared, so a shallow copy is returned: callers may add
+    or replace columns freely but must not modify values in place.  The copy
+    carries ``attrs["dataset_id"]``, a stable id other caches key on.
+    """
+    cache = CACHE if cache is None else cache
+    key, payload, reader, options = _source(source, reader, csv_options, excel_options, prepare)
+
+    df = cache.get(key)
+    if df is None:
+        df = _load(payload, reader, options, prepare)
+        df.attrs["dataset_id"] = file_digest(repr(key).encode())
+        cache.put(key, df)
+    return df.copy(deep=False)
+
+
+def _runs_in_worker(prepare):
+    # Worker processes import functions by module and name: functions defined
+    # in a Streamlit script (module "__main__") or inline cannot be sent there
+    return prepare is None or (prepare.__module__ != "__main__" and "<" not in prepare.__qualname__)
+
+
+def load_tables(sources, *, reader="auto", csv_options=None, excel_options=None,
+                prepare=None, cache=None, max_workers=None):
+    """Parse several files concurrently and concatenate them, like one ``load_table``.
+
+    Each file is cached on its own as in ``load_table``, so adding a file to
+    an upload only parses the new one.  Files not cached yet are parsed in a
+    process pool of up to ``max_workers`` (default: one per CPU), with
+    ``prepare`` (type coercion, derived columns) run in the worker too when
+    it is importable from a module; functions defined in a dashboard script
+    run in this process after the parse.  Categorical columns keep a single
+    dictionary across files (see ``concat_frames``).  The combined frame is
+    cached under the list of files, in upload order.
+    """
+    sources = list(sources)
+    if len(sources) == 1:
+        return load_table(sources[0], reader=reader, csv_options=csv_options,
+                          excel_options=excel_options, prepare=prepare, cache=cache)
+    cache = CACHE if cache is None else cache
+    jobs = [_source(source, reader, csv_options, excel_options, prepare) for source in sources]
+    key = ("tables", tuple(job[0] for job in jobs))
+
+    df = cache.get(key)
+    if df is None:
+        frames = [cache.get(job[0]) for job in jobs]
+        pending = [i for i, frame in enumerate(frames) if frame is None]
+        remote = prepare if _runs_in_worker(prepare) else None
+        workers = min(len(pending), max_workers or os.cpu_count() or 1)
+        if workers > 1:
+            # Spawned, not forked: a fork would copy the server's threads' locks mid-use
+            with ProcessPoolExecutor(max_workers=workers,
+                                     mp_context=multiprocessing.get_context("spawn")) as pool:
+                futures = {i: pool.submit(_load, *jobs[i][1:], remote) for i in pending}
+                parsed = {i: future.result() for i, future in futures.items()}
+        else:
+            parsed = {i: _load(*jobs[i][1:], remote) for i in pending}
+        for i, frame in parsed.items():
+            if prepare is not None and remote is None:
+                frame = prepare(frame)
+            frame.attrs["dataset_id"] = file_digest(repr(jobs[i][0]).encode())
+            cache.put(jobs[i][0], frame)
+            frames[i] = frame
+        df = concat_frames(frames)
+        df.attrs["dataset_id"] = file_digest(repr(key).encode())
+        cache.put(key, df)
+    return df.copy(deep=False)
+
+
+def concat_frames(frames):
+    """Concatenate ``frames`` row-wise with one dictionary per categorical column.
+
+    ``pd.concat`` turns a categorical column into plain objects as soon as two
+    files saw different values; here each such column is recoded to the
+    sorted union of the files' values first, so it stays categorical.  Files
+    where the column is not categorical contribute their values too; a
+    column whose files hold incompatible kinds of values is left to
+    ``pd.concat``.
+    """
+    frames = list(frames)
+    categoricals = {col for frame in frames for col in frame.columns
+                    if isinstance(frame[col].dtype, pd.CategoricalDtype)}
+    for col in sorted(categoricals):
+        parts = [frame[col] if isinstance(frame[col].dtype, pd.CategoricalDtype)
+                 else frame[col].astype("category")
+                 for frame in frames if col in frame.columns]
+        try:
+            categories = union_categoricals(parts, sort_categories=True).categories
+        except TypeError:   # e.g. numbers in one file, text in another
+            continue
+        dtype = pd.CategoricalDtype(categories)
+        frames = [frame.astype({col: dtype}) if col in frame.columns else frame for frame in frames]
+    return pd.concat(frames, ignore_index=True)
@@ -0,0 +1,98 @@
+"""Integer-coded keys for high-cardinality group-bys, top-N lists and distinct counts.
+
+Product, customer and buyer names run to hundreds of thousands of distinct
+values at scale.  Grouping on them as strings hashes every name on every
+rerun, and sorting every group to keep ten throws most of that work away.
+The key columns are dictionary-encoded once at load (``encode_keys``), so
+any filtered frame carries its rows' integer codes for free.  Per-key sums
+are then ``np.bincount`` over the codes, the top N are picked with
+``np.argpartition`` and only those N are sorted, and a distinct count is the
+number of non-empty bins, cached per filter state.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.ingest import LRUCache
+
+# Identifier-like columns worth encoding when a dataset has them
+KEY_COLUMNS = ["Product ID", "Product Name", "Customer ID", "Customer Name", "Buyer Name"]
+
+# (filter state, column) -> distinct count
+DISTINCT_COUNTS = LRUCache(max_entries=1024)
+
+
+def encode_keys(df, columns=KEY_COLUMNS):
+    """Dictionary-encode the ``columns`` ``df`` has as categoricals, in place; returns ``df``."""
+    for col in columns:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _codes(series):
+    """(codes, labels) of a key column; missing values get -1."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    # Not encoded at load (e.g. an aggregate): factorize now
+    codes, uniques = pd.factorize(series)
+    return codes, pd.Index(uniques)
+
+
+def group_sums(df, key, measures):
+    """(labels, row counts, {measure: sums}) per code of ``key``; NaNs count as 0."""
+    codes, labels = _codes(df[key])
+    present = codes >= 0
+    everything = bool(present.all())
+    # bincount works on intp codes; converting once saves a copy per measure
+    codes = (codes if everything else codes[present]).astype(np.intp, copy=False)
+    counts = np.bincount(codes, minlength=len(labels))
+    sums = {}
+    for col in measures:
+        values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+        if not everything:
+            values = values[present]
+        missing = np.isnan(values)
+        if missing.any():
+            values = np.where(missing, 0.0, values)
+        sums[col] = np.bincount(codes, weights=values, minlength=len(labels))
+    return labels, counts, sums
+
+
+def top_n(df, key, measures, by, n=10):
+    """The ``n`` keys with the largest ``by`` sums, largest first.
+
+    Same result as ``df.groupby(key)[measures].sum().nlargest(n, by)``:
+    indexed by ``key``, with integer measures kept integer.
+    """
+    measures = list(measures)
+    labels, counts, sums = group_sums(df, key, measures)
+    groups = np.flatnonzero(counts)   # keys with rows in df
+    ranking = sums[by][groups]
+    if len(groups) > n:
+        keep = np.argpartition(-ranking, n - 1)[:n]
+        groups, ranking = groups[keep], ranking[keep]
+    groups = groups[np.argsort(-ranking, kind="stable")]
+    top = pd.DataFrame({col: sums[col][groups] for col in measures},
+                       index=labels.take(groups).rename(key))
+    integers = [col for col in measures if pd.api.types.is_integer_dtype(df[col].dtype)]
+    return top.astype({col: np.int64 for col in integers}) if integers else top
+
+
+def distinct_count(series, state=None):
+    """Number of distinct non-missing values in ``series``.
+
+    With ``state`` (something identifying the rows, e.g. the dataset id and
+    the filter selections) the count is cached, so reruns under the same
+    filters do not scan the codes again.
+    """
+    key = (state, series.name)
+    if state is not None:
+        count = DISTINCT_COUNTS.get(key)
+        if count is not None:
+            return count
+    codes, labels = _codes(series)
+    count = int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=len(labels))))
+    if state is not None:
+        DISTINCT_COUNTS.put(key, count, nbytes=8)
+    return count
@@ -0,0 +1,90 @@
+"""Memory budgets and telemetry for sessions and the process.
+
+Every ``LRUCache`` counts the bytes it holds, and together the caches stay
+under ``ingest.PROCESS_MAX_BYTES`` (``DASHBOARD_MEMORY_MB``), evicting the
+least recently used entries of any cache first.  Each session's results
+(memoized sections, precomputed aggregates) live in one more ``LRUCache``,
+kept in the session state and bounded by ``SESSION_MAX_BYTES``
+(``DASHBOARD_SESSION_MB``); being a cache like the others, it also gives up
+its oldest results under process pressure.  Whatever is evicted is simply
+recomputed on the next miss.
+
+``usage`` reports the process RSS next to the tracked bytes and budgets,
+for the perf panel and its metric exports.
+"""
+
+import os
+import sys
+import weakref
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+from pandas.io.formats.style import Styler
+from plotly.basedatatypes import BaseFigure
+
+from dashboard_core import ingest
+from dashboard_core.charts import payload_bytes
+from dashboard_core.ingest import LRUCache, frame_nbytes
+
+SESSION_MAX_BYTES = int(float(os.environ.get("DASHBOARD_SESSION_MB", 256)) * 1024 ** 2)
+SESSION_MAX_ENTRIES = 96
+_SESSION_KEY = "_session_results"
+
+_sessions = weakref.WeakSet()   # every session's result cache
+
+
+def sizeof(value):
+    """Approximate bytes held by ``value``: frames, arrays, figures and containers of them."""
+    if isinstance(value, pd.DataFrame):
+        return frame_nbytes(value)
+    if isinstance(value, (pd.Series, pd.Index)):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, Styler):
+        return frame_nbytes(value.data)
+    if isinstance(value, BaseFigure):
+        return payload_bytes(value)
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(sizeof(item) for item in value.values())
+    return sys.getsizeof(value)
+
+
+def session_cache():
+    """This session's result cache, created on first use."""
+    cache = st.session_state.get(_SESSION_KEY)
+    if cache is None:
+        cache = LRUCache(max_entries=SESSION_MAX_ENTRIES, max_bytes=SESSION_MAX_BYTES)
+        st.session_state[_SESSION_KEY] = cache
+        _sessions.add(cache)
+    return cache
+
+
+def rss_bytes():
+    """Resident set size of this process (peak RSS where the current one is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024   # bytes on macOS, KiB elsewhere
+
+
+def usage():
+    """Current memory use and budgets, in bytes."""
+    sessions = list(_sessions)
+    session = st.session_state.get(_SESSION_KEY)
+    session_bytes = sum(cache.nbytes for cache in sessions)
+    return {
+        "rss": rss_bytes(),
+        "caches": ingest.cached_bytes() - session_bytes,
+        "sessions": session_bytes,
+        "session_count": len(sessions),
+        "session": session.nbytes if session is not None else 0,
+        "process_budget": ingest.PROCESS_MAX_BYTES,
+        "session_budget": SESSION_MAX_BYTES,
+    }
@@ -0,0 +1,288 @@
+"""Per-rerun timing spans, a hidden performance panel and metric exports.
+
+Scripts call ``begin(app)`` at the top, mark their top-to-bottom stages with
+``stage(name)`` (each stage runs until the next one starts), time nested
+work with the ``span`` context manager or the ``timed`` decorator, and call
+``panel()`` at the end.  ``panel`` closes the rerun, adds it to process-wide
+totals and, when enabled, shows the stage breakdown, cache hit rates and
+memory use against the budgets in the sidebar.
+
+The panel is hidden unless the page is opened with ``?perf=1`` or the
+server runs with ``DASHBOARD_PERF=1``.  Independently of the panel,
+``DASHBOARD_PERF_LOG`` names a file that gets one JSON line per rerun and
+``DASHBOARD_PERF_PROM`` a file rewritten with Prometheus text exposition
+after each rerun (e.g. for node_exporter's textfile collector).
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, suppress
+from functools import wraps
+
+import pandas as pd
+import streamlit as st
+
+from dashboard_core import (bitmap, charts, cube, dateindex, ingest, keys, memory, precompute,
+                            sections, streaming, timeseries, workforce)
+
+# Process-wide caches shown in the panel and exported as metrics
+CACHES = {
+    "ingest": ingest.CACHE,
+    "bitmap_indexes": bitmap.INDEXES,
+    "cubes": cube.CUBES,
+    "date_indexes": dateindex.DATE_INDEXES,
+    "stream_aggregates": streaming.AGGREGATES,
+    "time_rollups": timeseries.ROLLUPS,
+    "workforces": workforce.WORKFORCES,
+    "distinct_counts": keys.DISTINCT_COUNTS,
+    "figures": charts.FIGURES,
+}
+
+# Each script run happens on one thread, so the current rerun lives there
+_current = threading.local()
+
+# (app, stage) -> [count, total seconds, max seconds] over this process
+_totals = {}
+_totals_lock = threading.Lock()
+_reruns = {}   # app -> completed reruns
+
+
+def enabled():
+    """Whether the performance panel should be shown."""
+    return os.environ.get("DASHBOARD_PERF") == "1" or st.query_params.get("perf") == "1"
+
+
+# -------------------------------
+# Spans
+# -------------------------------
+def begin(app):
+    """Start collecting spans for a rerun of ``app``."""
+    _current.app = app
+    _current.started = time.perf_counter()
+    _current.spans = []
+    _current.stage = None
+    _current.depth = 0
+
+
+def _record(name, start, end, depth):
+    spans = getattr(_current, "spans", None)
+    if spans is not None:
+        spans.append({"name": name, "start": start - _current.started,
+                      "seconds": end - start, "depth": depth})
+
+
+def stage(name):
+    """End the current top-level stage (if any) and start ``name``."""
+    if getattr(_current, "spans", None) is None:
+        return
+    now = time.perf_counter()
+    if _current.stage is not None:
+        _record(_current.stage[0], _current.stage[1], now, 0)
+    _current.stage = (name, now)
+
+
+@contextmanager
+def span(name):
+    """Time the enclosed block as ``name``, nested under the current stage."""
+    depth = getattr(_current, "depth", 0)
+    _current.depth = depth + 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current.depth = depth
+        in_stage = getattr(_current, "stage", None) is not None
+        _record(name, start, time.perf_counter(), depth + in_stage)
+
+
+def timed(name=None):
+    """Decorator timing every call of the function as a span."""
+    def decorate(func):
+        label = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def bind(func):
+    """``func`` set up to record its spans into the current rerun when run on another thread.
+
+    Spans are kept per thread, so work handed to a pool (see
+    ``precompute.schedule``) would otherwise record nothing.  The returned
+    function runs ``func`` with this rerun's span list installed on its
+    thread, nested under the stage current when ``bind`` was called.
+    """
+    spans = getattr(_current, "spans", None)
+    if spans is None:
+        return func
+    rerun = {"app": _current.app, "started": _current.started, "spans": spans,
+             "stage": _current.stage, "depth": _current.depth}
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        saved = dict(vars(_current))
+        vars(_current).update(rerun)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            vars(_current).clear()
+            vars(_current).update(saved)
+    return run
+
+
+def finish():
+    """Close the current rerun, add it to the process totals and return its record."""
+    if getattr(_current, "spans", None) is None:
+        return None
+    stage(None)
+    end = time.perf_counter()
+    spans = sorted(_current.spans, key=lambda s: s["start"])
+    record = {"time": time.time(), "app": _current.app,
+              "seconds": end - _current.started, "spans": spans, "memory": memory.usage()}
+    _current.spans = None
+
+    with _totals_lock:
+        _reruns[record["app"]] = _reruns.get(record["app"], 0) + 1
+        for name, seconds in [("rerun", record["seconds"]),
+                              *((s["name"], s["seconds"]) for s in spans if s["depth"] == 0)]:
+            totals = _totals.setdefault((record["app"], name), [0, 0.0, 0.0])
+            totals[0] += 1
+            totals[1] += seconds
+            totals[2] = max(totals[2], seconds)
+    _export(record)
+    return record
+
+
+# -------------------------------
+# Exports
+# -------------------------------
+def cache_stats():
+    """Hit/miss statistics of the process-wide caches and this session's sections and tasks."""
+    stats = {name: cache.stats() for name, cache in CACHES.items()}
+    stats["sections (session)"] = sections.stats()
+    stats["precompute (session)"] = precompute.stats()
+    return stats
+
+
+def json_line(record):
+    return json.dumps({**record, "spans": [
+        {**s, "start": round(s["start"], 6), "seconds": round(s["seconds"], 6)}
+        for s in record["spans"]]}) + "\n"
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus_text():
+    """Process-wide stage timings and cache statistics in Prometheus text format."""
+    with _totals_lock:
+        totals = {key: list(value) for key, value in _totals.items()}
+        reruns = dict(_reruns)
+    lines = [
+        "# HELP dashboard_reruns_total Completed script reruns.",
+        "# TYPE dashboard_reruns_total counter",
+        *(f'dashboard_reruns_total{{app="{_label(app)}"}} {count}' for app, count in reruns.items()),
+        "# HELP dashboard_stage_seconds Time spent in each top-level stage of a rerun.",
+        "# TYPE dashboard_stage_seconds summary",
+    ]
+    for (app, name), (count, total, _) in totals.items():
+        labels = f'app="{_label(app)}",stage="{_label(name)}"'
+        lines.append(f"dashboard_stage_seconds_sum{{{labels}}} {total:.6f}")
+        lines.append(f"dashboard_stage_seconds_count{{{labels}}} {count}")
+    lines += ["# HELP dashboard_stage_seconds_max Slowest rerun of each stage.",
+              "# TYPE dashboard_stage_seconds_max gauge"]
+    for (app, name), (_, _, slowest) in totals.items():
+        lines.append(f'dashboard_stage_seconds_max{{app="{_label(app)}",stage="{_label(name)}"}} '
+                     f"{slowest:.6f}")
+
+    caches = {name: cache.stats() for name, cache in CACHES.items()}
+    for metric, field, kind, help_text in [
+            ("dashboard_cache_hits_total", "hits", "counter", "Cache lookups that found an entry."),
+            ("dashboard_cache_misses_total", "misses", "counter", "Cache lookups that missed."),
+            ("dashboard_cache_evictions_total", "evictions", "counter",
+             "Entries evicted to stay within a cache's or the process's budget."),
+            ("dashboard_cache_entries", "entries", "gauge", "Entries currently cached."),
+            ("dashboard_cache_bytes", "bytes", "gauge", "Approximate bytes currently cached.")]:
+        lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+        lines += [f'{metric}{{cache="{_label(name)}"}} {stats[field]}' for name, stats in caches.items()]
+
+    used = memory.usage()
+    lines += ["# HELP dashboard_memory_bytes Resident memory and bytes held in caches.",
+              "# TYPE dashboard_memory_bytes gauge",
+              *(f'dashboard_memory_bytes{{scope="{scope}"}} {used[scope]}'
+                for scope in ["rss", "caches", "sessions"]),
+              "# HELP dashboard_memory_budget_bytes Memory budgets caches are evicted to stay under.",
+              "# TYPE dashboard_memory_budget_bytes gauge",
+              f'dashboard_memory_budget_bytes{{scope="process"}} {used["process_budget"]}',
+              f'dashboard_memory_budget_bytes{{scope="session"}} {used["session_budget"]}',
+              "# HELP dashboard_sessions Sessions holding cached results.",
+              "# TYPE dashboard_sessions gauge",
+              f"dashboard_sessions {used['session_count']}"]
+    return "\n".join(lines) + "\n"
+
+
+def _export(record):
+    # Metrics are best effort: a full disk or a missing directory must not break the page
+    log_path = os.environ.get("DASHBOARD_PERF_LOG")
+    if log_path:
+        with suppress(OSError), open(log_path, "a", encoding="utf-8") as fh:
+            fh.write(json_line(record))
+    prom_path = os.environ.get("DASHBOARD_PERF_PROM")
+    if prom_path:
+        # Reruns of all sessions finish on threads of one process, each with its own file
+        with suppress(OSError), ingest.atomic_write(prom_path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as fh:
+                fh.write(prometheus_text())
+
+
+# -------------------------------
+# Panel
+# -------------------------------
+def panel():
+    """Finish the rerun and, if ``enabled()``, show its breakdown in the sidebar."""
+    record = finish()
+    if record is None or not enabled():
+        return
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.caption(f"Last rerun: {record['seconds'] * 1000:,.0f} ms")
+        st.dataframe(pd.DataFrame({
+            "Stage": ["  " * s["depth"] + s["name"] for s in record["spans"]],
+            "ms": [round(s["seconds"] * 1000, 1) for s in record["spans"]],
+            "%": [round(100 * s["seconds"] / record["seconds"], 1) if s["depth"] == 0 else None
+                  for s in record["spans"]],
+        }), hide_index=True, use_container_width=True)
+
+        st.caption("Caches")
+        stats = cache_stats()
+        st.dataframe(pd.DataFrame({
+            "Cache": list(stats),
+            "Hit rate": [f"{s['hit_rate']:.0%}" for s in stats.values()],
+            "Hits": [s["hits"] for s in stats.values()],
+            "Misses": [s["misses"] for s in stats.values()],
+            "Entries": [s["entries"] for s in stats.values()],
+            "MB": [round(s["bytes"] / 2 ** 20, 1) if "bytes" in s else None for s in stats.values()],
+            "Evicted": [s.get("evictions") for s in stats.values()],
+        }), hide_index=True, use_container_width=True)
+
+        st.caption("Memory")
+        used = record["memory"]
+        st.dataframe(pd.DataFrame({
+            "": ["Process RSS", "Shared caches", f"Sessions ({used['session_count']})",
+                 "This session"],
+            "MB": [round(used[name] / 2 ** 20, 1) for name in ["rss", "caches", "sessions", "session"]],
+            "Budget MB": [None, round(used["process_budget"] / 2 ** 20), None,
+                          round(used["session_budget"] / 2 ** 20)],
+        }), hide_index=True, use_container_width=True)
+
+        left, right = st.columns(2)
+        left.download_button("Spans (JSONL)", json_line(record), file_name="spans.jsonl",
+                             mime="application/jsonl", key="_perf_jsonl")
+        right.download_button("Prometheus", prometheus_text(), file_name="dashboard.prom",
+                              mime="text/plain", key="_perf_prom")
@@ -0,0 +1,144 @@
+"""Background precomputation of a dashboard's aggregates.
+
+A rerun computes each aggregate one after another, and only once the script
+reaches the element that shows it.  ``schedule`` submits every aggregate of
+the current filter state to a process-wide thread pool as soon as the data
+is loaded; pandas and NumPy release the GIL in their inner loops, so the
+aggregates run side by side.  Finished results go to the session's result
+cache (``memory.session_cache``) like ``sections.memoize`` results, so
+switching section or going back to an earlier filter state reuses them
+within the session's memory budget, and ``Batch.render`` draws each result
+as soon as it is ready, with a placeholder until then: the page waits for
+its slowest aggregate rather than for their sum.
+
+Tasks run outside the script thread, so they must not call Streamlit
+(including ``st.session_state``); they read the frames and filter values
+the script captured when it scheduled them.
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import streamlit as st
+
+from dashboard_core.memory import session_cache, sizeof
+
+# Threads shared by every session of the process
+MAX_WORKERS = 8
+_PENDING_KEY = "_precompute_pending"
+_STATS_KEY = "_precompute_stats"
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _executor():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="precompute")
+        return _pool
+
+
+class Batch:
+    """The futures of one ``schedule`` call, by task name."""
+
+    def __init__(self, futures):
+        self.futures = futures
+
+    def ready(self, name):
+        return self.futures[name].done()
+
+    def result(self, name):
+        """The result of task ``name``, waiting for it if it is still running."""
+        return self.futures[name].result()
+
+    def render(self, items, placeholder="⏳ Computing..."):
+        """Call ``draw(result)`` for each ``(task name, draw)`` of ``items``, in page order.
+
+        Each item gets its own slot on the page.  Ready results are drawn
+        at once; the others show ``placeholder`` and are drawn in the order
+        they finish.
+        """
+        pending = {}
+        for name, draw in items:
+            slot = st.empty()
+            future = self.futures[name]
+            if future.done():
+                with slot.container():
+                    draw(future.result())
+            else:
+                slot.info(placeholder)
+                pending.setdefault(future, []).append((slot, draw))
+        for future in as_completed(pending):
+            for slot, draw in pending[future]:
+                with slot.container():
+                    draw(future.result())
+
+
+def _finished(value):
+    future = Future()
+    future.set_result(value)
+    return future
+
+
+def _store(results, key):
+    """Done callback moving a task's result into the session's result cache."""
+    def store(future):
+        if not future.cancelled() and future.exception() is None:
+            value = future.result()
+            results.put(key, (value,), sizeof(value))
+    return store
+
+
+def schedule(state, tasks):
+    """Start ``tasks`` (name -> function without arguments) for ``state`` in the background.
+
+    ``state`` must identify everything the tasks depend on: the dataset and
+    the current filter selections.  Results this session already has for
+    ``state``, finished or still running, are reused.  Tasks of the same
+    name started for an earlier state that have not begun running are
+    cancelled, so quick filter changes do not queue up stale work.  Names
+    can be any hashable.
+    """
+    from dashboard_core import perf   # perf imports this module for its stats
+
+    results = session_cache()
+    pending = st.session_state.setdefault(_PENDING_KEY, {})
+    counts = st.session_state.setdefault(_STATS_KEY, {"hits": 0, "misses": 0})
+    for key, future in list(pending.items()):
+        # Finished tasks are in the result cache (unless already evicted)
+        if future.done() or (key[1] in tasks and key[2] != state and future.cancel()):
+            del pending[key]
+
+    batch = {}
+    for name, compute in tasks.items():
+        key = ("task", name, state)
+        found = results.get(key)
+        if found is not None:
+            counts["hits"] += 1
+            batch[name] = _finished(found[0])
+        elif key in pending:
+            counts["hits"] += 1
+            batch[name] = pending[key]
+        else:
+            counts["misses"] += 1
+            # Spans the task records go to this rerun, not the pool thread's
+            future = pending[key] = _executor().submit(perf.bind(compute))
+            future.add_done_callback(_store(results, key))
+            batch[name] = future
+    return Batch(batch)
+
+
+def stats():
+    """This session's background task results and hit/miss counts (like ``LRUCache.stats``)."""
+    counts = st.session_state.get(_STATS_KEY, {"hits": 0, "misses": 0})
+    pending = st.session_state.get(_PENDING_KEY, {})
+    lookups = counts["hits"] + counts["misses"]
+    return {
+        "entries": sum(key[0] == "task" for key in session_cache().keys()),
+        "pending": sum(not future.done() for future in pending.values()),
+        "hits": counts["hits"],
+        "misses": counts["misses"],
+        "hit_rate": counts["hits"] / lookups if lookups else 0.0,
+    }
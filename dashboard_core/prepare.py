@@ -0,0 +1,27 @@
+"""``prepare`` functions the dashboards hand to ``load_table``/``load_tables``.
+
+They live here rather than in the Streamlit scripts, which run as
+``__main__``, so ``load_tables`` can send them to its worker processes and
+run type coercion and derived columns next to each file's parse.  Each
+applies its dataset's schema (``dashboard_core.schemas``); they are plain
+functions because the ingest cache tells preparers apart by qualified name.
+"""
+
+from dashboard_core.keys import encode_keys
+from dashboard_core.schemas import HR, SALES, TRIPLE_TRACK
+
+
+def prepare_sales(df):
+    """Sales dashboard uploads: ``schemas.SALES`` types and integer-coded keys."""
+    # Product and customer names become integer codes once, at load
+    return encode_keys(SALES.apply(df))
+
+
+def prepare_triple_track(df):
+    """Triple Track uploads: ``schemas.TRIPLE_TRACK`` types and the derived sales columns."""
+    return TRIPLE_TRACK.apply(df)
+
+
+def prepare_hr(df):
+    """HR uploads: ``schemas.HR`` types (hire/exit dates, downcast integers)."""
+    return HR.apply(df)
@@ -0,0 +1,171 @@
+"""Declared columns and types of the dashboards' datasets.
+
+Each dataset type (the Superstore file, Sales uploads, Triple Track sales,
+HR records) is one ``Schema``: the columns to read, what each holds and how
+its dates are written.  Loaders read only the declared columns, with text
+columns dictionary-encoded by the reader (``csv_options``/``excel_options``),
+and ``Schema.apply`` types the frame once, at load:
+
+* dates are parsed with the declared format in one vectorized pass; only
+  values in another layout fall back to a ``dayfirst``-aware parse;
+* integers are downcast to the smallest of int16/int32/int64 that holds
+  them, and ratios to float32.  Money stays float64, since pandas sums
+  float32 in float32 and totals over millions of rows would drift;
+* derived columns are added last.
+
+Everything downstream reads typed frames and never parses dates or numbers
+again.
+"""
+
+import numpy as np
+import pandas as pd
+
+# Column kinds
+DATE = "date"
+CATEGORY = "category"
+TEXT = "text"
+INT = "int"        # smallest of int16/int32/int64 holding the values
+FLOAT = "float"    # float64: measures that are summed, such as money
+RATIO = "ratio"    # float32: values shown or averaged, never summed in bulk
+
+INT_TYPES = [np.int16, np.int32, np.int64]
+
+
+def to_int(series):
+    """``series`` as the smallest of ``INT_TYPES`` holding it.
+
+    Text is coerced to numbers first; a column with missing or fractional
+    values stays float64.
+    """
+    values = pd.to_numeric(series, errors="coerce")
+    if pd.api.types.is_float_dtype(values.dtype):
+        array = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        if np.isnan(array).any() or (array != np.floor(array)).any():
+            return values.astype(np.float64)
+    if not len(values):
+        return values.astype(INT_TYPES[0])
+    low, high = values.min(), values.max()
+    for kind in INT_TYPES:
+        info = np.iinfo(kind)
+        if info.min <= low and high <= info.max:
+            return values.astype(kind)
+    return values.astype(np.float64)
+
+
+class Schema:
+    """Columns of one dataset type (name -> kind) and how to read and type them."""
+
+    def __init__(self, name, columns, date_format=None, dayfirst=False, sort_by=None,
+                 csv_options=None, derive=None):
+        self.name = name
+        self.columns = dict(columns)
+        self.date_format = date_format
+        self.dayfirst = dayfirst
+        self.sort_by = sort_by
+        self.derive = derive
+        self._csv_options = dict(csv_options or {})
+
+    def of_kind(self, *kinds):
+        return [col for col, kind in self.columns.items() if kind in kinds]
+
+    @property
+    def categoricals(self):
+        return self.of_kind(CATEGORY)
+
+    @property
+    def dates(self):
+        return self.of_kind(DATE)
+
+    # -------------------------------
+    # Reading
+    # -------------------------------
+    def _read_options(self):
+        # Declared columns a file lacks are skipped by the readers
+        return {"usecols": list(self.columns),
+                "dtype": {col: "category" for col in self.categoricals}}
+
+    @property
+    def csv_options(self):
+        """``pd.read_csv`` options (through ``load_table``) reading just the declared columns."""
+        return {**self._csv_options, **self._read_options()}
+
+    @property
+    def excel_options(self):
+        """``excel.read_excel`` options reading just the declared columns."""
+        return self._read_options()
+
+    # -------------------------------
+    # Typing
+    # -------------------------------
+    def parse_dates(self, series):
+        """``series`` as datetimes, parsed with ``date_format``; unparseable values become NaT."""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        if self.date_format is None:
+            return pd.to_datetime(series, dayfirst=self.dayfirst, errors="coerce", format="mixed")
+        parsed = pd.to_datetime(series, format=self.date_format, errors="coerce")
+        missed = parsed.isna() & series.notna()
+        if missed.any():
+            # e.g. Excel cells that arrive as datetimes next to text in the declared layout
+            parsed = parsed.mask(missed, pd.to_datetime(
+                series[missed], dayfirst=self.dayfirst, errors="coerce", format="mixed"))
+        return parsed
+
+    def apply(self, df):
+        """Type the declared columns ``df`` has, add derived columns and sort; returns ``df``."""
+        for col, kind in self.columns.items():
+            if col not in df.columns:
+                continue
+            if kind == DATE:
+                df[col] = self.parse_dates(df[col])
+            elif kind == CATEGORY:
+                if not isinstance(df[col].dtype, pd.CategoricalDtype):
+                    df[col] = df[col].astype("category")
+            elif kind == INT:
+                df[col] = to_int(df[col])
+            elif kind == FLOAT:
+                df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float64)
+            elif kind == RATIO:
+                df[col] = pd.to_numeric(df[col], errors="coerce").astype(np.float32)
+        if self.derive is not None:
+            df = self.derive(df)
+        if self.sort_by in df.columns:
+            df = df.sort_values(self.sort_by, kind="stable", ignore_index=True)
+        return df
+
+
+def _sales_totals(df):
+    """Triple Track's derived columns."""
+    df["Amount Collected"] = df["Price"] * df["Quantity"]
+    df["Profit"] = (df["Price"] - df["Cost"]) * df["Quantity"]
+    return df
+
+
+_ORDERS = {
+    "Row ID": INT, "Order ID": CATEGORY, "Order Date": DATE, "Ship Date": DATE,
+    "Ship Mode": CATEGORY, "Customer ID": CATEGORY, "Customer Name": CATEGORY,
+    "Segment": CATEGORY, "Country": CATEGORY, "City": CATEGORY, "State": CATEGORY,
+    "Postal Code": INT, "Region": CATEGORY, "Product ID": CATEGORY, "Category": CATEGORY,
+    "Sub-Category": CATEGORY, "Product Name": CATEGORY,
+    "Sales": FLOAT, "Quantity": INT, "Discount": RATIO, "Profit": FLOAT,
+}
+
+# The bundled Superstore file, kept sorted by Order Date (see dashboard_core.dateindex)
+SUPERSTORE = Schema("superstore", _ORDERS, date_format="%d/%m/%Y", dayfirst=True,
+                    sort_by="Order Date", csv_options={"encoding": "ISO-8859-1"})
+
+# Superstore-style files uploaded to the Sales dashboard
+SALES = Schema("sales", _ORDERS, date_format="%d/%m/%Y", dayfirst=True)
+
+TRIPLE_TRACK = Schema("triple_track", {
+    "Order Date": DATE, "Buyer Name": CATEGORY, "Location": CATEGORY, "Class": CATEGORY,
+    "Price": FLOAT, "Quantity": INT, "Cost": FLOAT,
+}, date_format="%Y-%m-%d", derive=_sales_totals)
+
+HR = Schema("hr", {
+    "EmployeeID": INT, "Name": TEXT, "Department": CATEGORY, "Gender": CATEGORY,
+    "Age": INT, "Salary": INT, "JobLevel": INT, "HireDate": DATE, "ExitDate": DATE,
+    "EmploymentStatus": CATEGORY, "PerformanceRating": INT,
+}, date_format="%Y-%m-%d")
+
+SCHEMAS = {schema.name: schema for schema in [SUPERSTORE, SALES, TRIPLE_TRACK, HR]}
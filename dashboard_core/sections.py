@@ -0,0 +1,54 @@
+"""Lazily evaluated dashboard sections.
+
+``st.tabs`` runs the body of every tab on every rerun, even though only one
+is visible.  ``lazy_tabs`` renders the same tab strip as a horizontal radio
+so the script can run just the selected section, and ``memoize`` keeps each
+section's results per filter state in the session so switching back to a
+section does not recompute it.  Results share the session's memory budget
+(``memory.session_cache``), so the least recently used are dropped first and
+recomputed if needed again.
+"""
+
+import streamlit as st
+
+from dashboard_core.memory import session_cache, sizeof
+
+_STATS_KEY = "_section_stats"
+
+
+def lazy_tabs(labels, key):
+    """Show ``labels`` as a tab strip and return the selected one."""
+    return st.radio("Section", labels, horizontal=True, key=key,
+                    label_visibility="collapsed")
+
+
+def memoize(section, state, compute):
+    """Return ``compute()`` for ``(section, state)``, reusing this session's earlier result.
+
+    ``state`` must identify everything ``compute`` depends on: the dataset
+    and the current filter selections.
+    """
+    results = session_cache()
+    counts = st.session_state.setdefault(_STATS_KEY, {"hits": 0, "misses": 0})
+    key = ("section", section, state)
+    found = results.get(key)
+    if found is not None:
+        counts["hits"] += 1
+        return found[0]
+    counts["misses"] += 1
+    value = compute()
+    # Wrapped, so a result of None is cached too
+    results.put(key, (value,), sizeof(value))
+    return value
+
+
+def stats():
+    """This session's memoized results and hit/miss counts (like ``LRUCache.stats``)."""
+    counts = st.session_state.get(_STATS_KEY, {"hits": 0, "misses": 0})
+    lookups = counts["hits"] + counts["misses"]
+    return {
+        "entries": sum(key[0] == "section" for key in session_cache().keys()),
+        "hits": counts["hits"],
+        "misses": counts["misses"],
+        "hit_rate": counts["hits"] / lookups if lookups else 0.0,
+    }
@@ -0,0 +1,225 @@
+"""Columnar Parquet snapshots of the bundled CSV datasets.
+
+Reading ``Superstore.csv`` means decoding ISO-8859-1 text and parsing dates
+on every cold start, and every text column is held as Python strings.  The
+snapshot stores the typed frame once (``schemas.SUPERSTORE``: dates parsed,
+text as categoricals, downcast numbers) and is rebuilt only when the source CSV changes.
+
+``load_superstore`` serves the dashboard from an uncompressed Arrow IPC copy
+of the snapshot that is memory-mapped rather than read.  Numeric and date
+columns are views of the file's pages, which the OS page cache shares
+between server processes; categorical codes and categories are converted
+onto the heap once per process.  Sessions get shallow views of that one
+frame, and the heap part counts against the process memory budget.
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dashboard_core.ingest import LRUCache, atomic_write, file_digest, load_table, read_csv
+from dashboard_core.schemas import SUPERSTORE
+
+# Declared columns only (see dashboard_core.schemas)
+SUPERSTORE_CSV_OPTIONS = SUPERSTORE.csv_options
+
+# Keys stored in the Parquet footer to detect a stale snapshot
+_META_SIZE = b"source_size"
+_META_MTIME = b"source_mtime_ns"
+_META_DIGEST = b"source_digest"
+# Bumped when the snapshot contents change for the same source (e.g. row order)
+_META_FORMAT = b"snapshot_format"
+SNAPSHOT_FORMAT = b"4"
+# Stored in the Arrow copy: size and mtime of the Parquet snapshot it came from,
+# and the Arrow layout version (bumped when the layout changes)
+_META_PARQUET = b"parquet_stamp"
+ARROW_FORMAT = 2
+
+# Memory-mapped frames; their pages belong to the file, not the heap
+SHARED = LRUCache(max_entries=2)
+
+
+def apply_superstore_types(df):
+    """Type Superstore columns per ``schemas.SUPERSTORE`` and sort by date.
+
+    Rows are kept in ``Order Date`` order so date ranges are contiguous
+    slices (see ``dashboard_core.dateindex``).
+    """
+    return SUPERSTORE.apply(df)
+
+
+def snapshot_path_for(csv_path):
+    """Default snapshot location: next to the CSV, with a ``.parquet`` suffix."""
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def _file_digest(path, chunk_size=8 * 1024 * 1024):
+    # Hash in chunks so multi-GB sources are not loaded into memory
+    h = hashlib.blake2b(digest_size=20)
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _read_source_meta(snapshot_path):
+    try:
+        meta = pq.read_schema(snapshot_path).metadata or {}
+    except (OSError, pa.ArrowInvalid):
+        return None
+    return meta
+
+
+def is_fresh(csv_path, snapshot_path):
+    """True if ``snapshot_path`` was built from the current contents of ``csv_path``.
+
+    A matching size and mtime is trusted without reading the source; otherwise
+    the source is re-hashed, so a ``touch`` or checkout alone does not force a
+    rebuild.
+    """
+    meta = _read_source_meta(snapshot_path)
+    if not meta or meta.get(_META_FORMAT) != SNAPSHOT_FORMAT:
+        return False
+    stat = os.stat(csv_path)
+    if (meta.get(_META_SIZE) == str(stat.st_size).encode()
+            and meta.get(_META_MTIME) == str(stat.st_mtime_ns).encode()):
+        return True
+    return meta.get(_META_DIGEST) == _file_digest(csv_path).encode()
+
+
+def build_snapshot(csv_path, snapshot_path=None, csv_options=None, prepare=apply_superstore_types):
+    """Convert ``csv_path`` to a typed Parquet snapshot and return its path."""
+    snapshot_path = snapshot_path or snapshot_path_for(csv_path)
+    stat = os.stat(csv_path)
+    df = prepare(read_csv(csv_path, **(csv_options or {})))
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({
+        **(table.schema.metadata or {}),
+        _META_SIZE: str(stat.st_size).encode(),
+        _META_MTIME: str(stat.st_mtime_ns).encode(),
+        _META_DIGEST: _file_digest(csv_path).encode(),
+        _META_FORMAT: SNAPSHOT_FORMAT,
+    })
+    # Write then rename so concurrent readers never see a half-written file
+    with atomic_write(snapshot_path) as tmp_path:
+        pq.write_table(table, tmp_path, compression="zstd")
+    return snapshot_path
+
+
+def ensure_snapshot(csv_path, snapshot_path=None, csv_options=None, prepare=apply_superstore_types):
+    """Return the path of an up-to-date snapshot of ``csv_path``, building it if needed."""
+    snapshot_path = snapshot_path or snapshot_path_for(csv_path)
+    if not is_fresh(csv_path, snapshot_path):
+        build_snapshot(csv_path, snapshot_path, csv_options=csv_options, prepare=prepare)
+    return snapshot_path
+
+
+def arrow_path_for(csv_path):
+    return os.path.splitext(csv_path)[0] + ".arrow"
+
+
+def ensure_arrow_snapshot(csv_path, csv_options=None, prepare=apply_superstore_types):
+    """Return the path of an up-to-date Arrow IPC copy of the snapshot of ``csv_path``."""
+    parquet_path = ensure_snapshot(csv_path, csv_options=csv_options, prepare=prepare)
+    arrow_path = arrow_path_for(csv_path)
+    stat = os.stat(parquet_path)
+    stamp = f"{stat.st_size}:{stat.st_mtime_ns}:{ARROW_FORMAT}".encode()
+    try:
+        with pa.memory_map(arrow_path, "r") as source:
+            if (pa.ipc.open_file(source).schema.metadata or {}).get(_META_PARQUET) == stamp:
+                return arrow_path
+    except (OSError, pa.ArrowInvalid):
+        pass
+
+    # One record batch: a column split over several batches (one per Parquet
+    # row group) has to be concatenated, i.e. copied, when it becomes pandas
+    table = pq.read_table(parquet_path).combine_chunks()
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_PARQUET: stamp})
+    # Uncompressed, so columns can be used in place from the mapped file
+    with atomic_write(arrow_path) as tmp_path:
+        with pa.OSFile(tmp_path, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    return arrow_path
+
+
+def heap_nbytes(df, table):
+    """Bytes of ``df`` (converted from ``table``) held on the heap rather than in the table's pages.
+
+    Numeric and date columns are views of the mapped file when Arrow can hand
+    them over as they are; categories, and any column Arrow had to convert
+    (e.g. dictionary indices widened or narrowed to pandas codes), are copies.
+    """
+    mapped = [(buf.address, buf.address + buf.size)
+              for column in table.columns for chunk in column.chunks
+              for buf in chunk.buffers() if buf is not None]
+
+    def heap(values):
+        start = values.__array_interface__["data"][0]
+        return 0 if any(lo <= start < hi for lo, hi in mapped) else values.nbytes
+
+    total = int(df.index.memory_usage(deep=True))
+    for _, series in df.items():
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            total += heap(series.cat.codes.to_numpy())
+            total += int(series.cat.categories.memory_usage(deep=True))
+        elif series.dtype.kind in "biufcmM":
+            total += heap(series.to_numpy())
+        else:
+            total += int(series.memory_usage(index=False, deep=True))
+    return total
+
+
+def _private_rss():
+    """Resident bytes of this process not backed by files (None where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            fields = fh.read().split()
+        return (int(fields[1]) - int(fields[2])) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def load_shared(arrow_path):
+    """Memory-map an Arrow IPC file as a frame shared by every session of the process.
+
+    Returns a shallow copy like ``load_table``.  pandas 3 always copies on
+    write (hence ``pandas>=3`` in requirements.txt), so a caller assigning or
+    modifying a column gets its own copy and never touches the shared,
+    read-only mapped columns.
+    """
+    stat = os.stat(arrow_path)
+    key = (os.path.abspath(arrow_path), stat.st_size, stat.st_mtime_ns)
+    df = SHARED.get(key)
+    if df is None:
+        before = _private_rss()
+        table = pa.ipc.open_file(pa.memory_map(arrow_path, "r")).read_all()
+        df = table.to_pandas(split_blocks=True)   # one block per column: no consolidation copy
+        # Hand the conversion's scratch memory back instead of keeping it pooled
+        pa.default_memory_pool().release_unused()
+        df.attrs["dataset_id"] = file_digest(repr(key).encode())
+        # Only what the conversion put on the heap counts against the process
+        # budget.  The measured growth also covers what heap_nbytes cannot see,
+        # e.g. the hash table pandas builds over a large set of categories.
+        nbytes = heap_nbytes(df, table)
+        after = _private_rss()
+        if before is not None and after is not None:
+            nbytes = max(nbytes, after - before)
+        SHARED.put(key, df, nbytes=nbytes)
+    return df.copy(deep=False)
+
+
+def load_superstore(csv_path):
+    """Load the Superstore CSV through its memory-mapped snapshot, once per process.
+
+    Falls back to parsing the CSV directly when the snapshots cannot be written
+    (e.g. a read-only checkout) or read back.
+    """
+    try:
+        return load_shared(ensure_arrow_snapshot(csv_path, csv_options=SUPERSTORE_CSV_OPTIONS))
+    except (OSError, pa.ArrowInvalid):
+        return load_table(csv_path, csv_options=SUPERSTORE_CSV_OPTIONS,
+                          prepare=apply_superstore_types)
@@ -0,0 +1,354 @@
+"""Optional DuckDB backend for the Superstore and Sales dashboards.
+
+With ``duckdb`` installed (``pip install duckdb``), ``open_sales`` registers
+a CSV or Parquet file as a view in an in-process DuckDB database instead of
+loading it into pandas.  Every filter, group-by and top-N the dashboards
+need is then a SQL query over that file.  DuckDB reads only the columns
+and row groups a query touches and runs on all cores.  Only the small
+results (a cube slice, a trend, a page of rows) come back to pandas
+for Plotly, so files larger than memory still work.
+
+Query results are cached per file and query, since the data behind a view
+never changes.  Uploads are written to a temporary file once, because
+DuckDB scans files rather than Python buffers.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core import binning
+from dashboard_core.cube import COUNT_MEASURE, CUBE_DIMENSIONS, CUBE_MEASURES, MONTH
+from dashboard_core.ingest import (CSV_EXTENSIONS, PARQUET_EXTENSIONS, LRUCache, atomic_write,
+                                   file_digest, upload_digest)
+from dashboard_core.timeseries import PERIOD
+
+try:
+    import duckdb
+except ImportError:   # the backend is optional
+    duckdb = None
+
+MEASURES = ["Sales", "Profit", "Quantity"]
+DATE_COLUMN = "Order Date"
+# Tried in order; day-first like the pandas readers
+DATE_FORMATS = ["%d/%m/%Y", "%Y-%m-%d", "%d-%m-%Y", "%Y/%m/%d", "%Y-%m-%d %H:%M:%S"]
+ENCODINGS = ["utf-8", "latin-1"]
+# timeseries.GRANULARITIES frequency -> date_trunc unit (weeks start on Monday in both)
+DATE_TRUNC = {"D": "day", "W": "week", "M": "month", "Q": "quarter", "Y": "year"}
+
+# DuckDB COPY options per export format (see export.FORMATS)
+COPY_OPTIONS = {
+    "CSV": "FORMAT csv, HEADER",
+    "CSV (gzip)": "FORMAT csv, HEADER, COMPRESSION gzip",
+    "Parquet": "FORMAT parquet, COMPRESSION zstd",
+}
+
+# Rows fetched for the records grid; everything else is aggregated in SQL
+GRID_MAX_ROWS = 200_000
+
+SPILL_DIR = Path(tempfile.gettempdir()) / "dashboard_sql"
+MAX_SPILL_FILES = 8
+
+# Views are cheap (no data is loaded), results are small
+SOURCES = LRUCache(max_entries=8)
+RESULTS = LRUCache(max_entries=512, max_bytes=256 * 1024 ** 2)
+
+
+def available():
+    return duckdb is not None
+
+
+def supports(name):
+    """Whether a file called ``name`` can be queried in place."""
+    return name.lower().endswith(CSV_EXTENSIONS + PARQUET_EXTENSIONS)
+
+
+def _ident(name):
+    return '"' + str(name).replace('"', '""') + '"'
+
+
+def _literal(text):
+    return "'" + str(text).replace("'", "''") + "'"
+
+
+def _param(value):
+    if isinstance(value, pd.Timestamp):
+        return value.to_pydatetime()
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _touch(path):
+    """Mark a spill file as used; False if it has been pruned."""
+    try:
+        os.utime(path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def _spill(upload, digest, suffix):
+    """Write an uploaded file to a file DuckDB can scan (once per content, ``digest``).
+
+    Files are pruned least recently used first; ``open_sales`` touches the
+    file of every view it reuses, so the views in ``SOURCES`` keep theirs.
+    """
+    path = SPILL_DIR / (digest + suffix)
+    if not _touch(path):
+        SPILL_DIR.mkdir(parents=True, exist_ok=True)
+        upload.seek(0)
+        with atomic_write(path) as tmp_path, open(tmp_path, "wb") as fh:
+            shutil.copyfileobj(upload, fh)
+        upload.seek(0)
+        stamped = []
+        for old in SPILL_DIR.glob("*"):
+            if old.suffix == ".tmp":   # another session's write in progress
+                continue
+            try:
+                stamped.append((old.stat().st_mtime, old))
+            except FileNotFoundError:
+                continue
+        for _, old in sorted(stamped, reverse=True)[MAX_SPILL_FILES:]:
+            old.unlink(missing_ok=True)
+    return path
+
+
+class SqlSales:
+    """A sales CSV/Parquet file exposed as the DuckDB view ``data``.
+
+    Filters are keyword arguments: ``start``/``end`` bound the order date
+    (inclusive), ``year`` selects one order year and any other name is a
+    column whose value must be in the given list.  Empty lists select
+    everything with ``empty="all"`` and nothing with ``empty="none"``.
+    """
+
+    def __init__(self, path, key):
+        self.key = key
+        self.path = Path(path)
+        self.source_key = ("sql",) + tuple(key)
+        self.con = duckdb.connect()
+        self.con.execute(f"CREATE VIEW data AS {self._select(Path(path))}")
+        described = self.con.execute("DESCRIBE data").fetchall()
+        self.types = {row[0]: row[1] for row in described}
+        self.columns = list(self.types)
+        self.has_dates = DATE_COLUMN in self.columns
+        self.has_region = "Region" in self.columns
+
+    def _select(self, path):
+        if path.suffix.lower() in PARQUET_EXTENSIONS:
+            return f"SELECT * FROM read_parquet({_literal(path)})"
+        for encoding in ENCODINGS:
+            reader = f"read_csv({_literal(path)}, encoding={_literal(encoding)}"
+            try:
+                columns = [row[0] for row in self.con.execute(
+                    f"DESCRIBE SELECT * FROM {reader})").fetchall()]
+                break
+            except duckdb.Error:
+                continue
+        else:
+            raise ValueError(f"Could not read {path.name} as CSV.")
+        if DATE_COLUMN not in columns:
+            return f"SELECT * FROM {reader})"
+        # Parse order dates explicitly, like the pandas readers (day first, bad values -> NULL)
+        formats = ", ".join(_literal(fmt) for fmt in DATE_FORMATS)
+        return (f"SELECT * REPLACE (try_strptime({_ident(DATE_COLUMN)}, [{formats}]) "
+                f"AS {_ident(DATE_COLUMN)}) "
+                f"FROM {reader}, types={{{_literal(DATE_COLUMN)}: 'VARCHAR'}})")
+
+    # -------------------------------
+    # Query helpers
+    # -------------------------------
+    def query(self, sql, params=()):
+        """Run ``sql`` against the view and return the (cached) result frame."""
+        params = [_param(value) for value in params]
+        key = (self.key, sql, repr(params))
+        df = RESULTS.get(key)
+        if df is None:
+            with self.con.cursor() as cursor:
+                df = cursor.execute(sql, params).df()
+            # Lets frame_state-keyed caches (grid, exports) skip hashing the rows
+            df.attrs["dataset_id"] = file_digest(repr(key).encode())
+            RESULTS.put(key, df)
+        return df.copy(deep=False)
+
+    def where(self, start=None, end=None, year=None, empty="all", **filters):
+        """SQL ``WHERE`` clause (possibly empty) and parameters for a filter state."""
+        clauses, params = [], []
+        date = _ident(DATE_COLUMN)
+        if start is not None:
+            clauses.append(f"{date} >= ?")
+            params.append(pd.Timestamp(start))
+        if end is not None:
+            clauses.append(f"{date} <= ?")
+            params.append(pd.Timestamp(end))
+        if year is not None:
+            clauses.append(f"year({date}) = ?")
+            params.append(int(year))
+        for column, values in filters.items():
+            if values is None:
+                continue
+            if len(values) == 0:
+                if empty == "none":
+                    clauses.append("FALSE")
+                continue
+            clauses.append(f"{_ident(column)} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _sum(self, column):
+        total = f"sum({_ident(column)})"
+        if "INT" in self.types.get(column, ""):
+            total = f"CAST({total} AS BIGINT)"   # not HUGEINT, which pandas reads as float
+        return f"{total} AS {_ident(column)}"
+
+    # -------------------------------
+    # Superstore dashboard
+    # -------------------------------
+    def date_range(self):
+        date = _ident(DATE_COLUMN)
+        bounds = self.query(f"SELECT min({date}) AS first, max({date}) AS last FROM data")
+        return pd.Timestamp(bounds["first"].iloc[0]), pd.Timestamp(bounds["last"].iloc[0])
+
+    def options(self, column, **filters):
+        """Distinct non-null values of ``column`` under ``filters``, sorted."""
+        where, params = self.where(**filters)
+        col = _ident(column)
+        nonnull = f"{' AND' if where else ' WHERE'} {col} IS NOT NULL"
+        return self.query(f"SELECT DISTINCT {col} FROM data{where}{nonnull} ORDER BY 1",
+                          params)[column].tolist()
+
+    def count(self, **filters):
+        where, params = self.where(**filters)
+        return int(self.query(f"SELECT count(*) AS n FROM data{where}", params)["n"].iloc[0])
+
+    def cube_slice(self, start=None, end=None, **filters):
+        """Same rows as ``SalesCube.slice``, aggregated by DuckDB from the raw file."""
+        where, params = self.where(start=start, end=end, **filters)
+        dims = ", ".join(_ident(col) for col in CUBE_DIMENSIONS)
+        sums = ", ".join(self._sum(col) for col in CUBE_MEASURES)
+        cube = self.query(
+            f"SELECT {dims}, date_trunc('month', {_ident(DATE_COLUMN)}) AS {MONTH}, {sums}, "
+            f"count(*) AS {COUNT_MEASURE} FROM data{where} GROUP BY ALL", params)
+        cube[MONTH] = pd.to_datetime(cube[MONTH]).dt.to_period("M")
+        return cube
+
+    def series(self, freq="M", **filters):
+        """Per-period measure sums and order counts indexed by period start, like ``DateIndex.series``."""
+        return self._series(freq, *self.where(**filters))
+
+    def _series(self, freq, where, params):
+        period = f"date_trunc('{DATE_TRUNC[freq]}', {_ident(DATE_COLUMN)})"
+        trend = self.query(
+            f"SELECT {period} AS {PERIOD}, {', '.join(self._sum(col) for col in MEASURES)}, "
+            f"count(*) AS {COUNT_MEASURE} FROM data{where} "
+            f"GROUP BY 1 HAVING {PERIOD} IS NOT NULL ORDER BY 1", params)
+        trend[PERIOD] = pd.to_datetime(trend[PERIOD])
+        return trend.set_index(PERIOD)
+
+    def rows(self, columns=None, limit=None, **filters):
+        """Raw rows (optionally only ``columns``, at most ``limit``) in file order."""
+        where, params = self.where(**filters)
+        select = ", ".join(_ident(col) for col in columns) if columns else "*"
+        limit = f" LIMIT {int(limit)}" if limit is not None else ""
+        return self.query(f"SELECT {select} FROM data{where}{limit}", params)
+
+    def scatter(self, x, y, size=None, bins=binning.GRID_BINS, threshold=None, **filters):
+        """``binning.scatter`` over the filtered rows, binned in SQL when there are many."""
+        if self.count(**filters) <= (binning.LARGE_DATA_ROWS if threshold is None else threshold):
+            rows = self.rows([x, y] + ([size] if size else []), **filters)
+            return binning.scatter(rows, x, y, size=size, threshold=threshold)
+
+        where, params = self.where(**filters)
+        nonnull = f"{' AND' if where else ' WHERE'} {_ident(x)} IS NOT NULL AND {_ident(y)} IS NOT NULL"
+        bounds = self.query(f"SELECT min({_ident(x)}) AS x0, max({_ident(x)}) AS x1, "
+                            f"min({_ident(y)}) AS y0, max({_ident(y)}) AS y1 "
+                            f"FROM data{where}{nonnull}", params).iloc[0]
+        edges = []
+        for low, high in [(bounds["x0"], bounds["x1"]), (bounds["y0"], bounds["y1"])]:
+            if low == high:   # same convention as np.histogram2d
+                low, high = low - 0.5, high + 0.5
+            edges.append(np.linspace(low, high, bins + 1))
+        x_edges, y_edges = edges
+
+        def bin_of(col, edges):
+            width = float(edges[-1] - edges[0]) / bins
+            return (f"least(CAST(floor(({_ident(col)} - {float(edges[0])!r}) / {width!r}) "
+                    f"AS INTEGER), {bins - 1})")
+
+        cells = self.query(f"SELECT {bin_of(x, x_edges)} AS i, {bin_of(y, y_edges)} AS j, "
+                           f"count(*) AS n FROM data{where}{nonnull} GROUP BY ALL", params)
+        counts = np.zeros((bins, bins))
+        counts[cells["i"].to_numpy(), cells["j"].to_numpy()] = cells["n"].to_numpy()
+        return binning.density_heatmap(counts, x_edges, y_edges, x, y)
+
+    def copy_to(self, fmt, path, **filters):
+        """Write the filtered rows to ``path`` as ``fmt`` (an ``export.FORMATS`` label)."""
+        where, params = self.where(**filters)
+        with self.con.cursor() as cursor:
+            cursor.execute(f"COPY (SELECT * FROM data{where}) TO {_literal(path)} "
+                           f"({COPY_OPTIONS[fmt]})", [_param(value) for value in params])
+
+    # -------------------------------
+    # Sales dashboard (same interface as streaming.SalesAggregates)
+    # -------------------------------
+    def _selected(self, year=None, regions=None):
+        return self.where(year=year if self.has_dates else None, empty="none",
+                          **({"Region": regions} if self.has_region else {}))
+
+    def years(self):
+        return [int(year) for year in self.query(
+            f"SELECT DISTINCT year({_ident(DATE_COLUMN)}) AS y FROM data "
+            f"WHERE {_ident(DATE_COLUMN)} IS NOT NULL ORDER BY 1")["y"]]
+
+    def regions(self):
+        return self.options("Region")
+
+    def totals(self, year=None, regions=None):
+        """(sales, profit, quantity) for the selection."""
+        where, params = self._selected(year, regions)
+        sums = self.query(f"SELECT {', '.join(self._sum(col) for col in MEASURES)} "
+                          f"FROM data{where}", params)
+        # Column by column, so an integer Quantity stays an integer
+        return tuple(0 if pd.isna(sums[col].iloc[0]) else sums[col].iloc[0] for col in MEASURES)
+
+    def trend(self, freq="M", year=None, regions=None):
+        """Per-period sums indexed by period start, like the in-memory trend."""
+        return self._series(freq, *self._selected(year, regions))
+
+    def by(self, name, year=None, regions=None):
+        """Sales per ``name`` ("Category" or "Region")."""
+        where, params = self._selected(year, regions)
+        return self.query(f"SELECT {_ident(name)}, sum(Sales) AS Sales FROM data{where} "
+                          "GROUP BY 1 ORDER BY 1", params)
+
+    def top_products(self, n=10, year=None, regions=None):
+        where, params = self._selected(year, regions)
+        return self.query(
+            f"SELECT \"Product Name\", {', '.join(self._sum(col) for col in MEASURES)} "
+            f"FROM data{where} GROUP BY 1 ORDER BY Sales DESC LIMIT {int(n)}",
+            params).set_index("Product Name")
+
+
+def open_sales(source):
+    """``SqlSales`` over an uploaded file or a path, reused for the same content."""
+    upload = hasattr(source, "getvalue")
+    if upload:
+        key = ("bytes", upload_digest(source))
+        path = None
+    else:
+        stat = os.stat(source)
+        key = ("path", os.path.abspath(source), stat.st_size, stat.st_mtime_ns)
+        path = source
+
+    dataset = SOURCES.get(key)
+    if dataset is not None and upload and not _touch(dataset.path):
+        dataset = None   # its spill file was pruned, e.g. by another server process
+    if dataset is None:
+        if upload:
+            path = _spill(source, key[1], Path(source.name).suffix.lower())
+        dataset = SqlSales(path, key)
+        SOURCES.put(key, dataset, nbytes=0)
+    return dataset
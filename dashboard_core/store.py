@@ -0,0 +1,229 @@
+"""Persistent Triple Track sales history in a local SQLite file.
+
+Each monthly workbook uploaded to the Triple Track dashboards is appended to
+the store once: rows already stored (by order key) are skipped, the derived
+``Amount Collected``/``Profit`` columns are computed on insert and a
+month x Location x Class rollup is updated from the new rows only.  The
+dashboards can then show the full history without re-parsing earlier files.
+
+The template has no order id, so an order's key is a hash of its fields plus
+its occurrence number among identical rows of the same upload.  Re-uploading
+a workbook, or one that overlaps an earlier month, adds nothing twice, while
+genuinely repeated orders within a workbook are kept.
+"""
+
+import datetime
+import os
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+
+from dashboard_core.ingest import LRUCache, dataset_id, frame_nbytes
+from dashboard_core.schemas import TRIPLE_TRACK
+
+# Store location; override with the TRIPLE_TRACK_DB environment variable
+DEFAULT_PATH = Path(__file__).resolve().parent.parent / "triple_track.db"
+
+# Template column -> store column
+COLUMNS = {
+    "Order Date": "order_date",
+    "Buyer Name": "buyer_name",
+    "Location": "location",
+    "Class": "class",
+    "Price": "price",
+    "Quantity": "quantity",
+    "Cost": "cost",
+}
+DERIVED = {"Amount Collected": "amount_collected", "Profit": "profit"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sales (
+    order_key TEXT PRIMARY KEY,
+    order_date TEXT,
+    buyer_name TEXT,
+    location TEXT,
+    class TEXT,
+    price REAL,
+    quantity INTEGER,
+    cost REAL,
+    amount_collected REAL,
+    profit REAL,
+    upload_id TEXT
+);
+CREATE TABLE IF NOT EXISTS monthly (
+    month TEXT,
+    location TEXT,
+    class TEXT,
+    orders INTEGER,
+    quantity INTEGER,
+    amount_collected REAL,
+    profit REAL,
+    PRIMARY KEY (month, location, class)
+);
+CREATE TABLE IF NOT EXISTS uploads (
+    upload_id TEXT PRIMARY KEY,
+    name TEXT,
+    rows INTEGER,
+    added INTEGER,
+    loaded_at TEXT
+);
+"""
+
+# Full-history frames, keyed on (store path, last row id)
+HISTORY = LRUCache(max_entries=2)
+
+
+def order_keys(rows):
+    """Order key of every (normalized) row: field hash plus occurrence number among identical rows."""
+    hashes = pd.util.hash_pandas_object(rows.astype(str), index=False)
+    occurrence = hashes.groupby(hashes).cumcount()
+    return hashes.map("{:016x}".format) + "-" + occurrence.astype(str)
+
+
+def _where(filters, columns):
+    clauses, params = [], []
+    for name, values in filters.items():
+        if values:
+            clauses.append(f"{columns[name]} IN ({', '.join('?' * len(values))})")
+            params.extend(str(value) for value in values)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class SalesStore:
+    """Append-only Triple Track sales table with an incrementally maintained monthly rollup."""
+
+    def __init__(self, path=None):
+        self.path = str(path or os.environ.get("TRIPLE_TRACK_DB") or DEFAULT_PATH)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            with conn:   # one transaction, committed on success
+                yield conn
+        finally:
+            conn.close()
+
+    def version(self):
+        """Changes whenever rows are added (rows are never updated or deleted)."""
+        with self._connect() as conn:
+            return conn.execute("SELECT coalesce(max(rowid), 0) FROM sales").fetchone()[0]
+
+    def __len__(self):
+        with self._connect() as conn:
+            return conn.execute("SELECT count(*) FROM sales").fetchone()[0]
+
+    # -------------------------------
+    # Append
+    # -------------------------------
+    def append(self, df, name, upload_id=None):
+        """Add the rows of an uploaded ``df`` that are not stored yet; return how many were added.
+
+        ``upload_id`` identifies the file (default: ``dataset_id(df)``).  An
+        upload that is already stored returns None without touching the rows,
+        also when several sessions append it at the same time.
+        """
+        upload_id = upload_id or dataset_id(df)
+        if self._has_upload(upload_id):
+            return None
+
+        rows = pd.DataFrame({"order_date": pd.to_datetime(df["Order Date"], errors="coerce")
+                             .dt.strftime("%Y-%m-%d").to_numpy()})
+        for col in ["Buyer Name", "Location", "Class"]:
+            rows[COLUMNS[col]] = df[col].astype(object).to_numpy()
+        for col in ["Price", "Quantity", "Cost"]:
+            rows[COLUMNS[col]] = pd.to_numeric(df[col], errors="coerce").to_numpy()
+        rows.insert(0, "order_key", order_keys(rows))
+        rows = rows.astype(object).where(rows.notna(), None)
+
+        with self._connect() as conn:
+            # Take the write lock before checking again: a session appending the
+            # same upload meanwhile has either committed it or waits for us
+            conn.execute("BEGIN IMMEDIATE")
+            if self._has_upload(upload_id, conn):
+                return None
+            conn.execute("CREATE TEMP TABLE staging AS SELECT order_key, order_date, buyer_name,"
+                         " location, class, price, quantity, cost FROM sales WHERE 0")
+            conn.executemany("INSERT INTO staging VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                             rows.itertuples(index=False, name=None))
+            conn.execute("DELETE FROM staging WHERE order_key IN (SELECT order_key FROM sales)")
+            added = conn.execute("SELECT count(*) FROM staging").fetchone()[0]
+            # Derived columns and the rollup are computed from the new rows only
+            conn.execute("""
+                INSERT INTO sales
+                SELECT order_key, order_date, buyer_name, location, class, price, quantity, cost,
+                       price * quantity, (price - cost) * quantity, ?
+                FROM staging""", (upload_id,))
+            conn.execute("""
+                INSERT INTO monthly
+                SELECT substr(order_date, 1, 7), coalesce(location, ''), coalesce(class, ''), count(*), sum(quantity),
+                       sum(price * quantity), sum((price - cost) * quantity)
+                FROM staging WHERE order_date IS NOT NULL
+                GROUP BY 1, 2, 3
+                ON CONFLICT (month, location, class) DO UPDATE SET
+                    orders = orders + excluded.orders,
+                    quantity = coalesce(quantity, 0) + coalesce(excluded.quantity, 0),
+                    amount_collected = coalesce(amount_collected, 0)
+                        + coalesce(excluded.amount_collected, 0),
+                    profit = coalesce(profit, 0) + coalesce(excluded.profit, 0)""")
+            conn.execute("INSERT INTO uploads VALUES (?, ?, ?, ?, ?)",
+                         (upload_id, name, len(rows), added,
+                          datetime.datetime.now().isoformat(timespec="seconds")))
+            conn.execute("DROP TABLE staging")
+        return added
+
+    def _has_upload(self, upload_id, conn=None):
+        if conn is None:
+            with self._connect() as conn:
+                return self._has_upload(upload_id, conn)
+        return conn.execute("SELECT 1 FROM uploads WHERE upload_id = ?",
+                            (upload_id,)).fetchone() is not None
+
+    # -------------------------------
+    # Queries
+    # -------------------------------
+    def history(self):
+        """All stored orders, with the dashboards' column names and dtypes."""
+        key = (self.path, self.version())
+        df = HISTORY.get(key)
+        if df is None:
+            select = ", ".join(f'{col} AS "{name}"' for name, col in {**COLUMNS, **DERIVED}.items())
+            with self._connect() as conn:
+                df = pd.read_sql_query(
+                    f"SELECT {select} FROM sales ORDER BY order_date, rowid", conn)
+            # Typed like an upload: dates parsed, categoricals, downcast integers
+            df = TRIPLE_TRACK.apply(df)
+            df.attrs["dataset_id"] = f"store:{key[0]}:{key[1]}"
+            HISTORY.put(key, df, frame_nbytes(df))
+        return df.copy(deep=False)
+
+    def monthly(self, **filters):
+        """Monthly totals from the rollup, optionally filtered by Location/Class lists."""
+        where, params = _where(filters, {"Location": "location", "Class": "class"})
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT month AS \"Order Date\", sum(orders) AS Orders, sum(quantity) AS Quantity,"
+                " sum(amount_collected) AS \"Amount Collected\", sum(profit) AS Profit "
+                f"FROM monthly{where} GROUP BY month ORDER BY month", conn, params=params)
+
+    def uploads(self):
+        with self._connect() as conn:
+            return pd.read_sql_query(
+                "SELECT name AS File, rows AS Rows, added AS Added, loaded_at AS Loaded "
+                "FROM uploads ORDER BY loaded_at", conn)
+
+
+_STORES = {}
+
+
+def get_store(path=None):
+    """The ``SalesStore`` at ``path`` (or the default location), opened once per process."""
+    path = str(path or os.environ.get("TRIPLE_TRACK_DB") or DEFAULT_PATH)
+    if path not in _STORES:
+        _STORES[path] = SalesStore(path)
+    return _STORES[path]
@@ -0,0 +1,168 @@
+"""Chunked streaming aggregation for sales CSVs too large to load at once.
+
+``stream_sales_csv`` reads a CSV in fixed-size chunks and folds each chunk
+into mergeable partial sums keyed by year and region, so peak memory is
+bounded by the chunk size plus the number of distinct groups.  The Sales
+dashboard's KPIs, daily to yearly trends, category/region totals and top products
+are all answered from those sums after the fact, for any year/region
+selection.
+"""
+
+import os
+
+import pandas as pd
+
+from dashboard_core.ingest import LRUCache, upload_digest
+from dashboard_core.keys import top_n
+from dashboard_core.schemas import SALES
+from dashboard_core.timeseries import PERIOD, period_start
+
+CHUNK_ROWS = 200_000
+MEASURES = ["Sales", "Profit", "Quantity"]
+
+# Partial frames are compacted once this many chunks have been folded in
+COMPACT_EVERY = 8
+
+AGGREGATES = LRUCache(max_entries=4)
+
+
+def _sum_by(frame, keys):
+    if not keys:
+        return pd.DataFrame({col: [frame[col].sum()] for col in MEASURES})
+    return frame.groupby(keys, observed=True)[MEASURES].sum().reset_index()
+
+
+class SalesAggregates:
+    """Mergeable Sales/Profit/Quantity sums by (year, region) x day/category/product."""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.has_dates = "Order Date" in self.columns
+        self.has_region = "Region" in self.columns
+        self.dims = (["Year"] if self.has_dates else []) + (["Region"] if self.has_region else [])
+        self.views = {"Day": self.dims + ["Day"] if self.has_dates else None,
+                      "Category": self.dims + ["Category"] if "Category" in self.columns else None,
+                      "Product Name": (self.dims + ["Product Name"]
+                                       if "Product Name" in self.columns else None)}
+        self.views = {name: keys for name, keys in self.views.items() if keys is not None}
+        self.views["Total"] = list(self.dims)
+        self._parts = {name: [] for name in self.views}
+        self.rows = 0
+        self.source_key = None
+
+    # -------------------------------
+    # Building
+    # -------------------------------
+    def add_chunk(self, chunk):
+        """Fold one raw chunk into the partial sums."""
+        chunk = chunk.copy(deep=False)
+        for col in MEASURES:
+            chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+        if self.has_dates:
+            dates = SALES.parse_dates(chunk["Order Date"])
+            chunk["Year"] = dates.dt.year
+            chunk["Day"] = dates.dt.normalize()
+        for name, keys in self.views.items():
+            self._parts[name].append(_sum_by(chunk, keys))
+        self.rows += len(chunk)
+        if len(self._parts["Total"]) >= COMPACT_EVERY:
+            self.compact()
+
+    def merge(self, other):
+        """Fold another ``SalesAggregates`` over the same columns into this one."""
+        for name in self.views:
+            self._parts[name].extend(other._parts[name])
+        self.rows += other.rows
+        self.compact()
+        return self
+
+    def compact(self):
+        for name, keys in self.views.items():
+            if len(self._parts[name]) > 1:
+                merged = pd.concat(self._parts[name], ignore_index=True)
+                self._parts[name] = [_sum_by(merged, keys)]
+
+    def frame(self, name):
+        self.compact()
+        parts = self._parts[name]
+        return parts[0] if parts else pd.DataFrame(columns=self.views[name] + MEASURES)
+
+    def nbytes(self):
+        return sum(int(self.frame(name).memory_usage(deep=True).sum()) for name in self.views)
+
+    # -------------------------------
+    # Queries
+    # -------------------------------
+    def years(self):
+        return sorted(int(y) for y in self.frame("Total")["Year"].dropna().unique())
+
+    def regions(self):
+        return self.frame("Total")["Region"].dropna().unique().tolist()
+
+    def _selected(self, name, year=None, regions=None):
+        frame = self.frame(name)
+        if self.has_dates and year is not None:
+            frame = frame[frame["Year"] == year]
+        if self.has_region and regions is not None:
+            frame = frame[frame["Region"].isin(regions)]
+        return frame
+
+    def totals(self, year=None, regions=None):
+        """(sales, profit, quantity) for the selection."""
+        frame = self._selected("Total", year, regions)
+        return tuple(frame[col].sum() for col in MEASURES)
+
+    def trend(self, freq="M", year=None, regions=None):
+        """Per-period sums indexed by period start, like the in-memory trend."""
+        days = self._selected("Day", year, regions)
+        return days.groupby(period_start(days["Day"], freq))[MEASURES].sum().rename_axis(PERIOD)
+
+    def by(self, name, year=None, regions=None):
+        """Sales per ``name`` ("Category" or "Region")."""
+        source = "Total" if name == "Region" else name
+        return (self._selected(source, year, regions)
+                .groupby(name, observed=True)["Sales"].sum().reset_index())
+
+    def top_products(self, n=10, year=None, regions=None):
+        return top_n(self._selected("Product Name", year, regions), "Product Name", MEASURES,
+                     by="Sales", n=n)
+
+
+def stream_sales_csv(source, chunksize=CHUNK_ROWS, on_progress=None):
+    """Aggregate a sales CSV chunk by chunk, reusing earlier passes over the same file.
+
+    ``source`` is an uploaded file or path; ``on_progress`` is called with the
+    fraction of bytes consumed after each chunk.
+    """
+    if hasattr(source, "getvalue"):
+        key = ("bytes", upload_digest(source))
+        total = source.size
+        source.seek(0)
+    else:
+        stat = os.stat(source)
+        key = ("path", os.path.abspath(source), stat.st_size, stat.st_mtime_ns)
+        total = stat.st_size
+
+    aggregates = AGGREGATES.get((key, chunksize))
+    if aggregates is not None:
+        return aggregates
+
+    handle = source if hasattr(source, "getvalue") else open(source, "rb")
+
+    aggregates = None
+    try:
+        for chunk in pd.read_csv(handle, chunksize=chunksize):
+            if aggregates is None:
+                aggregates = SalesAggregates(chunk.columns)
+            aggregates.add_chunk(chunk)
+            if on_progress is not None and total:
+                on_progress(min(handle.tell() / total, 1.0))
+    finally:
+        if handle is not source:
+            handle.close()
+    if aggregates is None:
+        raise ValueError("The file has no rows.")
+    aggregates.compact()
+    aggregates.source_key = key
+    AGGREGATES.put((key, chunksize), aggregates, nbytes=aggregates.nbytes())
+    return aggregates
@@ -0,0 +1,121 @@
+"""Day/week/month/quarter/year rollups behind the dashboards' time series.
+
+Grouping raw rows with ``dt.to_period`` on every rerun re-reads every date,
+and grouping on formatted month names sorts "Apr" before "Jan".
+``TimeRollups`` sums the measures once per dataset at day grain, by the
+dimensions the page filters on, and rolls the days up to weeks (starting
+on Monday), months, quarters and years.  A series at any granularity is a
+filter and a group-by over one of those tables, whose size is bounded by
+periods x dimension values rather than by rows, so switching granularity
+does not touch the data.
+"""
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from dashboard_core.ingest import LRUCache, dataset_id, frame_nbytes
+
+# Label -> pandas frequency
+GRANULARITIES = {"Day": "D", "Week": "W", "Month": "M", "Quarter": "Q", "Year": "Y"}
+PERIOD = "Period"
+
+ROLLUPS = LRUCache(max_entries=8)
+
+
+def period_start(dates, freq):
+    """Start of the ``freq`` period containing each of ``dates``, as ``datetime64[ns]``."""
+    dates = np.asarray(dates, dtype="datetime64[ns]")
+    if freq == "D":
+        starts = dates.astype("datetime64[D]")
+    elif freq == "W":
+        days = dates.astype("datetime64[D]")
+        # 1970-01-01 was a Thursday, i.e. day 3 of a Monday-based week
+        starts = days - ((days.astype(np.int64) + 3) % 7).astype("timedelta64[D]")
+    elif freq == "M":
+        starts = dates.astype("datetime64[M]")
+    elif freq == "Q":
+        months = dates.astype("datetime64[M]").astype(np.int64)
+        starts = (months - months % 3).astype("datetime64[M]")
+    elif freq == "Y":
+        starts = dates.astype("datetime64[Y]")
+    else:
+        raise ValueError(f"Unsupported granularity: {freq!r}")
+    return np.where(np.isnat(dates), np.datetime64("NaT"), starts).astype("datetime64[ns]")
+
+
+class TimeRollups:
+    """Sums of ``measures`` and a row count per period and ``dims``, for every granularity."""
+
+    def __init__(self, df, date_col, measures=(), dims=(), count="Rows"):
+        self.measures = list(measures)
+        self.dims = list(dims)
+        self.count = count
+        dates = df[date_col]
+        if not pd.api.types.is_datetime64_any_dtype(dates):
+            dates = pd.to_datetime(dates, errors="coerce")
+        valid = dates.notna().to_numpy()
+
+        rows = pd.DataFrame({PERIOD: period_start(dates.to_numpy()[valid], "D"),
+                             **{col: df[col].array[valid] for col in self.dims + self.measures}})
+        grouped = rows.groupby([PERIOD, *self.dims], observed=True, sort=True)
+        days = grouped[self.measures].sum()
+        days[count] = grouped.size()
+        self.tables = {"D": days.reset_index()}
+        for freq in ["W", "M", "Q", "Y"]:
+            days = self.tables["D"]
+            self.tables[freq] = self._rollup(days.assign(**{PERIOD: period_start(days[PERIOD], freq)}))
+
+    def _rollup(self, table):
+        return (table.groupby([PERIOD, *self.dims], observed=True, sort=True)
+                [[*self.measures, self.count]].sum().reset_index())
+
+    def nbytes(self):
+        return sum(frame_nbytes(table) for table in self.tables.values())
+
+    def series(self, freq="M", start=None, end=None, empty="all", **filters):
+        """Per-period sums indexed by period start, for dates ``start``..``end`` (inclusive).
+
+        ``filters`` maps dimensions to selected values.  An empty selection
+        means no restriction when ``empty="all"`` or no rows when
+        ``empty="none"``.  Periods cut by ``start``/``end`` only count the
+        days inside the range.
+        """
+        if start is None and end is None:
+            table = self.tables[freq]
+        else:
+            table = self.tables["D"]
+            days = table[PERIOD]
+            within = np.ones(len(table), dtype=bool)
+            if start is not None:
+                within &= days >= pd.Timestamp(start).normalize()
+            if end is not None:
+                within &= days <= pd.Timestamp(end)
+            table = table[within]
+            table = table.assign(**{PERIOD: period_start(table[PERIOD], freq)})
+        for dim, values in filters.items():
+            if values or empty == "none":
+                table = table[table[dim].isin(values)]
+        return table.groupby(PERIOD, sort=True)[[*self.measures, self.count]].sum()
+
+
+def get_rollups(df, date_col, measures=(), dims=(), count="Rows"):
+    """Return the ``TimeRollups`` of the full dataset ``df``, building them on first use."""
+    key = (dataset_id(df), date_col, tuple(measures), tuple(dims), count)
+    rollups = ROLLUPS.get(key)
+    if rollups is None:
+        rollups = TimeRollups(df, date_col, measures, dims, count)
+        ROLLUPS.put(key, rollups, nbytes=rollups.nbytes())
+    return rollups
+
+
+def granularity(key, default="Month", container=st, label="Granularity"):
+    """A horizontal granularity switch; returns the selected pandas frequency."""
+    labels = list(GRANULARITIES)
+    choice = container.radio(label, labels, index=labels.index(default), horizontal=True, key=key)
+    return GRANULARITIES[choice]
+
+
+def selected(key, default="Month"):
+    """The frequency the ``granularity(key)`` switch is set to, without drawing it."""
+    return GRANULARITIES[st.session_state.get(key, default)]
@@ -0,0 +1,185 @@
+"""Headcount, attrition and tenure over time for the HR dashboard.
+
+Headcount on a date is the number of hires up to that date minus the number
+of exits up to it.  Hire dates, exit dates and tenures are sorted once per
+dataset within each Department x Gender group, so the position of a date in
+a sorted array is the running total of events up to it: a headcount series
+for any filter is one binary search per selected group and period boundary,
+instead of a pass over every employee for every period.  Results are cached
+per (granularity, filter).
+
+An employee counts as active from the hire date up to, but not including,
+the exit date.  Employees without a hire date are left out; a missing exit
+date means still employed.  Series and tenures run up to the latest hire or
+exit in the data.
+"""
+
+import numpy as np
+import pandas as pd
+
+from dashboard_core.ingest import LRUCache, dataset_id, frame_nbytes
+from dashboard_core.timeseries import PERIOD, period_start
+
+# Tenure histogram: [edge, next edge) in years
+TENURE_EDGES = [0, 1, 2, 5, 10, 20, np.inf]
+TENURE_LABELS = ["< 1 yr", "1-2 yrs", "2-5 yrs", "5-10 yrs", "10-20 yrs", "20+ yrs"]
+
+WORKFORCES = LRUCache(max_entries=4)
+
+
+def _dates(series):
+    if not pd.api.types.is_datetime64_any_dtype(series):
+        series = pd.to_datetime(series, errors="coerce")
+    return series.to_numpy(dtype="datetime64[ns]")
+
+
+def _encode(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), list(series.cat.categories)
+    codes, uniques = pd.factorize(series, sort=True)
+    return codes, list(uniques)
+
+
+class _GroupedSorted:
+    """Values sorted within each group code, with per-group offsets."""
+
+    def __init__(self, groups, values, n_groups):
+        order = np.lexsort((values, groups))
+        self.values = values[order]
+        self.offsets = np.searchsorted(groups[order], np.arange(n_groups + 1))
+
+    def count(self, groups, bounds, side="right"):
+        """Values ``<= bounds`` (``side="right"``) or ``< bounds`` in the given groups."""
+        total = np.zeros(len(bounds), dtype=np.int64)
+        for group in groups:
+            values = self.values[self.offsets[group]:self.offsets[group + 1]]
+            total += np.searchsorted(values, bounds, side=side)
+        return total
+
+    def nbytes(self):
+        return self.values.nbytes + self.offsets.nbytes
+
+
+class Workforce:
+    """Sorted hire/exit events and tenures of a dataset's employees, by ``dims`` group."""
+
+    def __init__(self, df, hire_col="HireDate", exit_col="ExitDate", dims=("Department", "Gender")):
+        self.dims = list(dims)
+        hires, exits = _dates(df[hire_col]), _dates(df[exit_col])
+        known = ~np.isnat(hires)
+        hires, exits = hires[known], exits[known]
+        # An exit recorded before the hire date is taken as a same-day exit
+        exits = np.where(~np.isnat(exits) & (exits < hires), hires, exits)
+
+        self.values, sizes, groups = {}, [], np.zeros(len(hires), dtype=np.int64)
+        for dim in self.dims:
+            codes, values = _encode(df[dim])
+            self.values[dim] = {value: code for code, value in enumerate(values)}
+            sizes.append(len(values))
+            # Missing values get their own (unselectable) code
+            codes = codes[known]
+            groups = groups * (len(values) + 1) + np.where(codes >= 0, codes, len(values))
+        self.sizes = sizes
+        n_groups = int(np.prod([size + 1 for size in sizes]))
+
+        exited = ~np.isnat(exits)
+        latest = [dates.max() for dates in [hires, exits[exited]] if len(dates)]
+        self.first = hires.min() if len(hires) else np.datetime64("NaT")
+        self.as_of = max(latest) if latest else np.datetime64("NaT")
+        self.hires = _GroupedSorted(groups, hires, n_groups)
+        self.exits = _GroupedSorted(groups[exited], exits[exited], n_groups)
+        ends = np.where(exited, exits, self.as_of)
+        years = (ends - hires) / np.timedelta64(1, "D") / 365.25
+        self.tenure_active = _GroupedSorted(groups[~exited], years[~exited], n_groups)
+        self.tenure_exited = _GroupedSorted(groups[exited], years[exited], n_groups)
+        self._results = LRUCache(max_entries=128)
+
+    def nbytes(self):
+        return sum(part.nbytes() for part in
+                   [self.hires, self.exits, self.tenure_active, self.tenure_exited])
+
+    def _groups(self, empty, filters):
+        """Group codes selected by ``filters`` (dimension -> values)."""
+        selected = []
+        for dim, size in zip(self.dims, self.sizes):
+            values = filters.get(dim)
+            if values is None or (not values and empty == "all"):
+                codes = range(size)
+            else:
+                codes = sorted({self.values[dim][v] for v in values if v in self.values[dim]})
+            selected.append(np.asarray(codes, dtype=np.int64))
+        groups = np.zeros(1, dtype=np.int64)
+        for codes, size in zip(selected, self.sizes):
+            groups = (groups[:, None] * (size + 1) + codes[None, :]).ravel()
+        return groups
+
+    def _cached(self, name, key, compute):
+        key = (name, *key)
+        result = self._results.get(key)
+        if result is None:
+            result = compute()
+            self._results.put(key, result, frame_nbytes(result))
+        return result
+
+    @staticmethod
+    def _filter_key(empty, filters):
+        return empty, tuple(sorted((dim, tuple(sorted(map(str, values))))
+                                   for dim, values in filters.items() if values is not None))
+
+    def series(self, freq="M", empty="none", **filters):
+        """Headcount, hires, exits and attrition rate per period, indexed by period start.
+
+        ``Headcount`` is the number of active employees at the end of the
+        period; ``Attrition Rate`` is exits during the period over the
+        average of the start and end headcounts.  ``filters`` maps
+        ``dims`` to selected values; an empty selection selects nobody
+        when ``empty="none"`` (as in the HR sidebar) or everybody when
+        ``empty="all"``.
+        """
+        return self._cached("series", (freq, *self._filter_key(empty, filters)),
+                            lambda: self._series(freq, self._groups(empty, filters)))
+
+    def _series(self, freq, groups):
+        if np.isnat(self.first):
+            return pd.DataFrame(columns=["Headcount", "Hires", "Exits", "Attrition Rate"],
+                                index=pd.DatetimeIndex([], name=PERIOD))
+        first = period_start([self.first], freq)[0]
+        starts = np.unique(period_start(
+            np.arange(first, self.as_of + np.timedelta64(1, "D"), np.timedelta64(1, "D")), freq))
+        bounds = np.append(starts, self.as_of + np.timedelta64(1, "D"))   # period start ... after as_of
+        # Events strictly before each boundary: running totals at period starts
+        hired = self.hires.count(groups, bounds, side="left")
+        left = self.exits.count(groups, bounds, side="left")
+        active = hired - left
+        exits = np.diff(left)
+        average = (active[:-1] + active[1:]) / 2
+        with np.errstate(divide="ignore", invalid="ignore"):
+            rate = np.where(average > 0, exits / average, np.nan)
+        return pd.DataFrame({"Headcount": active[1:], "Hires": np.diff(hired), "Exits": exits,
+                             "Attrition Rate": rate},
+                            index=pd.DatetimeIndex(starts, name=PERIOD))
+
+    def tenure(self, empty="none", **filters):
+        """Employees per tenure band (``TENURE_LABELS``) and status (Active/Exited)."""
+        return self._cached("tenure", self._filter_key(empty, filters),
+                            lambda: self._tenure(self._groups(empty, filters)))
+
+    def _tenure(self, groups):
+        edges = np.asarray(TENURE_EDGES[:-1], dtype=float)
+        frames = []
+        for status, tenures in [("Active", self.tenure_active), ("Exited", self.tenure_exited)]:
+            below = np.append(tenures.count(groups, edges, side="left"),
+                              tenures.count(groups, np.array([np.inf]), side="right"))
+            frames.append(pd.DataFrame({"Tenure": TENURE_LABELS, "Status": status,
+                                        "Count": np.diff(below)}))
+        return pd.concat(frames, ignore_index=True)
+
+
+def get_workforce(df, hire_col="HireDate", exit_col="ExitDate", dims=("Department", "Gender")):
+    """Return the ``Workforce`` of the full dataset ``df``, building it on first use."""
+    key = (dataset_id(df), hire_col, exit_col, tuple(dims))
+    workforce = WORKFORCES.get(key)
+    if workforce is None:
+        workforce = Workforce(df, hire_col, exit_col, dims)
+        WORKFORCES.put(key, workforce, nbytes=workforce.nbytes())
+    return workforce
@@ -0,0 +1,43 @@
+"""Small synthetic datasets shared by the tests.
+
+Each structure under test is compared against a plain pandas filter or
+group-by over the same frame, so the frames only need to be large enough
+to cover several months, values and boundary cases.
+"""
+
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from dashboard_core.schemas import HR, SUPERSTORE, TRIPLE_TRACK
+
+ROWS = 3000
+
+
+@pytest.fixture(scope="session")
+def superstore():
+    """Typed Superstore rows, sorted by ``Order Date`` like the snapshot."""
+    return SUPERSTORE.apply(synthetic.superstore(ROWS, seed=1))
+
+
+@pytest.fixture(scope="session")
+def unsorted_superstore(superstore):
+    """The same rows in shuffled order (and with a fresh dataset id)."""
+    df = superstore.sample(frac=1, random_state=2).reset_index(drop=True)
+    df.attrs = {}
+    return df
+
+
+@pytest.fixture(scope="session")
+def triple_track():
+    return TRIPLE_TRACK.apply(synthetic.triple_track(ROWS, seed=1))
+
+
+@pytest.fixture(scope="session")
+def hr():
+    return HR.apply(synthetic.hr(ROWS, seed=1))
+
+
+def picks(series, n=2):
+    """The ``n`` most frequent values of ``series``, to filter on."""
+    return list(pd.Series(series).value_counts().index[:n])
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from dashboard_core.bitmap import BitmapIndex
+from tests.conftest import picks
+
+COLUMNS = ["Region", "State", "City", "Segment"]
+
+
+@pytest.fixture(scope="module")
+def index(superstore):
+    return BitmapIndex(superstore, COLUMNS)
+
+
+def test_select_matches_isin(superstore, index):
+    regions, segments = picks(superstore["Region"]), picks(superstore["Segment"], 1)
+    mask = index.select(Region=regions, Segment=segments, City=[])
+    want = superstore["Region"].isin(regions) & superstore["Segment"].isin(segments)
+    np.testing.assert_array_equal(index.rows(mask), want.to_numpy())
+    assert index.count(mask) == want.sum()
+    assert index.filter(superstore, mask).equals(superstore[want])
+    # Reused from the mask cache on the next call
+    np.testing.assert_array_equal(index.select(Region=regions, Segment=segments), mask)
+
+
+def test_empty_selection(superstore, index):
+    assert index.select(Region=[]) is None
+    assert index.count(index.select(empty="none", Region=[])) == 0
+    assert index.count(index.mask("Region", ["Nowhere"])) == 0
+
+
+def test_options_within_selection(superstore, index):
+    states = picks(superstore["State"], 3)
+    within = index.select(State=states)
+    want = sorted(superstore.loc[superstore["State"].isin(states), "City"].unique())
+    assert index.options("City", within) == want
+    assert index.options("Region") == sorted(superstore["Region"].unique())
+
+
+@pytest.mark.parametrize("start, stop", [(0, 0), (0, 1), (3, 11), (8, 16), (5, 3000), (0, 3000)])
+def test_span_and_take(index, start, stop):
+    want = np.zeros(index.n_rows, dtype=bool)
+    want[start:stop] = True
+    np.testing.assert_array_equal(index.rows(index.span(start, stop)), want)
+    np.testing.assert_array_equal(index.rows(index.take(np.flatnonzero(want))), want)
+    np.testing.assert_array_equal(index.positions(index.span(start, stop)), np.flatnonzero(want))
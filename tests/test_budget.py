@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from dashboard_core import ingest, memory
+from dashboard_core.ingest import LRUCache
+
+
+@pytest.fixture
+def caches(monkeypatch):
+    """Two caches that are, as far as the process budget sees, the only ones."""
+    a, b = LRUCache(max_entries=10, max_bytes=1000), LRUCache(max_entries=10, max_bytes=1000)
+    monkeypatch.setattr(ingest, "live_caches", lambda: [a, b])
+    monkeypatch.setattr(ingest, "PROCESS_MAX_BYTES", 1500)
+    return a, b
+
+
+def test_entry_and_byte_bounds_evict_least_recently_used(caches):
+    cache = LRUCache(max_entries=3, max_bytes=1000)
+    for key in "abc":
+        cache.put(key, key, nbytes=100)
+    cache.get("a")
+    cache.put("d", "d", nbytes=100)
+    assert cache.keys() == ["c", "a", "d"]
+    cache.put("e", "e", nbytes=850)
+    assert cache.keys() == ["d", "e"] and cache.nbytes == 950
+    assert cache.stats()["evictions"] == 3
+
+
+def test_newest_entry_is_kept_even_over_budget(caches):
+    cache = LRUCache(max_entries=3, max_bytes=100)
+    cache.put("small", 1, nbytes=10)
+    cache.put("big", 2, nbytes=500)
+    assert cache.keys() == ["big"] and cache.nbytes == 500
+
+
+def test_replacing_an_entry_updates_its_bytes(caches):
+    a, _ = caches
+    a.put("k", 1, nbytes=300)
+    a.put("k", 2, nbytes=100)
+    assert a.nbytes == 100 and a.get("k") == 2
+
+
+def test_process_budget_evicts_oldest_across_caches(caches):
+    a, b = caches
+    a.put("a1", 1, nbytes=500)
+    b.put("b1", 1, nbytes=500)
+    a.put("a2", 1, nbytes=400)
+    b.get("b1")
+    b.put("b2", 1, nbytes=400)   # 1800 bytes: the oldest use, a1, goes
+    assert a.keys() == ["a2"] and b.keys() == ["b1", "b2"]
+    ingest.enforce_process_budget(max_bytes=500)
+    # Each cache keeps its newest entry
+    assert a.keys() == ["a2"] and b.keys() == ["b2"]
+
+
+def test_sizeof():
+    values = np.zeros(100, dtype=np.int64)
+    assert memory.sizeof(values) == 800
+    assert memory.sizeof([values, {"x": values}]) > 1600
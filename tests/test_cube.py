@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from dashboard_core.cube import COUNT_MEASURE, CUBE_MEASURES, SalesCube
+from tests.conftest import picks
+
+MEASURES = CUBE_MEASURES + [COUNT_MEASURE]
+
+
+def expected(df, by, start=None, end=None, **filters):
+    rows = df
+    if start is not None:
+        rows = rows[rows["Order Date"] >= pd.Timestamp(start)]
+    if end is not None:
+        rows = rows[rows["Order Date"] <= pd.Timestamp(end)]
+    for dim, values in filters.items():
+        if values:
+            rows = rows[rows[dim].isin(values)]
+    grouped = rows.groupby(by, observed=True)
+    out = grouped[CUBE_MEASURES].sum()
+    out[COUNT_MEASURE] = grouped.size()
+    return out.reset_index()
+
+
+def compare(cube, df, by, start=None, end=None, **filters):
+    got = SalesCube.rollup(cube.slice(start, end, **filters), by, MEASURES)
+    want = expected(df, by, start, end, **filters)
+    pd.testing.assert_frame_equal(got.sort_values(by, ignore_index=True),
+                                  want.sort_values(by, ignore_index=True),
+                                  check_dtype=False, check_categorical=False)
+
+
+@pytest.mark.parametrize("start, end", [
+    (None, None),
+    ("2015-01-01", "2016-12-31"),   # whole months only
+    ("2015-03-17", "2016-02-03"),   # partial months at both ends
+    ("2015-05-10", "2015-05-20"),   # within one month
+    ("2013-01-01", "2014-01-15"),   # starts before the data
+    ("2020-01-01", "2021-01-01"),   # after the data
+])
+@pytest.mark.parametrize("fixture", ["superstore", "unsorted_superstore"])
+def test_slice_matches_pandas(request, fixture, start, end):
+    df = request.getfixturevalue(fixture)
+    cube = SalesCube(df)
+    compare(cube, df, ["Region"], start, end)
+    compare(cube, df, ["Category", "Segment"], start, end,
+            Region=picks(df["Region"]), State=[])
+    compare(cube, df, ["City"], start, end, State=picks(df["State"], 3))
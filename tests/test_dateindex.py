@@ -0,0 +1,53 @@
+import pandas as pd
+import pytest
+
+from dashboard_core.dateindex import DateIndex
+from dashboard_core.timeseries import PERIOD, period_start
+from tests.conftest import picks
+
+MEASURES = ["Sales", "Profit", "Quantity"]
+RANGES = [(None, None), ("2015-03-17", "2016-02-03"), ("2015-05-10", "2015-05-10"),
+          ("2013-01-01", "2014-01-15"), ("2020-01-01", "2021-01-01")]
+
+
+def rows_in(df, start, end, **filters):
+    if start is not None:
+        df = df[df["Order Date"] >= pd.Timestamp(start)]
+    if end is not None:
+        df = df[df["Order Date"] <= pd.Timestamp(end)]
+    for dim, values in filters.items():
+        if values:
+            df = df[df[dim].isin(values)]
+    return df
+
+
+@pytest.mark.parametrize("start, end", RANGES)
+@pytest.mark.parametrize("fixture", ["superstore", "unsorted_superstore"])
+def test_slice_and_totals(request, fixture, start, end):
+    df = request.getfixturevalue(fixture)
+    index = DateIndex(df)
+    want = rows_in(df, start, end)
+    assert index.slice(start, end).equals(want)
+
+    for filters in [{}, {"Region": picks(df["Region"])}, {"Region": [], "City": picks(df["City"])}]:
+        want = rows_in(df, start, end, **filters)
+        totals = index.totals(start, end, **filters)
+        assert totals["Orders"] == len(want)
+        for name in MEASURES:
+            assert totals[name] == pytest.approx(want[name].sum())
+
+    assert index.totals(start, end, Region=["West"], Segment=["Consumer"]) is None
+
+
+@pytest.mark.parametrize("freq", ["D", "W", "M", "Q", "Y"])
+@pytest.mark.parametrize("start, end", RANGES[:3])
+def test_series(unsorted_superstore, freq, start, end):
+    df = unsorted_superstore
+    index = DateIndex(df)
+    for filters in [{}, {"Segment": picks(df["Segment"], 1)}]:
+        rows = rows_in(df, start, end, **filters)
+        grouped = rows.groupby(pd.DatetimeIndex(period_start(rows["Order Date"], freq), name=PERIOD))
+        want = grouped[MEASURES].sum()
+        want["Orders"] = grouped.size()
+        pd.testing.assert_frame_equal(index.series(start, end, freq, **filters), want,
+                                      check_dtype=False, check_index_type=False, check_freq=False)
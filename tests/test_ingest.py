@@ -0,0 +1,50 @@
+import io
+
+import pandas as pd
+
+from dashboard_core.ingest import LRUCache, concat_frames, file_digest, load_table, upload_digest
+
+
+class Upload:
+    """Stand-in for a Streamlit ``UploadedFile``."""
+
+    def __init__(self, name, data):
+        self.name = name
+        self.data = data
+
+    def getvalue(self):
+        return self.data
+
+
+def test_load_table_reuses_parse_of_same_bytes():
+    cache = LRUCache()
+    data = b"a,b\n1,x\n2,y\n"
+    first = load_table(Upload("one.csv", data), cache=cache)
+    second = load_table(Upload("two.csv", data), cache=cache)
+    pd.testing.assert_frame_equal(first, second)
+    assert cache.stats()["hits"] == 1 and cache.stats()["entries"] == 1
+    assert first.attrs["dataset_id"] == second.attrs["dataset_id"]
+
+
+def test_load_table_copies_do_not_share_new_columns():
+    cache = LRUCache()
+    first = load_table(Upload("a.csv", b"a\n1\n2\n"), cache=cache)
+    first["b"] = first["a"] * 2
+    assert "b" not in load_table(Upload("a.csv", b"a\n1\n2\n"), cache=cache).columns
+
+
+def test_upload_digest_matches_file_digest():
+    data = b"x" * 1000
+    assert upload_digest(io.BytesIO(data)) == file_digest(data)
+    assert upload_digest(Upload("a.csv", data)) == file_digest(data)
+
+
+def test_concat_frames_keeps_one_dictionary():
+    a = pd.DataFrame({"c": pd.Categorical(["x", "y"]), "v": [1, 2]})
+    b = pd.DataFrame({"c": pd.Categorical(["z", "x"]), "v": [3, 4]})
+    c = pd.DataFrame({"c": ["w", "y"], "v": [5, 6]})   # not categorical in this file
+    combined = concat_frames([a, b, c])
+    assert isinstance(combined["c"].dtype, pd.CategoricalDtype)
+    assert list(combined["c"].cat.categories) == ["w", "x", "y", "z"]
+    assert list(combined["c"].astype(str)) == ["x", "y", "z", "x", "w", "y"]
+    assert list(combined["v"]) == [1, 2, 3, 4, 5, 6]
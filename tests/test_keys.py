@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_core.keys import distinct_count, group_sums, top_n
+
+MEASURES = ["Sales", "Profit", "Quantity"]
+
+
+@pytest.mark.parametrize("key", ["Product Name", "Customer ID", "City"])
+def test_top_n_matches_groupby(superstore, key):
+    rows = superstore[superstore["Region"] == "West"]
+    want = rows.groupby(key, observed=True)[MEASURES].sum().nlargest(10, "Sales")
+    got = top_n(rows, key, MEASURES, by="Sales", n=10)
+    pd.testing.assert_frame_equal(got, want, check_dtype=False, check_index_type=False,
+                                  check_categorical=False)
+    assert got["Quantity"].dtype == np.int64
+
+
+def test_group_sums_on_plain_column_with_missing_values():
+    df = pd.DataFrame({"k": ["a", None, "b", "a"], "v": [1.0, 2.0, np.nan, 4.0]})
+    labels, counts, sums = group_sums(df, "k", ["v"])
+    assert dict(zip(labels, counts)) == {"a": 2, "b": 1}
+    assert dict(zip(labels, sums["v"])) == {"a": 5.0, "b": 0.0}
+
+
+def test_distinct_count(superstore):
+    rows = superstore[superstore["Segment"] == "Consumer"]["Customer ID"]
+    assert distinct_count(rows) == rows.nunique()
+    assert distinct_count(rows, state=("test", "Consumer")) == rows.nunique()
+    assert distinct_count(pd.Series(["x", None, "y", "x"])) == 2
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import synthetic
+from dashboard_core.ingest import read_csv
+from dashboard_core.schemas import HR, SUPERSTORE, TRIPLE_TRACK, to_int
+
+
+@pytest.mark.parametrize("values, dtype", [
+    ([1, 2, 3], np.int16),
+    ([0, 40_000], np.int32),
+    ([0, 2 ** 40], np.int64),
+    (["7", "8"], np.int16),
+    ([1.0, None], np.float64),
+    ([1.5, 2.0], np.float64),
+])
+def test_to_int(values, dtype):
+    result = to_int(pd.Series(values))
+    assert result.dtype == dtype
+    pd.testing.assert_series_equal(result.astype(np.float64),
+                                   pd.to_numeric(pd.Series(values)).astype(np.float64))
+
+
+def test_superstore_types_and_order():
+    raw = synthetic.superstore(500, seed=3)
+    df = SUPERSTORE.apply(raw.copy())
+    assert df["Order Date"].is_monotonic_increasing
+    assert isinstance(df["Region"].dtype, pd.CategoricalDtype)
+    assert df["Sales"].dtype == np.float64 and df["Discount"].dtype == np.float32
+    want = pd.to_datetime(raw["Order Date"], format="%d/%m/%Y").sort_values(ignore_index=True)
+    pd.testing.assert_series_equal(df["Order Date"], want, check_dtype=False)
+    assert df["Sales"].sum() == pytest.approx(raw["Sales"].sum())
+
+
+def test_dates_in_another_layout_fall_back():
+    # e.g. Excel cells read as datetimes next to text in the declared layout
+    values = pd.Series(["03/04/2015", pd.Timestamp("2015-04-05"), "not a date", None], dtype=object)
+    parsed = SUPERSTORE.parse_dates(values)
+    assert list(parsed[:2]) == [pd.Timestamp("2015-04-03"), pd.Timestamp("2015-04-05")]
+    assert parsed[2:].isna().all()
+
+
+def test_derived_columns():
+    df = TRIPLE_TRACK.apply(synthetic.triple_track(100, seed=3))
+    assert np.allclose(df["Amount Collected"], df["Price"] * df["Quantity"])
+    assert np.allclose(df["Profit"], (df["Price"] - df["Cost"]) * df["Quantity"])
+
+
+def test_csv_reads_declared_columns_only(tmp_path):
+    path = tmp_path / "hr.csv"
+    synthetic.hr(50).assign(Extra=1).to_csv(path, index=False, encoding="utf-8-sig")
+    df = HR.apply(read_csv(path, **HR.csv_options))
+    assert list(df.columns) == list(HR.columns)   # BOM stripped from the first header
+    assert df["HireDate"].dtype.kind == "M" and df["Age"].dtype == np.int16
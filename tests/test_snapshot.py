@@ -0,0 +1,61 @@
+import os
+
+import pandas as pd
+
+from benchmarks import synthetic
+from dashboard_core import snapshot
+
+
+def write_csv(path, rows, seed=0):
+    synthetic.superstore(rows, seed).to_csv(path, index=False, encoding="ISO-8859-1")
+    return str(path)
+
+
+def test_snapshot_matches_csv(tmp_path):
+    csv_path = write_csv(tmp_path / "store.csv", 500)
+    path = snapshot.ensure_snapshot(csv_path, csv_options=snapshot.SUPERSTORE_CSV_OPTIONS)
+    expected = snapshot.apply_superstore_types(
+        pd.read_csv(csv_path, **snapshot.SUPERSTORE_CSV_OPTIONS))
+    pd.testing.assert_frame_equal(pd.read_parquet(path), expected, check_categorical=False)
+    assert pd.read_parquet(path)["Order Date"].is_monotonic_increasing
+
+
+def test_snapshot_stamp_tracks_source(tmp_path):
+    csv_path = write_csv(tmp_path / "store.csv", 200)
+    path = snapshot.ensure_snapshot(csv_path, csv_options=snapshot.SUPERSTORE_CSV_OPTIONS)
+    assert snapshot.is_fresh(csv_path, path)
+
+    # Same contents with a new mtime: still fresh, by digest
+    os.utime(csv_path, ns=(0, 0))
+    assert snapshot.is_fresh(csv_path, path)
+
+    write_csv(csv_path, 300, seed=1)
+    assert not snapshot.is_fresh(csv_path, path)
+    snapshot.ensure_snapshot(csv_path, csv_options=snapshot.SUPERSTORE_CSV_OPTIONS)
+    assert snapshot.is_fresh(csv_path, path)
+    assert len(pd.read_parquet(path)) == 300
+
+
+def test_snapshot_of_older_format_is_stale(tmp_path, monkeypatch):
+    csv_path = write_csv(tmp_path / "store.csv", 100)
+    path = snapshot.ensure_snapshot(csv_path, csv_options=snapshot.SUPERSTORE_CSV_OPTIONS)
+    monkeypatch.setattr(snapshot, "SNAPSHOT_FORMAT", snapshot.SNAPSHOT_FORMAT + b"+1")
+    assert not snapshot.is_fresh(csv_path, path)
+
+
+def test_load_superstore_serves_mapped_frame(tmp_path):
+    csv_path = write_csv(tmp_path / "store.csv", 400)
+    df = snapshot.load_superstore(csv_path)
+    pd.testing.assert_frame_equal(df, pd.read_parquet(snapshot.snapshot_path_for(csv_path)),
+                                  check_categorical=False)
+    # Sessions get their own shallow copies: changes stay local
+    df["Sales"] = 0.0
+    assert (snapshot.load_superstore(csv_path)["Sales"] > 0).all()
+
+
+def test_corrupt_arrow_copy_is_rebuilt(tmp_path):
+    csv_path = write_csv(tmp_path / "store.csv", 100)
+    snapshot.ensure_arrow_snapshot(csv_path, csv_options=snapshot.SUPERSTORE_CSV_OPTIONS)
+    with open(snapshot.arrow_path_for(csv_path), "r+b") as fh:
+        fh.truncate(64)
+    assert len(snapshot.load_superstore(csv_path)) == 100
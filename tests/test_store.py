@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from dashboard_core.store import SalesStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SalesStore(tmp_path / "sales.db")
+
+
+def monthly(df, **filters):
+    for dim, values in filters.items():
+        df = df[df[dim].isin(values)]
+    grouped = df.groupby(df["Order Date"].dt.strftime("%Y-%m").rename("Order Date"))
+    out = grouped[["Quantity", "Amount Collected", "Profit"]].sum()
+    out.insert(0, "Orders", grouped.size())
+    return out.reset_index()
+
+
+def test_overlapping_uploads_are_stored_once(store, triple_track):
+    first, second = triple_track.iloc[:2000], triple_track.iloc[1000:]
+    assert store.append(first, "jan.xlsx", upload_id="jan") == 2000
+    assert store.append(second, "feb.xlsx", upload_id="feb") == len(triple_track) - 2000
+    assert store.append(second, "feb.xlsx", upload_id="feb") is None
+    assert len(store) == len(triple_track)
+
+    history = store.history()
+    want = triple_track.sort_values("Order Date", kind="stable", ignore_index=True)
+    pd.testing.assert_frame_equal(history, want, check_categorical=False, check_dtype=False)
+
+
+def test_repeated_orders_within_an_upload_are_kept(store, triple_track):
+    rows = pd.concat([triple_track.iloc[:10]] * 2, ignore_index=True)
+    assert store.append(rows, "dup.xlsx", upload_id="dup") == 20
+
+
+def test_monthly_rollup_matches_history(store, triple_track):
+    store.append(triple_track.iloc[:1500], "a.xlsx", upload_id="a")
+    store.append(triple_track.iloc[500:], "b.xlsx", upload_id="b")
+    pd.testing.assert_frame_equal(store.monthly(), monthly(triple_track), check_dtype=False)
+    filters = {"Location": ["Cebu", "Manila"], "Class": ["Truck"]}
+    pd.testing.assert_frame_equal(store.monthly(**filters), monthly(triple_track, **filters),
+                                  check_dtype=False)
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_core.timeseries import PERIOD, TimeRollups, period_start
+from tests.conftest import picks
+
+MEASURES = ["Sales", "Profit"]
+
+
+def test_period_start():
+    dates = pd.to_datetime(["2024-02-29 13:00", "2024-03-31 00:00", "2024-12-31 23:59", None])
+    assert list(period_start(dates, "W")[:3]) == list(
+        pd.DatetimeIndex(dates[:3]).to_period("W-SUN").start_time)
+    for freq in ["D", "M", "Q", "Y"]:
+        assert list(period_start(dates, freq)[:3]) == list(
+            pd.DatetimeIndex(dates[:3]).to_period(freq).start_time)
+    assert np.isnat(period_start(dates, "M")[3])
+
+
+@pytest.mark.parametrize("freq", ["D", "W", "M", "Q", "Y"])
+@pytest.mark.parametrize("start, end", [(None, None), ("2015-03-17", "2016-02-03")])
+def test_series_matches_groupby(superstore, freq, start, end):
+    rollups = TimeRollups(superstore, "Order Date", MEASURES, dims=["Region", "Segment"])
+    regions = picks(superstore["Region"])
+    for empty, filters in [("all", {}), ("all", {"Region": regions, "Segment": []}),
+                           ("none", {"Region": regions})]:
+        rows = superstore
+        if start is not None:
+            rows = rows[(rows["Order Date"] >= start) & (rows["Order Date"] <= end)]
+        for dim, values in filters.items():
+            if values:
+                rows = rows[rows[dim].isin(values)]
+        grouped = rows.groupby(pd.DatetimeIndex(period_start(rows["Order Date"], freq), name=PERIOD))
+        want = grouped[MEASURES].sum()
+        want["Rows"] = grouped.size()
+        got = rollups.series(freq, start, end, empty=empty, **filters)
+        pd.testing.assert_frame_equal(got, want, check_dtype=False, check_freq=False)
+
+
+def test_empty_selection_selects_nothing_with_empty_none(superstore):
+    rollups = TimeRollups(superstore, "Order Date", MEASURES, dims=["Region"])
+    assert rollups.series("M", empty="none", Region=[]).empty
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from dashboard_core.timeseries import period_start
+from dashboard_core.workforce import TENURE_EDGES, TENURE_LABELS, Workforce
+
+FILTERS = [
+    ("none", {}),
+    ("none", {"Department": ["IT", "Sales"], "Gender": ["F"]}),
+    ("none", {"Department": ["IT"], "Gender": []}),
+    ("all", {"Department": ["Finance"], "Gender": []}),
+]
+
+
+def selected(df, empty, filters):
+    for dim in ["Department", "Gender"]:
+        values = filters.get(dim)
+        if values is None or (not values and empty == "all"):
+            continue
+        df = df[df[dim].isin(values)]
+    return df[df["HireDate"].notna()]
+
+
+def as_of(df):
+    return max(df["HireDate"].max(), df["ExitDate"].max())
+
+
+@pytest.mark.parametrize("freq", ["W", "M", "Q", "Y"])
+@pytest.mark.parametrize("empty, filters", FILTERS)
+def test_series_matches_brute_force(hr, freq, empty, filters):
+    got = Workforce(hr).series(freq, empty=empty, **filters)
+    rows = selected(hr, empty, filters)
+    hires = rows["HireDate"]
+    exits = rows["ExitDate"].where(rows["ExitDate"].isna() | (rows["ExitDate"] >= hires), hires)
+
+    last = as_of(hr)
+    starts = got.index
+    assert starts[0] == period_start([hr["HireDate"].min()], freq)[0]
+    assert starts[-1] == period_start([last], freq)[0]
+    ends = list(starts[1:]) + [last + pd.Timedelta(days=1)]
+    for start, end, (_, row) in zip(starts, ends, got.iterrows()):
+        assert row["Hires"] == ((hires >= start) & (hires < end)).sum()
+        assert row["Exits"] == ((exits >= start) & (exits < end)).sum()
+        assert row["Headcount"] == ((hires < end) & ~(exits < end)).sum()
+
+
+@pytest.mark.parametrize("empty, filters", FILTERS)
+def test_tenure_matches_brute_force(hr, empty, filters):
+    got = Workforce(hr).tenure(empty=empty, **filters)
+    rows = selected(hr, empty, filters)
+    exited = rows["ExitDate"].notna()
+    ends = rows["ExitDate"].where(exited, as_of(hr)).where(
+        rows["ExitDate"].isna() | (rows["ExitDate"] >= rows["HireDate"]), rows["HireDate"])
+    years = (ends - rows["HireDate"]) / np.timedelta64(1, "D") / 365.25
+    bands = pd.cut(years, TENURE_EDGES, right=False, labels=TENURE_LABELS)
+    for status, mask in [("Active", ~exited), ("Exited", exited)]:
+        want = bands[mask].value_counts().reindex(TENURE_LABELS, fill_value=0)
+        counts = got[got["Status"] == status].set_index("Tenure")["Count"]
+        assert counts.to_dict() == want.to_dict()
@@ -2,6 +2,16 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import io
+from dashboard_core import perf, timeseries
+from dashboard_core.bitmap import get_bitmap_index
+from dashboard_core.grid import paged_grid
+from dashboard_core.ingest import dataset_id, load_tables
+from dashboard_core.keys import distinct_count
+from dashboard_core.prepare import prepare_triple_track
+from dashboard_core.schemas import TRIPLE_TRACK
+from dashboard_core.store import get_store
+
+perf.begin("triple_track")
 
 st.set_page_config(page_title="Triple Track Garage - Hot Wheels",
                    page_icon="🚗", layout="wide")
@@ -84,55 +94,73 @@ st.download_button(
 # ----------------------------
 # File Upload
 # ----------------------------
-uploaded_file = st.file_uploader("Upload an Excel file", type=["xlsx", "xls"])
+perf.stage("load")
+uploaded_files = st.file_uploader("Upload Excel files", type=["xlsx", "xls"],
+                                  accept_multiple_files=True) or []
+
+
+# Every upload is added to a local sales history (orders already stored are
+# skipped), which can be viewed without re-uploading earlier files
+store = get_store()
+history = False
 
-if uploaded_file:
+if uploaded_files or store.version():
     try:
-        df = pd.read_excel(uploaded_file, engine="openpyxl")
-        st.success("File uploaded successfully.")
+        if uploaded_files:
+            # Files are parsed and get their derived columns in parallel worker
+            # processes; only the columns declared in schemas.TRIPLE_TRACK are read
+            df = load_tables(uploaded_files, excel_options=TRIPLE_TRACK.excel_options,
+                             prepare=prepare_triple_track)
+            added = store.append(df, ", ".join(f.name for f in uploaded_files))
+            if added is not None:   # None: this upload was stored on an earlier rerun
+                st.success(f"Files uploaded successfully. {added:,} new orders added to the history.")
+            history = st.sidebar.radio("Data", ["This upload", "All history"],
+                                       key="tt_data") == "All history"
+        else:
+            history = True
+        if history:
+            df = store.history()
+            st.caption(f"Showing all {len(df):,} stored orders.")
     except Exception as e:
         st.error(f"Error reading file: {e}")
     else:
-        # Convert numeric columns
-        for col in ["Price", "Quantity", "Cost"]:
-            df[col] = pd.to_numeric(df[col], errors="coerce")
-
-        # Derived columns
-        df["Amount Collected"] = df["Price"] * df["Quantity"]
-        df["Profit"] = (df["Price"] - df["Cost"]) * df["Quantity"]
 
         # ----------------------------
         # Sidebar Filters
         # ----------------------------
+        perf.stage("filters")
         st.sidebar.header("Filters")
-        location_filter = st.sidebar.multiselect("Select Location", df["Location"].unique())
-        class_filter = st.sidebar.multiselect("Select Class", df["Class"].unique())
+        index = get_bitmap_index(df, ["Location", "Class"])
+        location_filter = st.sidebar.multiselect("Select Location", index.options("Location"))
+        class_filter = st.sidebar.multiselect("Select Class", index.options("Class"))
 
-        filtered_df = df.copy()
-        if location_filter:
-            filtered_df = filtered_df[filtered_df["Location"].isin(location_filter)]
-        if class_filter:
-            filtered_df = filtered_df[filtered_df["Class"].isin(class_filter)]
+        filtered_df = index.filter(df, index.select(Location=location_filter,
+                                                    Class=class_filter))
 
         # ----------------------------
         # Key Metrics
         # ----------------------------
+        perf.stage("metrics")
         st.subheader("Key Metrics")
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Total Sales", f"₱{filtered_df['Amount Collected'].sum():,.2f}")
         col2.metric("Total Quantity", f"{int(filtered_df['Quantity'].sum())}")
-        col3.metric("Unique Buyers", f"{int(filtered_df['Buyer Name'].nunique())}")
+        # Counted over the buyer codes once per filter state
+        buyers = distinct_count(filtered_df["Buyer Name"],
+                                state=(dataset_id(df), tuple(location_filter), tuple(class_filter)))
+        col3.metric("Unique Buyers", f"{buyers}")
         col4.metric("Total Profit", f"₱{filtered_df['Profit'].sum():,.2f}")
 
         # ----------------------------
         # Charts
         # ----------------------------
+        perf.stage("class and location")
         chart1, chart2 = st.columns(2)
 
         with chart1:
             st.subheader("Sales & Profit by Class")
             summary_class = (
-                filtered_df.groupby("Class")[["Amount Collected", "Profit"]]
+                filtered_df.groupby("Class", observed=True)[["Amount Collected", "Profit"]]
                 .sum()
                 .reset_index()
             )
@@ -145,7 +173,7 @@ if uploaded_file:
         with chart2:
             st.subheader("Sales & Profit by Location")
             summary_location = (
-                filtered_df.groupby("Location")[["Amount Collected", "Profit"]]
+                filtered_df.groupby("Location", observed=True)[["Amount Collected", "Profit"]]
                 .sum()
                 .reset_index()
             )
@@ -158,15 +186,18 @@ if uploaded_file:
         # ----------------------------
         # Time Series
         # ----------------------------
+        perf.stage("time series")
         st.subheader("Sales & Profit Over Time")
-        filtered_df["Order Date"] = pd.to_datetime(filtered_df["Order Date"], errors="coerce")
-        time_series = (
-            filtered_df.groupby(filtered_df["Order Date"].dt.to_period("M"))
-            [["Amount Collected", "Profit"]]
-            .sum()
-            .reset_index()
-        )
-        time_series["Order Date"] = time_series["Order Date"].astype(str)
+        freq = timeseries.granularity("tt_granularity")
+        if history and freq == "M":
+            # The store keeps monthly totals up to date on insert
+            time_series = store.monthly(Location=location_filter, Class=class_filter)
+        else:
+            rollups = timeseries.get_rollups(df, "Order Date", ["Amount Collected", "Profit"],
+                                             dims=["Location", "Class"])
+            time_series = (rollups.series(freq, Location=location_filter, Class=class_filter)
+                           .reset_index()
+                           .rename(columns={timeseries.PERIOD: "Order Date"}))
 
         fig3 = px.line(time_series, x="Order Date",
                        y=["Amount Collected", "Profit"],
@@ -176,9 +207,11 @@ if uploaded_file:
         # ----------------------------
         # Detailed Data
         # ----------------------------
+        perf.stage("records")
         st.subheader("Sales Records")
-        st.dataframe(filtered_df.style.background_gradient(cmap="Blues"),
-                     use_container_width=True)
+        paged_grid(filtered_df, key="tt_records", cmap="Blues")
 
 else:
-    st.info("Please upload an Excel file to view the dashboard.")
+    st.info("Please upload Excel files to view the dashboard.")
+
+perf.panel()
@@ -1,6 +1,16 @@
 import streamlit as st
-import pandas as pd
 import plotly.express as px
+from dashboard_core import perf, timeseries
+from dashboard_core.export import FORMATS, export_button
+from dashboard_core.grid import paged_grid
+from dashboard_core.ingest import dataset_id, load_tables
+from dashboard_core.keys import distinct_count
+from dashboard_core.prepare import prepare_triple_track
+from dashboard_core.schemas import TRIPLE_TRACK
+from dashboard_core.sections import lazy_tabs, memoize
+from dashboard_core.store import get_store
+
+perf.begin("triple_track_v2")
 
 st.set_page_config(page_title="Triple Track Garage",
                    page_icon="🚗", layout="wide")
@@ -22,57 +32,86 @@ st.image("hotwheels_logo.jpg", width=120)  # Optional
 st.title("🔥 Triple Track Garage Sales Dashboard 🚗")
 
 # === File Uploader ===
-fl = st.file_uploader("📂 Upload your sales file", type=["csv", "xlsx", "xls"])
-if fl is not None:
-    if fl.name.endswith(".csv"):
-        df = pd.read_csv(fl)
-    else:
-        df = pd.read_excel(fl)
+perf.stage("load")
+files = st.file_uploader("📂 Upload your sales files", type=["csv", "xlsx", "xls"],
+                         accept_multiple_files=True) or []
+
+
+# Uploads are appended to a local sales history (already stored orders are
+# skipped), so earlier months stay available without re-uploading them
+store = get_store()
 
-    # Ensure numeric fields
-    df["Price"] = pd.to_numeric(df["Price"], errors='coerce')
-    df["Quantity"] = pd.to_numeric(df["Quantity"], errors='coerce')
-    df["Cost"] = pd.to_numeric(df["Cost"], errors='coerce')
-    df["Amount Collected"] = df["Price"] * df["Quantity"]
-    df["Profit"] = (df["Price"] - df["Cost"]) * df["Quantity"]
+if files or store.version():
+    history = True
+    try:
+        if files:
+            # One worker process per file parses it and adds the derived columns; only
+            # the columns declared in schemas.TRIPLE_TRACK are read
+            df = load_tables(files, csv_options=TRIPLE_TRACK.csv_options,
+                             excel_options=TRIPLE_TRACK.excel_options,
+                             prepare=prepare_triple_track)
+            added = store.append(df, ", ".join(f.name for f in files))
+            if added is not None:   # None: this upload was stored on an earlier rerun
+                st.success(f"{added:,} new orders added to the sales history.")
+            history = st.sidebar.radio("📚 Data", ["This upload", "All history"],
+                                       key="tt_data") == "All history"
+        if history:
+            df = store.history()
+            st.caption(f"Showing all {len(df):,} stored orders.")
+    except Exception as e:
+        st.error(f"Error reading file: {e}")
+        perf.panel()
+        st.stop()   # ⛔ Nothing to chart
 
     # === KPIs ===
+    perf.stage("metrics")
     col1, col2, col3, col4 = st.columns(4)
     col1.metric("💰 Total Sales", f"₱{df['Amount Collected'].sum():,.2f}")
     col2.metric("📦 Quantity Sold", f"{df['Quantity'].sum()}")
-    col3.metric("👥 Unique Buyers", f"{df['Buyer Name'].nunique()}")
+    col3.metric("👥 Unique Buyers", f"{distinct_count(df['Buyer Name'], state=dataset_id(df))}")
     col4.metric("📈 Total Profit", f"₱{df['Profit'].sum():,.2f}")
 
     # === Tabs for navigation ===
-    tab1, tab2, tab3 = st.tabs(["📊 Overview", "📈 Trends", "📂 Raw Data"])
+    # Only the selected section runs; results are memoized per dataset
+    section = lazy_tabs(["📊 Overview", "📈 Trends", "📂 Raw Data"], key="tt_section")
+    perf.stage(section)
+    data_state = dataset_id(df)
 
-    with tab1:
+    @perf.timed()
+    def compute_sales_over_time(freq):
+        if history and freq == "M":
+            # Monthly totals are maintained by the store on insert
+            return store.monthly()[["Order Date", "Amount Collected"]]
+        rollups = timeseries.get_rollups(df, "Order Date", ["Amount Collected"])
+        return (rollups.series(freq)[["Amount Collected"]].reset_index()
+                .rename(columns={timeseries.PERIOD: "Order Date"}))
+
+    if section == "📊 Overview":
         st.subheader("Sales by Class")
-        fig = px.bar(df.groupby("Class")["Amount Collected"].sum().reset_index(),
-                     x="Class", y="Amount Collected", color="Class")
+        by_class = memoize("overview", data_state, lambda: df.groupby(
+            "Class", observed=True)["Amount Collected"].sum().reset_index())
+        fig = px.bar(by_class, x="Class", y="Amount Collected", color="Class")
         fig.update_layout(template="plotly_dark",
                           plot_bgcolor="#0D0D0D", paper_bgcolor="#0D0D0D")
         st.plotly_chart(fig, use_container_width=True)
 
-    with tab2:
+    elif section == "📈 Trends":
         st.subheader("Sales Over Time")
         if "Order Date" in df.columns:
-            df["Order Date"] = pd.to_datetime(
-                df["Order Date"], errors="coerce")
-            line_df = df.groupby(df["Order Date"].dt.to_period("M"))[
-                "Amount Collected"].sum().reset_index()
-            line_df["Order Date"] = line_df["Order Date"].astype(str)
+            freq = timeseries.granularity("tt_granularity")
+            line_df = memoize("trends", (data_state, freq), lambda: compute_sales_over_time(freq))
             fig2 = px.line(line_df, x="Order Date", y="Amount Collected")
             fig2.update_layout(template="plotly_dark",
                                plot_bgcolor="#0D0D0D", paper_bgcolor="#0D0D0D")
             st.plotly_chart(fig2, use_container_width=True)
 
-    with tab3:
+    else:
         st.subheader("📂 Sales Records")
-        st.dataframe(df, use_container_width=True)
-        csv = df.to_csv(index=False).encode("utf-8")
-        st.download_button("Download CSV", data=csv,
-                           file_name="sales_data.csv", mime="text/csv")
+        paged_grid(df, key="tt_raw")
+        export_button(df, "sales_data", key="raw_download", label="Download",
+                      formats=list(FORMATS))
 
 else:
-    st.info("👆 Upload an Excel or CSV file to begin.")
+    st.info("👆 Upload Excel or CSV files to begin.")
+
+perf.panel()